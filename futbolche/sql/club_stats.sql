@@ -0,0 +1,124 @@
+-- =====================================
+-- club_stats: per club and league match totals, kept up to date by triggers
+-- on matches. league_id 0 holds matches outside any league. Unplayed
+-- fixtures (NULL goals) are not counted. Running this script again
+-- recomputes the table from matches.
+-- =====================================
+CREATE TABLE IF NOT EXISTS club_stats (
+    club_id INTEGER NOT NULL,
+    league_id INTEGER NOT NULL DEFAULT 0,
+    played INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    draws INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    goals_for INTEGER NOT NULL DEFAULT 0,
+    goals_against INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (club_id, league_id),
+    FOREIGN KEY (club_id) REFERENCES clubs(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- Teams with results in a league (standings)
+CREATE INDEX IF NOT EXISTS idx_club_stats_league ON club_stats(league_id);
+
+-- What club_stats must contain, computed from matches (rebuild and checks)
+CREATE VIEW IF NOT EXISTS club_stats_from_matches AS
+SELECT club_id, league_id,
+       COUNT(*) AS played,
+       SUM(gf > ga) AS wins,
+       SUM(gf = ga) AS draws,
+       SUM(gf < ga) AS losses,
+       SUM(gf) AS goals_for,
+       SUM(ga) AS goals_against
+FROM (SELECT home_team_id AS club_id, COALESCE(league_id, 0) AS league_id,
+             home_goals AS gf, away_goals AS ga FROM matches
+      WHERE home_goals IS NOT NULL AND away_goals IS NOT NULL
+      UNION ALL
+      SELECT away_team_id, COALESCE(league_id, 0), away_goals, home_goals FROM matches
+      WHERE home_goals IS NOT NULL AND away_goals IS NOT NULL)
+GROUP BY club_id, league_id;
+
+CREATE TRIGGER IF NOT EXISTS trg_club_stats_match_insert AFTER INSERT ON matches
+WHEN NEW.home_goals IS NOT NULL AND NEW.away_goals IS NOT NULL
+BEGIN
+    INSERT INTO club_stats (club_id, league_id, played, wins, draws, losses, goals_for, goals_against)
+    VALUES (NEW.home_team_id, COALESCE(NEW.league_id, 0), 1,
+            NEW.home_goals > NEW.away_goals, NEW.home_goals = NEW.away_goals, NEW.home_goals < NEW.away_goals,
+            NEW.home_goals, NEW.away_goals)
+    ON CONFLICT (club_id, league_id) DO UPDATE SET
+        played = played + 1, wins = wins + excluded.wins, draws = draws + excluded.draws,
+        losses = losses + excluded.losses, goals_for = goals_for + excluded.goals_for,
+        goals_against = goals_against + excluded.goals_against;
+    INSERT INTO club_stats (club_id, league_id, played, wins, draws, losses, goals_for, goals_against)
+    VALUES (NEW.away_team_id, COALESCE(NEW.league_id, 0), 1,
+            NEW.away_goals > NEW.home_goals, NEW.home_goals = NEW.away_goals, NEW.away_goals < NEW.home_goals,
+            NEW.away_goals, NEW.home_goals)
+    ON CONFLICT (club_id, league_id) DO UPDATE SET
+        played = played + 1, wins = wins + excluded.wins, draws = draws + excluded.draws,
+        losses = losses + excluded.losses, goals_for = goals_for + excluded.goals_for,
+        goals_against = goals_against + excluded.goals_against;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_club_stats_match_delete AFTER DELETE ON matches
+WHEN OLD.home_goals IS NOT NULL AND OLD.away_goals IS NOT NULL
+BEGIN
+    UPDATE club_stats SET
+        played = played - 1, wins = wins - (OLD.home_goals > OLD.away_goals),
+        draws = draws - (OLD.home_goals = OLD.away_goals), losses = losses - (OLD.home_goals < OLD.away_goals),
+        goals_for = goals_for - OLD.home_goals, goals_against = goals_against - OLD.away_goals
+    WHERE club_id = OLD.home_team_id AND league_id = COALESCE(OLD.league_id, 0);
+    UPDATE club_stats SET
+        played = played - 1, wins = wins - (OLD.away_goals > OLD.home_goals),
+        draws = draws - (OLD.home_goals = OLD.away_goals), losses = losses - (OLD.away_goals < OLD.home_goals),
+        goals_for = goals_for - OLD.away_goals, goals_against = goals_against - OLD.home_goals
+    WHERE club_id = OLD.away_team_id AND league_id = COALESCE(OLD.league_id, 0);
+    DELETE FROM club_stats
+    WHERE played = 0 AND league_id = COALESCE(OLD.league_id, 0)
+      AND club_id IN (OLD.home_team_id, OLD.away_team_id);
+END;
+
+-- An edited match is taken out with its old values and added with the new ones
+-- (a fixture whose result is entered goes from not counted to counted)
+CREATE TRIGGER IF NOT EXISTS trg_club_stats_match_update
+AFTER UPDATE OF home_team_id, away_team_id, home_goals, away_goals, league_id ON matches
+BEGIN
+    UPDATE club_stats SET
+        played = played - 1, wins = wins - (OLD.home_goals > OLD.away_goals),
+        draws = draws - (OLD.home_goals = OLD.away_goals), losses = losses - (OLD.home_goals < OLD.away_goals),
+        goals_for = goals_for - OLD.home_goals, goals_against = goals_against - OLD.away_goals
+    WHERE club_id = OLD.home_team_id AND league_id = COALESCE(OLD.league_id, 0)
+      AND OLD.home_goals IS NOT NULL AND OLD.away_goals IS NOT NULL;
+    UPDATE club_stats SET
+        played = played - 1, wins = wins - (OLD.away_goals > OLD.home_goals),
+        draws = draws - (OLD.home_goals = OLD.away_goals), losses = losses - (OLD.away_goals < OLD.home_goals),
+        goals_for = goals_for - OLD.away_goals, goals_against = goals_against - OLD.home_goals
+    WHERE club_id = OLD.away_team_id AND league_id = COALESCE(OLD.league_id, 0)
+      AND OLD.home_goals IS NOT NULL AND OLD.away_goals IS NOT NULL;
+    DELETE FROM club_stats
+    WHERE played = 0 AND league_id = COALESCE(OLD.league_id, 0)
+      AND club_id IN (OLD.home_team_id, OLD.away_team_id);
+
+    INSERT INTO club_stats (club_id, league_id, played, wins, draws, losses, goals_for, goals_against)
+    SELECT NEW.home_team_id, COALESCE(NEW.league_id, 0), 1,
+           NEW.home_goals > NEW.away_goals, NEW.home_goals = NEW.away_goals, NEW.home_goals < NEW.away_goals,
+           NEW.home_goals, NEW.away_goals
+    WHERE NEW.home_goals IS NOT NULL AND NEW.away_goals IS NOT NULL
+    ON CONFLICT (club_id, league_id) DO UPDATE SET
+        played = played + 1, wins = wins + excluded.wins, draws = draws + excluded.draws,
+        losses = losses + excluded.losses, goals_for = goals_for + excluded.goals_for,
+        goals_against = goals_against + excluded.goals_against;
+    INSERT INTO club_stats (club_id, league_id, played, wins, draws, losses, goals_for, goals_against)
+    SELECT NEW.away_team_id, COALESCE(NEW.league_id, 0), 1,
+           NEW.away_goals > NEW.home_goals, NEW.home_goals = NEW.away_goals, NEW.away_goals < NEW.home_goals,
+           NEW.away_goals, NEW.home_goals
+    WHERE NEW.home_goals IS NOT NULL AND NEW.away_goals IS NOT NULL
+    ON CONFLICT (club_id, league_id) DO UPDATE SET
+        played = played + 1, wins = wins + excluded.wins, draws = draws + excluded.draws,
+        losses = losses + excluded.losses, goals_for = goals_for + excluded.goals_for,
+        goals_against = goals_against + excluded.goals_against;
+END;
+
+-- Recompute from matches (fills the table when it is added to an existing database)
+DELETE FROM club_stats;
+INSERT INTO club_stats (club_id, league_id, played, wins, draws, losses, goals_for, goals_against)
+SELECT club_id, league_id, played, wins, draws, losses, goals_for, goals_against
+FROM club_stats_from_matches;
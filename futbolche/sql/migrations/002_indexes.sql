@@ -0,0 +1,13 @@
+-- =====================================
+-- MIGRATION 002: secondary indexes for every service lookup path
+-- =====================================
+CREATE INDEX IF NOT EXISTS idx_clubs_name_lower ON clubs(LOWER(name));
+CREATE INDEX IF NOT EXISTS idx_players_club_number ON players(club_id, number);
+CREATE INDEX IF NOT EXISTS idx_players_name_lower ON players(LOWER(full_name));
+CREATE INDEX IF NOT EXISTS idx_matches_home_team ON matches(home_team_id);
+CREATE INDEX IF NOT EXISTS idx_matches_away_team ON matches(away_team_id);
+CREATE INDEX IF NOT EXISTS idx_matches_league_date ON matches(league_id, match_date);
+CREATE INDEX IF NOT EXISTS idx_leagues_name_lower ON leagues(LOWER(name));
+CREATE INDEX IF NOT EXISTS idx_league_teams_club ON league_teams(club_id);
+CREATE INDEX IF NOT EXISTS idx_events_match ON events(match_id);
+CREATE INDEX IF NOT EXISTS idx_events_player_type ON events(player_id, event_type);
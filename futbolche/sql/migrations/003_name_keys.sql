@@ -0,0 +1,44 @@
+-- =====================================
+-- MIGRATION 003: casefolded, indexed name keys
+-- Requires the casefold() SQL function registered by db.open_connection().
+-- =====================================
+ALTER TABLE clubs ADD COLUMN name_key TEXT;
+ALTER TABLE players ADD COLUMN name_key TEXT;
+ALTER TABLE leagues ADD COLUMN name_key TEXT;
+
+UPDATE clubs SET name_key = casefold(name);
+UPDATE players SET name_key = casefold(full_name);
+UPDATE leagues SET name_key = casefold(name);
+
+CREATE TRIGGER IF NOT EXISTS trg_clubs_name_key_insert AFTER INSERT ON clubs
+BEGIN
+    UPDATE clubs SET name_key = casefold(NEW.name) WHERE id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_clubs_name_key_update AFTER UPDATE OF name ON clubs
+BEGIN
+    UPDATE clubs SET name_key = casefold(NEW.name) WHERE id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_players_name_key_insert AFTER INSERT ON players
+BEGIN
+    UPDATE players SET name_key = casefold(NEW.full_name) WHERE id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_players_name_key_update AFTER UPDATE OF full_name ON players
+BEGIN
+    UPDATE players SET name_key = casefold(NEW.full_name) WHERE id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_leagues_name_key_insert AFTER INSERT ON leagues
+BEGIN
+    UPDATE leagues SET name_key = casefold(NEW.name) WHERE id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_leagues_name_key_update AFTER UPDATE OF name ON leagues
+BEGIN
+    UPDATE leagues SET name_key = casefold(NEW.name) WHERE id = NEW.id;
+END;
+
+DROP INDEX IF EXISTS idx_clubs_name_lower;
+DROP INDEX IF EXISTS idx_players_name_lower;
+DROP INDEX IF EXISTS idx_leagues_name_lower;
+
+CREATE INDEX IF NOT EXISTS idx_clubs_name_key ON clubs(name_key);
+CREATE INDEX IF NOT EXISTS idx_players_name_key ON players(name_key);
+CREATE INDEX IF NOT EXISTS idx_leagues_name_key ON leagues(name_key);
@@ -0,0 +1,39 @@
+-- =====================================
+-- MIGRATION 007: matches.home_goals / away_goals become nullable
+-- An unplayed fixture keeps NULL goals instead of a 0-0 result. Existing rows
+-- are copied unchanged (stored 0-0 fixtures cannot be told apart from 0-0
+-- results). SQLite cannot relax NOT NULL in place, so the table is rebuilt;
+-- the club_stats view and triggers on it are recreated by db.py afterwards.
+-- =====================================
+PRAGMA foreign_keys = OFF;
+BEGIN;
+
+DROP VIEW IF EXISTS club_stats_from_matches;
+DROP TRIGGER IF EXISTS trg_club_stats_match_insert;
+DROP TRIGGER IF EXISTS trg_club_stats_match_delete;
+DROP TRIGGER IF EXISTS trg_club_stats_match_update;
+
+CREATE TABLE matches_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    home_team_id INTEGER NOT NULL,
+    away_team_id INTEGER NOT NULL,
+    home_goals INTEGER,  -- NULL until the match is played
+    away_goals INTEGER,
+    match_date TEXT NOT NULL,
+    league_id INTEGER,
+    FOREIGN KEY (home_team_id) REFERENCES clubs(id) ON DELETE CASCADE,
+    FOREIGN KEY (away_team_id) REFERENCES clubs(id) ON DELETE CASCADE
+    ,
+    FOREIGN KEY (league_id) REFERENCES leagues(id) ON DELETE CASCADE
+);
+INSERT INTO matches_new (id, home_team_id, away_team_id, home_goals, away_goals, match_date, league_id)
+SELECT id, home_team_id, away_team_id, home_goals, away_goals, match_date, league_id FROM matches;
+DROP TABLE matches;
+ALTER TABLE matches_new RENAME TO matches;
+
+CREATE INDEX IF NOT EXISTS idx_matches_home_team ON matches(home_team_id);
+CREATE INDEX IF NOT EXISTS idx_matches_away_team ON matches(away_team_id);
+CREATE INDEX IF NOT EXISTS idx_matches_league_date ON matches(league_id, match_date);
+
+COMMIT;
+PRAGMA foreign_keys = ON;
@@ -0,0 +1,5 @@
+-- =====================================
+-- MIGRATION 008: idempotency keys for events ingested from live feeds
+-- =====================================
+ALTER TABLE events ADD COLUMN ingest_key TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_events_ingest_key ON events(ingest_key);
@@ -0,0 +1,84 @@
+-- =====================================
+-- player_stats: per player event totals, kept up to date by triggers on
+-- events. Minutes are approximated as 90 per appearance (events carry no
+-- substitution data). Running this script again recomputes the table from
+-- events.
+-- =====================================
+CREATE TABLE IF NOT EXISTS player_stats (
+    player_id INTEGER PRIMARY KEY,
+    goals INTEGER NOT NULL DEFAULT 0,
+    assists INTEGER NOT NULL DEFAULT 0,
+    appearances INTEGER NOT NULL DEFAULT 0,
+    yellow_cards INTEGER NOT NULL DEFAULT 0,
+    red_cards INTEGER NOT NULL DEFAULT 0,
+    minutes INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (player_id) REFERENCES players(id) ON DELETE CASCADE
+);
+
+-- What player_stats must contain, computed from events (rebuild and checks)
+CREATE VIEW IF NOT EXISTS player_stats_from_events AS
+SELECT player_id,
+       SUM(event_type = 'goal') AS goals,
+       SUM(event_type = 'assist') AS assists,
+       SUM(event_type = 'appearance') AS appearances,
+       SUM(event_type = 'yellow') AS yellow_cards,
+       SUM(event_type = 'red') AS red_cards,
+       SUM(event_type = 'appearance') * 90 AS minutes
+FROM events WHERE player_id IS NOT NULL
+GROUP BY player_id;
+
+CREATE TRIGGER IF NOT EXISTS trg_player_stats_event_insert AFTER INSERT ON events
+WHEN NEW.player_id IS NOT NULL
+BEGIN
+    INSERT INTO player_stats (player_id, goals, assists, appearances, yellow_cards, red_cards, minutes)
+    VALUES (NEW.player_id, NEW.event_type = 'goal', NEW.event_type = 'assist', NEW.event_type = 'appearance',
+            NEW.event_type = 'yellow', NEW.event_type = 'red', (NEW.event_type = 'appearance') * 90)
+    ON CONFLICT (player_id) DO UPDATE SET
+        goals = goals + excluded.goals, assists = assists + excluded.assists,
+        appearances = appearances + excluded.appearances, yellow_cards = yellow_cards + excluded.yellow_cards,
+        red_cards = red_cards + excluded.red_cards, minutes = minutes + excluded.minutes;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_player_stats_event_delete AFTER DELETE ON events
+WHEN OLD.player_id IS NOT NULL
+BEGIN
+    UPDATE player_stats SET
+        goals = goals - (OLD.event_type = 'goal'), assists = assists - (OLD.event_type = 'assist'),
+        appearances = appearances - (OLD.event_type = 'appearance'),
+        yellow_cards = yellow_cards - (OLD.event_type = 'yellow'), red_cards = red_cards - (OLD.event_type = 'red'),
+        minutes = minutes - (OLD.event_type = 'appearance') * 90
+    WHERE player_id = OLD.player_id;
+    DELETE FROM player_stats
+    WHERE player_id = OLD.player_id
+      AND goals = 0 AND assists = 0 AND appearances = 0 AND yellow_cards = 0 AND red_cards = 0;
+END;
+
+-- Covers edits and the player_id SET NULL when a player is deleted
+CREATE TRIGGER IF NOT EXISTS trg_player_stats_event_update AFTER UPDATE OF player_id, event_type ON events
+BEGIN
+    UPDATE player_stats SET
+        goals = goals - (OLD.event_type = 'goal'), assists = assists - (OLD.event_type = 'assist'),
+        appearances = appearances - (OLD.event_type = 'appearance'),
+        yellow_cards = yellow_cards - (OLD.event_type = 'yellow'), red_cards = red_cards - (OLD.event_type = 'red'),
+        minutes = minutes - (OLD.event_type = 'appearance') * 90
+    WHERE player_id = OLD.player_id;
+    DELETE FROM player_stats
+    WHERE player_id = OLD.player_id
+      AND goals = 0 AND assists = 0 AND appearances = 0 AND yellow_cards = 0 AND red_cards = 0;
+
+    INSERT INTO player_stats (player_id, goals, assists, appearances, yellow_cards, red_cards, minutes)
+    SELECT NEW.player_id, NEW.event_type = 'goal', NEW.event_type = 'assist', NEW.event_type = 'appearance',
+           NEW.event_type = 'yellow', NEW.event_type = 'red', (NEW.event_type = 'appearance') * 90
+    WHERE NEW.player_id IS NOT NULL
+    ON CONFLICT (player_id) DO UPDATE SET
+        goals = goals + excluded.goals, assists = assists + excluded.assists,
+        appearances = appearances + excluded.appearances, yellow_cards = yellow_cards + excluded.yellow_cards,
+        red_cards = red_cards + excluded.red_cards, minutes = minutes + excluded.minutes;
+END;
+
+-- Recompute from events (fills the table when it is added to an existing database)
+DELETE FROM player_stats;
+INSERT INTO player_stats (player_id, goals, assists, appearances, yellow_cards, red_cards, minutes)
+SELECT player_id, goals, assists, appearances, yellow_cards, red_cards, minutes
+FROM player_stats_from_events
+WHERE player_id IN (SELECT id FROM players);
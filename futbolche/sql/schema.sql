@@ -1,77 +1,136 @@
-PRAGMA foreign_keys = ON;
-
--- =====================================
--- TABLE: clubs
--- =====================================
-CREATE TABLE clubs (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL UNIQUE,
-    city TEXT NOT NULL,
-    founded_year INTEGER NOT NULL
-);
-
--- =====================================
--- TABLE: players
--- =====================================
-CREATE TABLE players (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    club_id INTEGER NOT NULL,
-    full_name TEXT NOT NULL,
-    birth_date TEXT NOT NULL,
-    nationality TEXT NOT NULL,
-    position TEXT NOT NULL CHECK(position IN ('GK','DF','MF','FW')),
-    number INTEGER NOT NULL,
-    status TEXT NOT NULL,
-    FOREIGN KEY (club_id) REFERENCES clubs(id) ON DELETE CASCADE
-);
-
--- =====================================
--- TABLE: matches
--- =====================================
-CREATE TABLE matches (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    home_team_id INTEGER NOT NULL,
-    away_team_id INTEGER NOT NULL,
-    home_goals INTEGER NOT NULL DEFAULT 0,
-    away_goals INTEGER NOT NULL DEFAULT 0,
-    match_date TEXT NOT NULL,
-    league_id INTEGER,
-    FOREIGN KEY (home_team_id) REFERENCES clubs(id) ON DELETE CASCADE,
-    FOREIGN KEY (away_team_id) REFERENCES clubs(id) ON DELETE CASCADE
-    ,
-    FOREIGN KEY (league_id) REFERENCES leagues(id) ON DELETE CASCADE
-);
-
--- =====================================
--- TABLE: leagues
--- =====================================
-CREATE TABLE leagues (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL,
-    season TEXT NOT NULL
-);
-
--- =====================================
--- TABLE: league_teams
--- =====================================
-CREATE TABLE league_teams (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    league_id INTEGER NOT NULL,
-    club_id INTEGER NOT NULL,
-    UNIQUE(league_id, club_id),
-    FOREIGN KEY (league_id) REFERENCES leagues(id) ON DELETE CASCADE,
-    FOREIGN KEY (club_id) REFERENCES clubs(id) ON DELETE CASCADE
-);
-
--- =====================================
--- TABLE: events (match events, player stats)
--- =====================================
-CREATE TABLE events (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    match_id INTEGER NOT NULL,
-    player_id INTEGER,
-    event_type TEXT NOT NULL CHECK(event_type IN ('goal','assist','yellow','red','appearance')),
-    minute INTEGER,
-    FOREIGN KEY (match_id) REFERENCES matches(id) ON DELETE CASCADE,
-    FOREIGN KEY (player_id) REFERENCES players(id) ON DELETE SET NULL
-);
\ No newline at end of file
+PRAGMA foreign_keys = ON;
+
+-- =====================================
+-- TABLE: clubs
+-- =====================================
+CREATE TABLE clubs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    city TEXT NOT NULL,
+    founded_year INTEGER NOT NULL,
+    name_key TEXT
+);
+
+-- =====================================
+-- TABLE: players
+-- =====================================
+CREATE TABLE players (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    club_id INTEGER NOT NULL,
+    full_name TEXT NOT NULL,
+    birth_date TEXT NOT NULL,
+    nationality TEXT NOT NULL,
+    position TEXT NOT NULL CHECK(position IN ('GK','DF','MF','FW')),
+    number INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    name_key TEXT,
+    FOREIGN KEY (club_id) REFERENCES clubs(id) ON DELETE CASCADE
+);
+
+-- =====================================
+-- TABLE: matches
+-- =====================================
+CREATE TABLE matches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    home_team_id INTEGER NOT NULL,
+    away_team_id INTEGER NOT NULL,
+    home_goals INTEGER,  -- NULL until the match is played
+    away_goals INTEGER,
+    match_date TEXT NOT NULL,
+    league_id INTEGER,
+    FOREIGN KEY (home_team_id) REFERENCES clubs(id) ON DELETE CASCADE,
+    FOREIGN KEY (away_team_id) REFERENCES clubs(id) ON DELETE CASCADE
+    ,
+    FOREIGN KEY (league_id) REFERENCES leagues(id) ON DELETE CASCADE
+);
+
+-- =====================================
+-- TABLE: leagues
+-- =====================================
+CREATE TABLE leagues (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    season TEXT NOT NULL,
+    name_key TEXT
+);
+
+-- =====================================
+-- TABLE: league_teams
+-- =====================================
+CREATE TABLE league_teams (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    league_id INTEGER NOT NULL,
+    club_id INTEGER NOT NULL,
+    UNIQUE(league_id, club_id),
+    FOREIGN KEY (league_id) REFERENCES leagues(id) ON DELETE CASCADE,
+    FOREIGN KEY (club_id) REFERENCES clubs(id) ON DELETE CASCADE
+);
+
+-- =====================================
+-- TABLE: events (match events, player stats)
+-- =====================================
+CREATE TABLE events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    match_id INTEGER NOT NULL,
+    player_id INTEGER,
+    event_type TEXT NOT NULL CHECK(event_type IN ('goal','assist','yellow','red','appearance')),
+    minute INTEGER,
+    ingest_key TEXT,  -- idempotency key of a feed event (services/ingest_service.py), NULL otherwise
+    FOREIGN KEY (match_id) REFERENCES matches(id) ON DELETE CASCADE,
+    FOREIGN KEY (player_id) REFERENCES players(id) ON DELETE SET NULL
+);
+
+-- =====================================
+-- INDEXES (see sql/migrations for upgrades of existing databases)
+-- =====================================
+-- Name lookups on casefolded keys: exact (=) and prefix (range) matches
+CREATE INDEX idx_clubs_name_key ON clubs(name_key);
+CREATE INDEX idx_players_name_key ON players(name_key);
+CREATE INDEX idx_leagues_name_key ON leagues(name_key);
+
+-- Squad listings, jersey number checks
+CREATE INDEX idx_players_club_number ON players(club_id, number);
+
+-- Club fixtures (home_team_id = ? OR away_team_id = ?) and league calendars
+CREATE INDEX idx_matches_home_team ON matches(home_team_id);
+CREATE INDEX idx_matches_away_team ON matches(away_team_id);
+CREATE INDEX idx_matches_league_date ON matches(league_id, match_date);
+
+-- league_teams(league_id, club_id) is covered by its UNIQUE constraint
+CREATE INDEX idx_league_teams_club ON league_teams(club_id);
+
+-- Match timelines and per-player event counts
+CREATE INDEX idx_events_match ON events(match_id);
+CREATE INDEX idx_events_player_type ON events(player_id, event_type);
+-- Drops feed events delivered twice (NULL keys never conflict)
+CREATE UNIQUE INDEX idx_events_ingest_key ON events(ingest_key);
+
+
+-- =====================================
+-- TRIGGERS: keep name_key = casefold(name)
+-- casefold() is registered on every connection by db.open_connection()
+-- =====================================
+CREATE TRIGGER trg_clubs_name_key_insert AFTER INSERT ON clubs
+BEGIN
+    UPDATE clubs SET name_key = casefold(NEW.name) WHERE id = NEW.id;
+END;
+CREATE TRIGGER trg_clubs_name_key_update AFTER UPDATE OF name ON clubs
+BEGIN
+    UPDATE clubs SET name_key = casefold(NEW.name) WHERE id = NEW.id;
+END;
+CREATE TRIGGER trg_players_name_key_insert AFTER INSERT ON players
+BEGIN
+    UPDATE players SET name_key = casefold(NEW.full_name) WHERE id = NEW.id;
+END;
+CREATE TRIGGER trg_players_name_key_update AFTER UPDATE OF full_name ON players
+BEGIN
+    UPDATE players SET name_key = casefold(NEW.full_name) WHERE id = NEW.id;
+END;
+CREATE TRIGGER trg_leagues_name_key_insert AFTER INSERT ON leagues
+BEGIN
+    UPDATE leagues SET name_key = casefold(NEW.name) WHERE id = NEW.id;
+END;
+CREATE TRIGGER trg_leagues_name_key_update AFTER UPDATE OF name ON leagues
+BEGIN
+    UPDATE leagues SET name_key = casefold(NEW.name) WHERE id = NEW.id;
+END;
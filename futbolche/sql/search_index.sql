@@ -0,0 +1,42 @@
+-- =====================================
+-- FTS5 trigram search over club and player names
+-- Optional: applied only when SQLite ships FTS5 with the trigram tokenizer
+-- (3.34+). The indexes read the casefolded name_key columns.
+-- =====================================
+CREATE VIRTUAL TABLE IF NOT EXISTS clubs_fts USING fts5(
+    name_key, content='clubs', content_rowid='id', tokenize='trigram'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS players_fts USING fts5(
+    name_key, content='players', content_rowid='id', tokenize='trigram'
+);
+
+-- name_key is filled in by the AFTER INSERT name_key triggers, so index on
+-- name_key updates rather than on insert
+CREATE TRIGGER IF NOT EXISTS trg_clubs_fts_update AFTER UPDATE OF name_key ON clubs
+BEGIN
+    INSERT INTO clubs_fts(clubs_fts, rowid, name_key)
+        SELECT 'delete', OLD.id, OLD.name_key WHERE OLD.name_key IS NOT NULL;
+    INSERT INTO clubs_fts(rowid, name_key)
+        SELECT NEW.id, NEW.name_key WHERE NEW.name_key IS NOT NULL;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_clubs_fts_delete AFTER DELETE ON clubs
+BEGIN
+    INSERT INTO clubs_fts(clubs_fts, rowid, name_key)
+        SELECT 'delete', OLD.id, OLD.name_key WHERE OLD.name_key IS NOT NULL;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_players_fts_update AFTER UPDATE OF name_key ON players
+BEGIN
+    INSERT INTO players_fts(players_fts, rowid, name_key)
+        SELECT 'delete', OLD.id, OLD.name_key WHERE OLD.name_key IS NOT NULL;
+    INSERT INTO players_fts(rowid, name_key)
+        SELECT NEW.id, NEW.name_key WHERE NEW.name_key IS NOT NULL;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_players_fts_delete AFTER DELETE ON players
+BEGIN
+    INSERT INTO players_fts(players_fts, rowid, name_key)
+        SELECT 'delete', OLD.id, OLD.name_key WHERE OLD.name_key IS NOT NULL;
+END;
+
+-- Index rows that existed before the search tables
+INSERT INTO clubs_fts(clubs_fts) VALUES ('rebuild');
+INSERT INTO players_fts(players_fts) VALUES ('rebuild');
@@ -1,13 +1,71 @@
+import functools
 import json
 import os
 import re
-from typing import Tuple, Optional, Dict
+import threading
+import time
+from typing import Tuple, Optional, Dict, List
 
 
 INTENTS_PATH = os.path.join(os.path.dirname(__file__), 'intents.json')
 
+# Seconds between checks of intents.json's mtime for hot reload
+RELOAD_CHECK_INTERVAL = 1.0
 
-def _load_intents():
+# Distinct normalized inputs whose parse results are kept (LRU)
+PARSE_CACHE_SIZE = 1024
+
+
+class IntentModel:
+    """Intents compiled from one version of intents.json.
+
+    `patterns` holds (tag, compiled regex, group names) in file order and
+    `version` increases every time the file is reloaded.
+
+    Every pattern that starts with literal text can only match inputs with
+    the same first word, so `buckets` maps that word to its patterns and
+    parsing evaluates one bucket instead of the whole list. Patterns that
+    start with a placeholder are kept in `wildcard` and merged into every
+    bucket.
+
+    Each bucket is ordered most specific first (see `_specificity`), so the
+    first pattern that matches is the most specific match and the order of
+    intents.json only breaks ties.
+    """
+
+    def __init__(self, intents: list, mtime: Optional[int], version: int):
+        self.intents = intents
+        self.mtime = mtime
+        self.version = version
+        self.patterns: List[Tuple[str, re.Pattern, list]] = []
+        keyed = []
+        for intent in intents:
+            tag = intent.get('tag')
+            for pattern in intent.get('patterns', []):
+                regex, groups = _pattern_to_regex(pattern)
+                self.patterns.append((tag, regex, groups))
+                keyed.append((_first_token(pattern), _specificity(pattern), (tag, regex, groups)))
+
+        # sorted() is stable, so equally specific patterns keep file order
+        keyed.sort(key=lambda item: item[1], reverse=True)
+        self.wildcard = [entry for token, _, entry in keyed if token is None]
+        self.buckets: Dict[str, list] = {}
+        for token, _, _ in keyed:
+            if token is not None and token not in self.buckets:
+                self.buckets[token] = [entry for t, _, entry in keyed if t is None or t == token]
+
+    def candidates(self, text: str) -> list:
+        """Patterns that can match `text` (already stripped and lowercased), most specific first."""
+        first = text.split(None, 1)[0] if text else ''
+        return self.buckets.get(first, self.wildcard)
+
+
+_model: Optional[IntentModel] = None
+_model_lock = threading.Lock()
+_next_check = 0.0
+
+
+def _read_intents_file() -> list:
     try:
         with open(INTENTS_PATH, 'r', encoding='utf-8') as f:
             return json.load(f).get('intents', [])
@@ -15,6 +73,62 @@ def _load_intents():
         return []
 
 
+def _intents_mtime() -> Optional[int]:
+    try:
+        return os.stat(INTENTS_PATH).st_mtime_ns
+    except OSError:
+        return None
+
+
+def get_intent_model() -> IntentModel:
+    """Return the compiled intent model, rebuilding it when intents.json changes.
+
+    The file's mtime is checked at most once per RELOAD_CHECK_INTERVAL.
+    """
+    global _model, _next_check
+    model = _model
+    now = time.monotonic()
+    if model is not None and now < _next_check:
+        return model
+
+    with _model_lock:
+        mtime = _intents_mtime()
+        if _model is None or _model.mtime != mtime:
+            version = _model.version + 1 if _model is not None else 1
+            _model = IntentModel(_read_intents_file(), mtime, version)
+        _next_check = now + RELOAD_CHECK_INTERVAL
+        return _model
+
+
+def reload_intents() -> IntentModel:
+    """Force intents.json to be re-read on the next parse."""
+    global _next_check
+    with _model_lock:
+        _next_check = 0.0
+        if _model is not None:
+            _model.mtime = None
+    return get_intent_model()
+
+
+def _load_intents():
+    return get_intent_model().intents
+
+
+def _first_token(pattern: str) -> Optional[str]:
+    """Leading literal word of a pattern, or None if it starts with a placeholder."""
+    words = pattern.strip().lower().split(None, 1)
+    if not words or re.match(r"\[\w+\]", words[0]):
+        return None
+    return re.split(r"\[\w+\]", words[0], 1)[0]
+
+
+def _specificity(pattern: str) -> Tuple[int, int]:
+    """Sort key for patterns: more literal characters, then fewer placeholders, is more specific."""
+    placeholders = len(re.findall(r"\[\w+\]", pattern))
+    literal = re.sub(r"\[\w+\]|\s+", "", pattern)
+    return len(literal), -placeholders
+
+
 def _pattern_to_regex(pattern: str) -> Tuple[re.Pattern, list]:
     """Convert a pattern with placeholders like [name] into a compiled regex and list of group names."""
     placeholder = r"\[(\w+)\]"
@@ -36,21 +150,47 @@ def _pattern_to_regex(pattern: str) -> Tuple[re.Pattern, list]:
     return re.compile(rf"^{regex}$", re.IGNORECASE), groups
 
 
+def normalize_input(user_input: str) -> str:
+    """Lowercase and collapse whitespace; equal normalized inputs parse the same."""
+    return ' '.join(user_input.lower().split())
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_normalized(text: str) -> Tuple[str, Optional[Dict[str, str]]]:
+    for tag, regex, groups in get_intent_model().candidates(text):
+        m = regex.match(text)
+        if m:
+            params = {k: v.strip() for k, v in m.groupdict().items() if v}
+            return tag, params if params else None
+
+    return 'unknown', None
+
+
+_cached_version = None
+
+
 def parse_input(user_input: str) -> Tuple[str, Optional[Dict[str, str]]]:
     """Parse input and return (intent_tag, params_dict).
 
-    If no intent found returns ("unknown", None).
+    If no intent found returns ("unknown", None). Results are cached by
+    normalized input and the cache is cleared when intents.json is reloaded.
     """
-    text = user_input.strip()
-    intents = _load_intents()
-
-    for intent in intents:
-        tag = intent.get('tag')
-        for pattern in intent.get('patterns', []):
-            regex, groups = _pattern_to_regex(pattern)
-            m = regex.match(text.lower())
-            if m:
-                params = {k: v.strip() for k, v in m.groupdict().items() if v}
-                return tag, params if params else None
+    global _cached_version
+    version = get_intent_model().version
+    if version != _cached_version:
+        _parse_normalized.cache_clear()
+        _cached_version = version
 
-    return 'unknown', None
+    tag, params = _parse_normalized(normalize_input(user_input))
+    # callers may modify params, so never hand out the cached dict
+    return tag, dict(params) if params else None
+
+
+def parse_cache_info() -> Dict[str, int]:
+    """Hit/miss counters of the parse cache since the last intents reload."""
+    info = _parse_normalized.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'maxsize': info.maxsize}
+
+
+def clear_parse_cache():
+    _parse_normalized.cache_clear()
@@ -1,193 +1,367 @@
-from typing import Optional, Dict
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+import db
 from services.clubs_service import create_club, list_clubs, delete_club, update_club
 import services.players_service as players
 import services.matches_service as matches
-from .nlu import _load_intents
+from .nlu import get_intent_model
 import services.statistics_service as stats
 import services.transfers_service as transfers
+import services.search_service as search
 
 
 CATEGORIES = {
     "Клубове": ["add_club", "list_clubs", "update_club", "delete_club"],
     "Играчи": ["add_player", "list_players", "list_all_players", "update_player_position", "update_player_number", "update_player_status", "delete_player", "transfer_player"],
     "Статистика": ["club_statistics", "player_statistics", "player_metrics"],
-    "Мачове": ["record_match", "show_match", "record_event", "get_fixtures"],
+    "Мачове": ["record_match", "show_match", "record_event", "record_events", "get_fixtures"],
     "Лиги": ["create_league", "add_club_to_league", "get_league_teams", "generate_round_robin", "get_standings"],
+    "Търсене": ["search"],
 }
 
 
+UNKNOWN_RESPONSE = "Не разбирам командата. Напишете 'помощ'."
+
+
+class Route(NamedTuple):
+    handler: Callable[[Dict[str, str]], str]
+    required: Tuple[str, ...]
+    error: Optional[str]
+    # Tables a read-only handler depends on; its responses are cached
+    reads: Tuple[str, ...] = ()
+
+
+# intent tag -> Route; filled by @route below
+ROUTES: Dict[str, Route] = {}
+
+
+def route(tag: str, required: Tuple[str, ...] = (), error: Optional[str] = None,
+          reads: Tuple[str, ...] = ()):
+    """Register a handler for `tag`.
+
+    The handler receives the params dict (empty if the NLU found none) and is
+    only called when every name in `required` is present; otherwise `error`
+    is returned. Handlers that only read data declare the tables in `reads`
+    and their responses are served from `response_cache` until one of those
+    tables is written.
+    """
+    def decorator(handler):
+        ROUTES[tag] = Route(handler, tuple(required), error, tuple(reads))
+        return handler
+    return decorator
+
+
+class ResponseCache:
+    """LRU cache of read-only intent responses keyed by (intent, normalized params).
+
+    Each entry remembers `db.write_version()` of the tables its handler reads
+    and is recomputed once that version moves on.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    @staticmethod
+    def key(intent: str, params: Dict[str, str]) -> tuple:
+        return (intent,) + tuple(sorted((k, ' '.join(str(v).split())) for k, v in params.items()))
+
+    def get_or_compute(self, intent: str, params: Dict[str, str], entry: Route) -> str:
+        key = self.key(intent, params)
+        version = db.write_version(*entry.reads)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                if cached[0] == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return cached[1]
+                self.stale += 1
+            self.misses += 1
+
+        response = entry.handler(params)
+        with self._lock:
+            self._entries[key] = (version, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return response
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'stale': self.stale,
+                    'size': len(self._entries), 'maxsize': self.maxsize}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.stale = 0
+
+
+response_cache = ResponseCache()
+
+
 def handle_intent(intent: str, params: Optional[Dict[str, str]]) -> str:
     """Route intent to the appropriate service and return presentation string."""
-    if intent == 'help':
-        help_lines = ["Налични команди:"]
-        intents = _load_intents()
-        intent_tags = {i.get('tag') for i in intents if i.get('tag')}
-
-        for category, tags in CATEGORIES.items():
-            cmds = []
-            for tag in tags:
-                if tag in intent_tags:
-                    for i in intents:
-                        if i.get('tag') == tag:
-                            examples = i.get('examples', [])
-                            if examples:
-                                cmds.append(f"- {examples[0]}")
-                            break
-            if cmds:
-                help_lines.append(f"\n{category}:")
-                help_lines.extend(cmds)
-
-        help_lines.append("\n\nДруги:")
-        help_lines.append("- изход (затвори чатбота)")
-        help_lines.append("- помощ (покажи тази помощ)")
-
-        return "\n".join(help_lines)
-
-    if intent == 'exit':
-        return 'exit'
-
-    # --- Clubs ---
-    if intent == 'add_club':
-        if not params or 'club_name' not in params:
-            return "Името не може да бъде празно. Формат: добави клуб [име]"
-        return create_club(params['club_name'])
-
-    if intent == 'list_clubs':
-        return list_clubs()
-
-    if intent == 'delete_club':
-        if not params or 'club_name' not in params:
-            return "Укажете име на клуба. Формат: изтрий клуб [име]"
-        return delete_club(params['club_name'])
-
-    if intent == 'update_club':
-        if not params:
-            return "Невалидни параметри."
-        old = params.get('club_name') or params.get('club')
-        new = params.get('new_name')
-        if not old or not new:
-            return "Формат: редактирай клуб [старо име] на [ново име]"
-        return update_club(old, new_name=new)
-
-    # --- Players ---
-    if intent == 'add_player':
-        required = ['full_name', 'club_identifier', 'position', 'number', 'nationality', 'birth_date', 'status']
-        # Allow shorthand minimal command: full_name and club_identifier
-        if not params or 'full_name' not in params or 'club_identifier' not in params:
-            return ("Недостатъчни параметри. Формат: добави играч [full_name] в клуб [club_identifier] "
-                    "позиция [position] номер [number] националност [nationality] дата на раждане [birth_date] статус [status]")
-
-        club_id = players.get_club_id(params['club_identifier'])
-        if not club_id:
-            return f"Клуб '{params['club_identifier']}' не съществува."
-
-        return players.add_player(
-            club_id,
-            params['full_name'],
-            params.get('birth_date'),
-            params.get('nationality'),
-            params.get('position'),
-            params.get('number'),
-            params.get('status')
-        )
-
-    if intent == 'list_players':
-        if params and 'club_identifier' in params:
-            return players.get_players_by_club(params['club_identifier'])
-        return players.get_players_by_club()
-
-    if intent == 'list_all_players':
-        return players.get_players_by_club()
-
-    if intent == 'update_player_position':
-        if not params or 'player_identifier' not in params or 'new_position' not in params:
-            return "Недостатъчни параметри. Формат: смени позиция на [player_identifier] на [new_position]"
-        return players.update_player_position(params['player_identifier'], params['new_position'])
-
-    if intent == 'update_player_number':
-        if not params or 'player_identifier' not in params or 'new_number' not in params:
-            return "Недостатъчни параметри. Формат: смени номер на [player_identifier] на [new_number]"
-        return players.update_player_number(params['player_identifier'], params['new_number'])
-
-    if intent == 'update_player_status':
-        if not params or 'player_identifier' not in params or 'new_status' not in params:
-            return "Недостатъчни параметри. Формат: смени статус на [player_identifier] на [new_status]"
-        return players.update_player_status(params['player_identifier'], params['new_status'])
-
-    if intent == 'delete_player':
-        if not params or 'player_identifier' not in params:
-            return "Укажете играч за изтриване. Формат: изтрий играч [player_identifier]"
-        return players.delete_player(params['player_identifier'])
-
-    # Statistics
-    if intent == 'club_statistics':
-        if not params or 'club_identifier' not in params:
-            return "Недостатъчни параметри. Формат: покажи статистика на клуб [club_identifier]"
-        stats_res = stats.get_club_statistics(params['club_identifier'])
-        if not stats_res:
-            return f"Клуб '{params['club_identifier']}' не съществува."
-        return (f"Статистика за клуб {params['club_identifier']}:\n"
-                f"Игри: {stats_res['played']}, Победи: {stats_res['wins']}, Равни: {stats_res['draws']}, Загуби: {stats_res['losses']},\n"
-                f"Голове за: {stats_res['goals_for']}, Голове срещу: {stats_res['goals_against']}, Голова разлика: {stats_res['goal_difference']}, Точки: {stats_res['points']}")
-
-    if intent == 'player_statistics':
-        if not params or 'player_identifier' not in params:
-            return "Недостатъчни параметри. Формат: покажи статистика на играч [player_identifier]"
-        stats_res = stats.get_player_statistics(params['player_identifier'])
-        if not stats_res:
-            return f"Играч '{params['player_identifier']}' не съществува."
-        return (f"Статистика за играч {params['player_identifier']}:\n"
-                f"Голове: {stats_res['goals']}, Асистенции: {stats_res['assists']},\n"
-                f"Появи: {stats_res['appearances']}, Жълти: {stats_res['yellow_cards']}, Червени: {stats_res['red_cards']}")
-
-    if intent == 'player_metrics':
-        if not params or 'player_identifier' not in params:
-            return "Недостатъчни параметри. Формат: покажи метрики на играч [player_identifier]"
-        adv = stats.get_player_advanced_metrics(params['player_identifier'])
-        if not adv:
-            return f"Играч '{params['player_identifier']}' не съществува."
-        return (f"Разширени метрики за {params['player_identifier']}:\n"
-                f"Мин. (прибл.): {adv['minutes_played']}, Гол/90: {adv['goals_per_90']}, Асист/90: {adv['assists_per_90']}")
-
-    # --- Matches & Events ---
-    if intent == 'record_match':
-        if not params:
-            return "Недостатъчни параметри. Формат: запиши мач [home_team] срещу [away_team] дата [match_date] резултат [home_goals]-[away_goals]"
-        return matches.record_match(
-            params.get('home_team'),
-            params.get('away_team'),
-            params.get('match_date'),
-            params.get('home_goals'),
-            params.get('away_goals'),
-            params.get('league')
-        )
-
-    if intent == 'show_match':
-        if not params or 'match_id' not in params:
-            return "Формат: покажи мач [match_id]"
-        m = matches.get_match(params['match_id'])
-        if not m:
-            return "Мачът не е намерен."
-        return f"{m['match_date']}: {m['home_name']} {m['home_goals']}-{m['away_goals']} {m['away_name']}"
-
-    if intent == 'record_event':
-        if not params or 'match_id' not in params or 'event_type' not in params:
-            return "Недостатъчни параметри. Формат: запиши събитие [event_type] [player_identifier] в мач [match_id] минута [minute]"
-        return matches.record_event(
-            params.get('match_id'),
-            params.get('player_identifier'),
-            params.get('event_type'),
-            params.get('minute')
-        )
-
-    if intent == 'get_standings':
-        if not params or 'league_identifier' not in params:
-            return "Формат: покажи класиране [league_identifier]"
-        return matches.get_league_standings(params['league_identifier'])
-
-    if intent == 'transfer_player':
-        if not params or 'player_identifier' not in params or 'club_identifier' not in params:
-            return "Недостатъчни параметри. Формат: трансферирай играч [player_identifier] в клуб [club_identifier]"
-        return transfers.transfer_player(params['player_identifier'], params['club_identifier'])
-
-    return "Не разбирам командата. Напишете 'помощ'."
+    entry = ROUTES.get(intent)
+    if entry is None:
+        return UNKNOWN_RESPONSE
+    handler, required, error, reads = entry
+    if params is None:
+        params = {}
+    for name in required:
+        if name not in params:
+            return error
+    if reads:
+        return response_cache.get_or_compute(intent, params, entry)
+    return handler(params)
+
+
+# intents version -> {None: full help, category key: help for that category}
+_help_pages: Dict[int, Dict[Optional[str], str]] = {}
+
+
+def _category_key(category: str) -> str:
+    return category.casefold()
+
+
+def _build_help_pages(intents: list) -> Dict[Optional[str], str]:
+    examples = {}
+    for i in intents:
+        tag = i.get('tag')
+        if tag and tag not in examples and i.get('examples'):
+            examples[tag] = i['examples'][0]
+
+    help_lines = ["Налични команди:"]
+    pages = {}
+    for category, tags in CATEGORIES.items():
+        cmds = [f"- {examples[tag]}" for tag in tags if tag in examples]
+        if cmds:
+            help_lines.append(f"\n{category}:")
+            help_lines.extend(cmds)
+            pages[_category_key(category)] = "\n".join([f"{category}:"] + cmds)
+
+    help_lines.append("\n\nДруги:")
+    help_lines.append("- изход (затвори чатбота)")
+    help_lines.append("- помощ (покажи тази помощ)")
+    help_lines.append("- помощ [категория] (само командите от категорията)")
+
+    pages[None] = "\n".join(help_lines)
+    return pages
+
+
+def get_help(category: Optional[str] = None) -> str:
+    """Help text, whole or for one category, built once per intents.json version."""
+    model = get_intent_model()
+    pages = _help_pages.get(model.version)
+    if pages is None:
+        pages = _build_help_pages(model.intents)
+        _help_pages.clear()
+        _help_pages[model.version] = pages
+
+    if not category:
+        return pages[None]
+    page = pages.get(_category_key(category.strip()))
+    if page is None:
+        names = ", ".join(_category_key(c) for c in CATEGORIES if _category_key(c) in pages)
+        return f"Няма категория '{category.strip()}'. Категории: {names}"
+    return page
+
+
+@route('help')
+def _help(params):
+    return get_help(params.get('category'))
+
+
+@route('exit')
+def _exit(params):
+    return 'exit'
+
+
+# --- Clubs ---
+@route('add_club', ('club_name',), "Името не може да бъде празно. Формат: добави клуб [име]")
+def _add_club(params):
+    return create_club(params['club_name'])
+
+
+@route('list_clubs', reads=('clubs',))
+def _list_clubs(params):
+    return list_clubs()
+
+
+@route('delete_club', ('club_name',), "Укажете име на клуба. Формат: изтрий клуб [име]")
+def _delete_club(params):
+    return delete_club(params['club_name'])
+
+
+@route('update_club')
+def _update_club(params):
+    if not params:
+        return "Невалидни параметри."
+    old = params.get('club_name') or params.get('club')
+    new = params.get('new_name')
+    if not old or not new:
+        return "Формат: редактирай клуб [старо име] на [ново име]"
+    return update_club(old, new_name=new)
+
+
+# --- Players ---
+# Allow shorthand minimal command: full_name and club_identifier
+@route('add_player', ('full_name', 'club_identifier'),
+       "Недостатъчни параметри. Формат: добави играч [full_name] в клуб [club_identifier] "
+       "позиция [position] номер [number] националност [nationality] дата на раждане [birth_date] статус [status]")
+def _add_player(params):
+    club_id = players.get_club_id(params['club_identifier'])
+    if not club_id:
+        return f"Клуб '{params['club_identifier']}' не съществува."
+
+    return players.add_player(
+        club_id,
+        params['full_name'],
+        params.get('birth_date'),
+        params.get('nationality'),
+        params.get('position'),
+        params.get('number'),
+        params.get('status')
+    )
+
+
+@route('list_players')
+def _list_players(params):
+    if 'club_identifier' in params:
+        return players.get_players_by_club(params['club_identifier'])
+    return players.get_players_by_club()
+
+
+@route('list_all_players', reads=('players', 'clubs'))
+def _list_all_players(params):
+    return players.get_players_by_club()
+
+
+@route('update_player_position', ('player_identifier', 'new_position'),
+       "Недостатъчни параметри. Формат: смени позиция на [player_identifier] на [new_position]")
+def _update_player_position(params):
+    return players.update_player_position(params['player_identifier'], params['new_position'])
+
+
+@route('update_player_number', ('player_identifier', 'new_number'),
+       "Недостатъчни параметри. Формат: смени номер на [player_identifier] на [new_number]")
+def _update_player_number(params):
+    return players.update_player_number(params['player_identifier'], params['new_number'])
+
+
+@route('update_player_status', ('player_identifier', 'new_status'),
+       "Недостатъчни параметри. Формат: смени статус на [player_identifier] на [new_status]")
+def _update_player_status(params):
+    return players.update_player_status(params['player_identifier'], params['new_status'])
+
+
+@route('delete_player', ('player_identifier',), "Укажете играч за изтриване. Формат: изтрий играч [player_identifier]")
+def _delete_player(params):
+    return players.delete_player(params['player_identifier'])
+
+
+@route('transfer_player', ('player_identifier', 'club_identifier'),
+       "Недостатъчни параметри. Формат: трансферирай играч [player_identifier] в клуб [club_identifier]")
+def _transfer_player(params):
+    return transfers.transfer_player(params['player_identifier'], params['club_identifier'])
+
+
+# --- Statistics ---
+@route('club_statistics', ('club_identifier',),
+       "Недостатъчни параметри. Формат: покажи статистика на клуб [club_identifier]",
+       reads=('clubs', 'matches'))
+def _club_statistics(params):
+    stats_res = stats.get_club_statistics(params['club_identifier'])
+    if not stats_res:
+        return f"Клуб '{params['club_identifier']}' не съществува."
+    return (f"Статистика за клуб {params['club_identifier']}:\n"
+            f"Игри: {stats_res['played']}, Победи: {stats_res['wins']}, Равни: {stats_res['draws']}, Загуби: {stats_res['losses']},\n"
+            f"Голове за: {stats_res['goals_for']}, Голове срещу: {stats_res['goals_against']}, Голова разлика: {stats_res['goal_difference']}, Точки: {stats_res['points']}")
+
+
+@route('player_statistics', ('player_identifier',),
+       "Недостатъчни параметри. Формат: покажи статистика на играч [player_identifier]")
+def _player_statistics(params):
+    stats_res = stats.get_player_statistics(params['player_identifier'])
+    if not stats_res:
+        return f"Играч '{params['player_identifier']}' не съществува."
+    return (f"Статистика за играч {params['player_identifier']}:\n"
+            f"Голове: {stats_res['goals']}, Асистенции: {stats_res['assists']},\n"
+            f"Появи: {stats_res['appearances']}, Жълти: {stats_res['yellow_cards']}, Червени: {stats_res['red_cards']}")
+
+
+@route('player_metrics', ('player_identifier',),
+       "Недостатъчни параметри. Формат: покажи метрики на играч [player_identifier]")
+def _player_metrics(params):
+    adv = stats.get_player_advanced_metrics(params['player_identifier'])
+    if not adv:
+        return f"Играч '{params['player_identifier']}' не съществува."
+    return (f"Разширени метрики за {params['player_identifier']}:\n"
+            f"Мин. (прибл.): {adv['minutes_played']}, Гол/90: {adv['goals_per_90']}, Асист/90: {adv['assists_per_90']}")
+
+
+# --- Matches & Events ---
+@route('record_match')
+def _record_match(params):
+    if not params:
+        return "Недостатъчни параметри. Формат: запиши мач [home_team] срещу [away_team] дата [match_date] резултат [home_goals]-[away_goals]"
+    return matches.record_match(
+        params.get('home_team'),
+        params.get('away_team'),
+        params.get('match_date'),
+        params.get('home_goals'),
+        params.get('away_goals'),
+        params.get('league')
+    )
+
+
+@route('show_match', ('match_id',), "Формат: покажи мач [match_id]")
+def _show_match(params):
+    m = matches.get_match(params['match_id'])
+    if not m:
+        return "Мачът не е намерен."
+    return f"{m['match_date']}: {m['home_name']} {m['home_goals']}-{m['away_goals']} {m['away_name']}"
+
+
+@route('record_event', ('match_id', 'event_type'),
+       "Недостатъчни параметри. Формат: запиши събитие [event_type] [player_identifier] в мач [match_id] минута [minute]")
+def _record_event(params):
+    return matches.record_event(
+        params.get('match_id'),
+        params.get('player_identifier'),
+        params.get('event_type'),
+        params.get('minute')
+    )
+
+
+@route('record_events', ('match_id', 'events'),
+       "Формат: запиши събития за мач [match_id], после по едно събитие на ред или разделени с ';': [събитие] [играч] [минута]")
+def _record_events(params):
+    events, bad = matches.parse_event_lines(params['events'])
+    if bad:
+        return f"Неразпознати събития: {'; '.join(bad)}. Формат: [събитие] [играч] [минута], напр. 'гол Иван Иванов 23'."
+    return matches.record_events_bulk(params['match_id'], events)
+
+
+@route('get_standings', ('league_identifier',), "Формат: покажи класиране [league_identifier]",
+       reads=('leagues', 'league_teams', 'clubs', 'matches'))
+def _get_standings(params):
+    return matches.get_league_standings(params['league_identifier'])
+
+
+@route('get_fixtures', ('league_identifier',), "Формат: покажи мачове в лига [league_identifier]",
+       reads=('leagues', 'clubs', 'matches'))
+def _get_fixtures(params):
+    return matches.get_league_fixtures(params['league_identifier'])
+
+
+# --- Search ---
+@route('search', ('query',), "Укажете какво да търся. Формат: търси [текст]")
+def _search(params):
+    return search.search(params['query'])
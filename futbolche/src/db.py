@@ -1,307 +1,783 @@
-import os
-import sqlite3
-from sqlite3 import Error
-
-# Get the directory where this db.py file is located
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "..", "sql", "football.db")
-SCHEMA_PATH = os.path.join(BASE_DIR, "..", "sql", "schema.sql")
-
-def initialize_database():
-    """Create tables if they don't exist and populate with sample data"""
-    db_exists = os.path.exists(DB_PATH)
-    
-    if not db_exists:
-        print(f"[DB] Creating new database at {DB_PATH}")
-    else:
-        # Check if tables exist
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='clubs'")
-        if cursor.fetchone():
-            conn.close()
-            return  # Database already initialized
-        conn.close()
-
-    # Read schema and create tables
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    with open(SCHEMA_PATH, 'r', encoding='utf-8') as f:
-        schema_sql = f.read()
-        cursor.executescript(schema_sql)
-    
-    # Insert sample clubs data
-    sample_clubs = [
-        ("Левски София", "София", 1914),
-        ("ЦСКА София", "София", 1948),
-        ("Ботев Пловдив", "Пловдив", 1912),
-        ("Лудогорец Разград", "Разград", 1945),
-        ("Черно море Варна", "Варна", 1913),
-        ("Спартак Варна", "Варна", 1929),
-        ("Локомотив Пловдив", "Пловдив", 1926),
-        ("Берое Стара Загора", "Стара Загора", 1916)
-    ]
-    for club in sample_clubs:
-        cursor.execute(
-            "INSERT INTO clubs (name, city, founded_year) VALUES (?, ?, ?)",
-            club
-        )
-
-    # Insert sample players data
-    sample_players = [
-        # Levski Sofia players
-        (1, "Иван Иванов", "1995-03-15", "България", "GK", 1, "Активен"),
-        (1, "Петър Петров", "1998-07-22", "България", "DF", 4, "Активен"),
-        (1, "Мария Георгиева", "1997-11-08", "България", "MF", 10, "Активен"),
-        (1, "Александър Николов", "1996-01-30", "България", "FW", 9, "Активен"),
-        (1, "Николай Костов", "1999-09-18", "България", "DF", 2, "Активен"),
-        
-        # CSKA Sofia players
-        (2, "Георги Димитров", "1994-05-12", "България", "GK", 1, "Активен"),
-        (2, "Димитър Иванов", "1997-12-25", "България", "MF", 8, "Активен"),
-        (2, "Кристиян Стоянов", "1998-04-03", "България", "FW", 11, "Активен"),
-        (2, "Васил Андреев", "1996-06-14", "България", "DF", 3, "Активен"),
-        (2, "Радослав Недев", "1995-02-20", "България", "MF", 6, "Активен"),
-        
-        # Botev Plovdiv players
-        (3, "Мартин Камиларов", "1996-02-14", "България", "GK", 1, "Активен"),
-        (3, "Илия Илиев", "1995-08-20", "България", "DF", 5, "Активен"),
-        (3, "Радослав Стоянов", "1999-10-11", "България", "MF", 7, "Активен"),
-        (3, "Васил Лечков", "1997-06-06", "България", "FW", 9, "Активен"),
-        (3, "Кирил Симов", "1998-03-12", "България", "DF", 2, "Активен"),
-        
-        # Ludogorets players
-        (4, "Владислав Стоянов", "1995-01-18", "България", "GK", 1, "Активен"),
-        (4, "Калоян Стоянов", "1998-03-25", "България", "DF", 2, "Активен"),
-        (4, "Ивелин Попов", "1996-07-14", "България", "MF", 6, "Активен"),
-        (4, "Клавдиу Кейсел", "1997-12-01", "Румъния", "FW", 10, "Активен"),
-        (4, "Жуан Пауло", "1999-05-15", "Бразилия", "MF", 8, "Активен"),
-        
-        # Cherno More Varna players
-        (5, "Димитър Манолов", "1994-11-22", "България", "GK", 1, "Активен"),
-        (5, "Павел Виданов", "1998-01-15", "България", "DF", 4, "Активен"),
-        (5, "Атанас Пиров", "1996-09-30", "България", "MF", 8, "Активен"),
-        (5, "Иван Стоянов", "1999-05-05", "България", "FW", 11, "Активен"),
-        (5, "Мартин Тодоров", "1997-04-22", "България", "DF", 3, "Активен"),
-        
-        # Spartak Varna players
-        (6, "Георги Георгиев", "1995-08-10", "България", "GK", 1, "Активен"),
-        (6, "Кристиян Камбулов", "1998-12-03", "България", "DF", 5, "Активен"),
-        (6, "Александър Михалков", "1996-02-28", "България", "MF", 7, "Активен"),
-        (6, "Борислав Димитров", "1999-07-19", "България", "FW", 10, "Активен"),
-        
-        # Lokomotiv Plovdiv players
-        (7, "Иван Колев", "1994-06-25", "България", "GK", 1, "Активен"),
-        (7, "Петър Стайков", "1997-11-14", "България", "DF", 4, "Активен"),
-        (7, "Мартин Димитров", "1998-09-30", "България", "MF", 8, "Активен"),
-        (7, "Николай Николов", "1996-01-08", "България", "FW", 9, "Активен"),
-        (7, "Димитър Димитров", "1999-03-17", "България", "MF", 6, "Активен"),
-        
-        # Beroe Stara Zagora players
-        (8, "Атанас Атанасов", "1995-10-12", "България", "GK", 1, "Активен"),
-        (8, "Иван Иванов", "1998-07-23", "България", "DF", 3, "Активен"),
-        (8, "Георги Попов", "1997-02-14", "България", "MF", 7, "Активен"),
-        (8, "Кирил Кирилов", "1999-12-01", "България", "FW", 11, "Активен")
-    ]
-    
-    for player in sample_players:
-        cursor.execute(
-            """INSERT INTO players (club_id, full_name, birth_date, nationality, position, number, status)
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
-            player
-        )
-    
-    
-    conn.commit()
-    conn.close()
-    print("[DB] Database initialized successfully with sample data")
-
-    # Insert some sample matches and events to support statistics
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    # Sample matches: Levski(1) vs CSKA(2) 2-1, Levski(1) vs Botev(3) 0-0, CSKA(2) vs Botev(3) 1-3
-    cursor.execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) VALUES (?, ?, ?, ?, ?)", (1, 2, 2, 1, '2025-08-01'))
-    m1 = cursor.lastrowid
-    cursor.execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) VALUES (?, ?, ?, ?, ?)", (1, 3, 0, 0, '2025-08-08'))
-    m2 = cursor.lastrowid
-    cursor.execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) VALUES (?, ?, ?, ?, ?)", (2, 3, 1, 3, '2025-08-15'))
-    m3 = cursor.lastrowid
-
-    # Additional sample matches to flesh out the demo dataset
-    cursor.execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) VALUES (?, ?, ?, ?, ?)", (4, 5, 1, 2, '2025-08-02'))
-    m4 = cursor.lastrowid
-    cursor.execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) VALUES (?, ?, ?, ?, ?)", (6, 7, 0, 1, '2025-08-03'))
-    m5 = cursor.lastrowid
-    cursor.execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) VALUES (?, ?, ?, ?, ?)", (8, 7, 2, 2, '2025-08-04'))
-    m6 = cursor.lastrowid
-    cursor.execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) VALUES (?, ?, ?, ?, ?)", (2, 4, 3, 1, '2025-08-05'))
-    m7 = cursor.lastrowid
-    cursor.execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) VALUES (?, ?, ?, ?, ?)", (3, 5, 1, 1, '2025-08-06'))
-    m8 = cursor.lastrowid
-
-    # Sample events: goals and assists for some players
-    # Player ids from sample data: Ivan Ivanov (Levski) id may be 1, but fetch dynamically
-    cursor.execute("SELECT id FROM players WHERE full_name = ?", ("Иван Иванов",))
-    row = cursor.fetchone()
-    if row:
-        pid_ivan = row[0]
-        cursor.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)", (m1, pid_ivan, 'goal', 23))
-        cursor.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)", (m2, pid_ivan, 'appearance', 0))
-
-    # Add a goal for a CSKA player
-    cursor.execute("SELECT id FROM players WHERE full_name = ?", ("Кристиян Стоянов",))
-    row = cursor.fetchone()
-    if row:
-        pid_krist = row[0]
-        cursor.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)", (m1, pid_krist, 'goal', 67))
-
-    # Additional events for demo: goals, assists, bookings across different matches/players
-    cursor.execute("SELECT id FROM players WHERE full_name = ? AND club_id = 2", ("Димитър Иванов",))
-    row = cursor.fetchone()
-    if row:
-        pid_dim = row[0]
-        cursor.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)", (m7, pid_dim, 'goal', 54))
-
-    cursor.execute("SELECT id FROM players WHERE full_name = ? AND club_id = 3", ("Васил Лечков",))
-    row = cursor.fetchone()
-    if row:
-        pid_vasil = row[0]
-        cursor.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)", (m3, pid_vasil, 'goal', 12))
-        cursor.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)", (m3, pid_vasil, 'assist', 33))
-
-    cursor.execute("SELECT id FROM players WHERE full_name = ? AND club_id = 4", ("Ивелин Попов",))
-    row = cursor.fetchone()
-    if row:
-        pid_ip = row[0]
-        cursor.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)", (m4, pid_ip, 'yellow', 77))
-
-    cursor.execute("SELECT id FROM players WHERE full_name = ? AND club_id = 6", ("Борислав Димитров",))
-    row = cursor.fetchone()
-    if row:
-        pid_boris = row[0]
-        cursor.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)", (m5, pid_boris, 'goal', 85))
-
-    conn.commit()
-    conn.close()
-
-def get_connection():
-    try:
-        # Ensure database is initialized
-        initialize_database()
-
-        conn = sqlite3.connect(DB_PATH)
-        # Ensure foreign key enforcement for each connection
-        try:
-            conn.execute('PRAGMA foreign_keys = ON')
-        except Exception:
-            pass
-        conn.row_factory = sqlite3.Row
-        return conn
-    except Exception as e:
-        # Catch all exceptions (including mocks that raise generic Exception)
-        print(f"[DB ERROR] {e}")
-        return None
-
-
-def execute_query(query, params=(), fetch=False):
-    conn = get_connection()
-    if not conn:
-        return None
-
-    try:
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-
-        if fetch:
-            results = cursor.fetchall()
-            if not results:
-                return None
-            return results
-
-        conn.commit()
-        return True
-
-    except Error as e:
-        print(f"[QUERY ERROR] {e}")
-        return None
-
-    finally:
-        conn.close()
-
-
-def connect():
-    """Return a new DB connection (initialized)."""
-    return get_connection()
-
-
-def execute(query: str, params=(), commit: bool = True):
-    """Execute a query (INSERT/UPDATE/DELETE) and optionally commit.
-
-    Returns lastrowid on insert, True on success, or None on error.
-    """
-    conn = get_connection()
-    if not conn:
-        return None
-
-    try:
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        if commit:
-            conn.commit()
-
-        lastrowid = cursor.lastrowid
-        return lastrowid if lastrowid else True
-
-    except Error as e:
-        print(f"[DB EXECUTE ERROR] {e}")
-        return None
-
-    finally:
-        conn.close()
-
-
-def fetch_all(query: str, params=()):
-    """Fetch all rows for a SELECT query. Returns list of sqlite3.Row or empty list."""
-    conn = get_connection()
-    if not conn:
-        return []
-
-    try:
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        return rows
-    except Error as e:
-        print(f"[DB FETCH_ALL ERROR] {e}")
-        return []
-    finally:
-        conn.close()
-
-
-def fetch_one(query: str, params=()):
-    """Fetch a single row for a SELECT query. Returns sqlite3.Row or None."""
-    rows = fetch_all(query, params)
-    if rows:
-        return rows[0]
-    return None
-
-
-def commit(conn):
-    """Commit a provided connection (best-effort)."""
-    try:
-        if conn:
-            conn.commit()
-    except Exception:
-        pass
-
-
-def rollback(conn):
-    """Rollback a provided connection (best-effort)."""
-    try:
-        if conn:
-            conn.rollback()
-    except Exception:
-        pass
-
-
+import atexit
+import itertools
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from sqlite3 import Error
+
+from utils.text import name_key
+
+# Get the directory where this db.py file is located
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_PATH = os.path.join(BASE_DIR, "..", "sql", "schema.sql")
+MIGRATIONS_DIR = os.path.join(BASE_DIR, "..", "sql", "migrations")
+SEARCH_INDEX_PATH = os.path.join(BASE_DIR, "..", "sql", "search_index.sql")
+CLUB_STATS_PATH = os.path.join(BASE_DIR, "..", "sql", "club_stats.sql")
+PLAYER_STATS_PATH = os.path.join(BASE_DIR, "..", "sql", "player_stats.sql")
+
+# Database location and pragma profile can be overridden from the environment:
+#   FUTBOLCHE_DB_PATH=/var/lib/futbolche/football.db
+#   FUTBOLCHE_DB_PROFILE=safe
+DB_PATH = os.environ.get("FUTBOLCHE_DB_PATH") or os.path.join(BASE_DIR, "..", "sql", "football.db")
+DB_PROFILE = os.environ.get("FUTBOLCHE_DB_PROFILE") or "performance"
+
+# Named pragma profiles applied once to every new connection
+PRAGMA_PROFILES = {
+    # SQLite defaults: rollback journal, fsync on every commit
+    "safe": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+    # WAL lets readers and a writer work concurrently; reads go through mmap
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,       # KiB when negative, i.e. 64 MiB
+        "mmap_size": 268435456,     # 256 MiB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,       # ms to wait on a locked database
+    },
+}
+
+
+def get_pragma_profile(name: str = None) -> dict:
+    """Return the pragma settings for a profile name (default: `DB_PROFILE`)."""
+    name = name or DB_PROFILE
+    profile = PRAGMA_PROFILES.get(name)
+    if profile is None:
+        print(f"[DB] Unknown profile '{name}', using 'performance'")
+        profile = PRAGMA_PROFILES["performance"]
+    return profile
+
+
+def open_connection(path: str = None, profile: str = None):
+    """Open a new connection with foreign keys, casefold() and the pragma profile applied."""
+    conn = sqlite3.connect(path or DB_PATH, check_same_thread=False)
+    # Used by the name_key triggers and lookups (SQLite's LOWER only folds ASCII)
+    conn.create_function('casefold', 1, name_key, deterministic=True)
+    # Ensure foreign key enforcement for each connection
+    try:
+        conn.execute('PRAGMA foreign_keys = ON')
+    except Exception:
+        pass
+    for pragma, value in get_pragma_profile(profile).items():
+        try:
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        except Error as e:
+            print(f"[DB PRAGMA ERROR] {pragma}: {e}")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+# Bump together with sql/schema.sql and add sql/migrations/<version>_*.sql;
+# stored in the database as PRAGMA user_version
+SCHEMA_VERSION = 8
+
+# Database paths this process has already initialized (see initialize_database)
+_initialized_paths = set()
+_init_lock = threading.Lock()
+
+
+def initialize_database():
+    """Create tables if they don't exist, populate sample data and stamp the schema version.
+
+    This is an explicit startup step. The query helpers never probe the schema
+    themselves; they only fall back to calling this once for a database path
+    the process has not initialized yet.
+    """
+    path = DB_PATH
+    with _init_lock:
+        created = not os.path.exists(path)
+        if created:
+            print(f"[DB] Creating new database at {path}")
+
+        conn = open_connection(path)
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version == 0:
+                cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='clubs'")
+                if cursor.fetchone():
+                    # Databases created before versioning have the version 1 tables
+                    version = 1
+                else:
+                    _create_schema(conn)
+                    _seed_sample_data(conn)
+                    print("[DB] Database initialized successfully with sample data")
+                    version = SCHEMA_VERSION
+            if version < SCHEMA_VERSION:
+                _apply_migrations(conn, version)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+        finally:
+            conn.close()
+
+        if created and _pool is not None and _pool.path == path:
+            # Pooled connections still point at a file that no longer exists
+            close_pool()
+        _initialized_paths.add(path)
+
+
+def _create_schema(conn):
+    with open(SCHEMA_PATH, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+    _create_search_index(conn)
+    _create_club_stats(conn)
+    _create_player_stats(conn)
+
+
+def _create_search_index(conn):
+    """Create the optional FTS5 trigram name index (sql/search_index.sql)."""
+    try:
+        with open(SEARCH_INDEX_PATH, 'r', encoding='utf-8') as f:
+            conn.executescript(f.read())
+    except Error as e:
+        # Older SQLite builds lack FTS5/trigram; name search falls back to scans
+        conn.rollback()
+        print(f"[DB] Name search index not available: {e}")
+
+
+def _create_club_stats(conn):
+    """Create club_stats with its triggers and (re)compute it from matches (sql/club_stats.sql)."""
+    with open(CLUB_STATS_PATH, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+
+
+def _create_player_stats(conn):
+    """Create player_stats with its triggers and (re)compute it from events (sql/player_stats.sql)."""
+    with open(PLAYER_STATS_PATH, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+
+
+# Migrations that need more than a plain SQL script
+_CODE_MIGRATIONS = {
+    4: _create_search_index,
+    5: _create_club_stats,
+    6: _create_player_stats,
+    # after 007_nullable_goals.sql rebuilds matches
+    7: _create_club_stats,
+}
+
+
+def _apply_migrations(conn, version):
+    """Run sql/migrations/<n>_*.sql and then _CODE_MIGRATIONS[n] for every n in (version, SCHEMA_VERSION]."""
+    scripts = {}
+    for filename in os.listdir(MIGRATIONS_DIR):
+        prefix = filename.split('_', 1)[0]
+        if filename.endswith('.sql') and prefix.isdigit():
+            scripts[int(prefix)] = os.path.join(MIGRATIONS_DIR, filename)
+
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        if target not in scripts and target not in _CODE_MIGRATIONS:
+            continue
+        print(f"[DB] Migrating database to version {target}")
+        if target in scripts:
+            with open(scripts[target], 'r', encoding='utf-8') as f:
+                conn.executescript(f.read())
+        if target in _CODE_MIGRATIONS:
+            _CODE_MIGRATIONS[target](conn)
+        conn.execute(f"PRAGMA user_version = {target}")
+
+
+def _seed_sample_data(conn):
+    cursor = conn.cursor()
+
+    # Insert sample clubs data
+    sample_clubs = [
+        ("Левски София", "София", 1914),
+        ("ЦСКА София", "София", 1948),
+        ("Ботев Пловдив", "Пловдив", 1912),
+        ("Лудогорец Разград", "Разград", 1945),
+        ("Черно море Варна", "Варна", 1913),
+        ("Спартак Варна", "Варна", 1929),
+        ("Локомотив Пловдив", "Пловдив", 1926),
+        ("Берое Стара Загора", "Стара Загора", 1916)
+    ]
+    cursor.executemany(
+        "INSERT INTO clubs (name, city, founded_year) VALUES (?, ?, ?)",
+        sample_clubs
+    )
+
+    # Insert sample players data
+    sample_players = [
+        # Levski Sofia players
+        (1, "Иван Иванов", "1995-03-15", "България", "GK", 1, "Активен"),
+        (1, "Петър Петров", "1998-07-22", "България", "DF", 4, "Активен"),
+        (1, "Мария Георгиева", "1997-11-08", "България", "MF", 10, "Активен"),
+        (1, "Александър Николов", "1996-01-30", "България", "FW", 9, "Активен"),
+        (1, "Николай Костов", "1999-09-18", "България", "DF", 2, "Активен"),
+        
+        # CSKA Sofia players
+        (2, "Георги Димитров", "1994-05-12", "България", "GK", 1, "Активен"),
+        (2, "Димитър Иванов", "1997-12-25", "България", "MF", 8, "Активен"),
+        (2, "Кристиян Стоянов", "1998-04-03", "България", "FW", 11, "Активен"),
+        (2, "Васил Андреев", "1996-06-14", "България", "DF", 3, "Активен"),
+        (2, "Радослав Недев", "1995-02-20", "България", "MF", 6, "Активен"),
+        
+        # Botev Plovdiv players
+        (3, "Мартин Камиларов", "1996-02-14", "България", "GK", 1, "Активен"),
+        (3, "Илия Илиев", "1995-08-20", "България", "DF", 5, "Активен"),
+        (3, "Радослав Стоянов", "1999-10-11", "България", "MF", 7, "Активен"),
+        (3, "Васил Лечков", "1997-06-06", "България", "FW", 9, "Активен"),
+        (3, "Кирил Симов", "1998-03-12", "България", "DF", 2, "Активен"),
+        
+        # Ludogorets players
+        (4, "Владислав Стоянов", "1995-01-18", "България", "GK", 1, "Активен"),
+        (4, "Калоян Стоянов", "1998-03-25", "България", "DF", 2, "Активен"),
+        (4, "Ивелин Попов", "1996-07-14", "България", "MF", 6, "Активен"),
+        (4, "Клавдиу Кейсел", "1997-12-01", "Румъния", "FW", 10, "Активен"),
+        (4, "Жуан Пауло", "1999-05-15", "Бразилия", "MF", 8, "Активен"),
+        
+        # Cherno More Varna players
+        (5, "Димитър Манолов", "1994-11-22", "България", "GK", 1, "Активен"),
+        (5, "Павел Виданов", "1998-01-15", "България", "DF", 4, "Активен"),
+        (5, "Атанас Пиров", "1996-09-30", "България", "MF", 8, "Активен"),
+        (5, "Иван Стоянов", "1999-05-05", "България", "FW", 11, "Активен"),
+        (5, "Мартин Тодоров", "1997-04-22", "България", "DF", 3, "Активен"),
+        
+        # Spartak Varna players
+        (6, "Георги Георгиев", "1995-08-10", "България", "GK", 1, "Активен"),
+        (6, "Кристиян Камбулов", "1998-12-03", "България", "DF", 5, "Активен"),
+        (6, "Александър Михалков", "1996-02-28", "България", "MF", 7, "Активен"),
+        (6, "Борислав Димитров", "1999-07-19", "България", "FW", 10, "Активен"),
+        
+        # Lokomotiv Plovdiv players
+        (7, "Иван Колев", "1994-06-25", "България", "GK", 1, "Активен"),
+        (7, "Петър Стайков", "1997-11-14", "България", "DF", 4, "Активен"),
+        (7, "Мартин Димитров", "1998-09-30", "България", "MF", 8, "Активен"),
+        (7, "Николай Николов", "1996-01-08", "България", "FW", 9, "Активен"),
+        (7, "Димитър Димитров", "1999-03-17", "България", "MF", 6, "Активен"),
+        
+        # Beroe Stara Zagora players
+        (8, "Атанас Атанасов", "1995-10-12", "България", "GK", 1, "Активен"),
+        (8, "Иван Иванов", "1998-07-23", "България", "DF", 3, "Активен"),
+        (8, "Георги Попов", "1997-02-14", "България", "MF", 7, "Активен"),
+        (8, "Кирил Кирилов", "1999-12-01", "България", "FW", 11, "Активен")
+    ]
+    
+    cursor.executemany(
+        """INSERT INTO players (club_id, full_name, birth_date, nationality, position, number, status)
+           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        sample_players
+    )
+
+    # Insert some sample matches and events to support statistics
+    # Sample matches: Levski(1) vs CSKA(2) 2-1, Levski(1) vs Botev(3) 0-0, CSKA(2) vs Botev(3) 1-3
+    cursor.execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) VALUES (?, ?, ?, ?, ?)", (1, 2, 2, 1, '2025-08-01'))
+    m1 = cursor.lastrowid
+    cursor.execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) VALUES (?, ?, ?, ?, ?)", (1, 3, 0, 0, '2025-08-08'))
+    m2 = cursor.lastrowid
+    cursor.execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) VALUES (?, ?, ?, ?, ?)", (2, 3, 1, 3, '2025-08-15'))
+    m3 = cursor.lastrowid
+
+    # Additional sample matches to flesh out the demo dataset
+    cursor.execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) VALUES (?, ?, ?, ?, ?)", (4, 5, 1, 2, '2025-08-02'))
+    m4 = cursor.lastrowid
+    cursor.execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) VALUES (?, ?, ?, ?, ?)", (6, 7, 0, 1, '2025-08-03'))
+    m5 = cursor.lastrowid
+    cursor.execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) VALUES (?, ?, ?, ?, ?)", (8, 7, 2, 2, '2025-08-04'))
+    m6 = cursor.lastrowid
+    cursor.execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) VALUES (?, ?, ?, ?, ?)", (2, 4, 3, 1, '2025-08-05'))
+    m7 = cursor.lastrowid
+    cursor.execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) VALUES (?, ?, ?, ?, ?)", (3, 5, 1, 1, '2025-08-06'))
+    m8 = cursor.lastrowid
+
+    # Sample events: goals and assists for some players
+    # Player ids from sample data: Ivan Ivanov (Levski) id may be 1, but fetch dynamically
+    cursor.execute("SELECT id FROM players WHERE full_name = ?", ("Иван Иванов",))
+    row = cursor.fetchone()
+    if row:
+        pid_ivan = row[0]
+        cursor.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)", (m1, pid_ivan, 'goal', 23))
+        cursor.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)", (m2, pid_ivan, 'appearance', 0))
+
+    # Add a goal for a CSKA player
+    cursor.execute("SELECT id FROM players WHERE full_name = ?", ("Кристиян Стоянов",))
+    row = cursor.fetchone()
+    if row:
+        pid_krist = row[0]
+        cursor.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)", (m1, pid_krist, 'goal', 67))
+
+    # Additional events for demo: goals, assists, bookings across different matches/players
+    cursor.execute("SELECT id FROM players WHERE full_name = ? AND club_id = 2", ("Димитър Иванов",))
+    row = cursor.fetchone()
+    if row:
+        pid_dim = row[0]
+        cursor.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)", (m7, pid_dim, 'goal', 54))
+
+    cursor.execute("SELECT id FROM players WHERE full_name = ? AND club_id = 3", ("Васил Лечков",))
+    row = cursor.fetchone()
+    if row:
+        pid_vasil = row[0]
+        cursor.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)", (m3, pid_vasil, 'goal', 12))
+        cursor.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)", (m3, pid_vasil, 'assist', 33))
+
+    cursor.execute("SELECT id FROM players WHERE full_name = ? AND club_id = 4", ("Ивелин Попов",))
+    row = cursor.fetchone()
+    if row:
+        pid_ip = row[0]
+        cursor.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)", (m4, pid_ip, 'yellow', 77))
+
+    cursor.execute("SELECT id FROM players WHERE full_name = ? AND club_id = 6", ("Борислав Димитров",))
+    row = cursor.fetchone()
+    if row:
+        pid_boris = row[0]
+        cursor.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)", (m5, pid_boris, 'goal', 85))
+
+
+class ConnectionPool:
+    """Small pool of reusable SQLite connections for a single database file.
+
+    Connections are checked out with `acquire()` and handed back with
+    `release()`. Idle connections are health-checked on checkout and at most
+    `max_idle` of them are kept; checkout never blocks, a new connection is
+    opened whenever the pool is empty.
+    """
+
+    def __init__(self, path: str, max_idle: int = 8, profile: str = None):
+        self.path = path
+        self.max_idle = max_idle
+        self.profile = profile or DB_PROFILE
+        self._idle = []
+        self._lock = threading.Lock()
+        self.writes = WriteVersions(path, self.profile)
+
+    def _open(self):
+        return open_connection(self.path, self.profile)
+
+    @staticmethod
+    def _is_healthy(conn) -> bool:
+        try:
+            conn.execute('SELECT 1')
+            return True
+        except Exception:
+            return False
+
+    def acquire(self):
+        """Return an idle healthy connection or open a new one."""
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                return self._open()
+            if self._is_healthy(conn):
+                return conn
+            _close_quietly(conn)
+
+    def release(self, conn) -> None:
+        """Return a connection to the pool, discarding uncommitted work."""
+        if conn is None:
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except Exception:
+            _close_quietly(conn)
+            return
+
+        with self._lock:
+            if len(self._idle) < self.max_idle and conn not in self._idle:
+                self._idle.append(conn)
+                return
+        _close_quietly(conn)
+
+    def close_all(self) -> None:
+        """Close every idle connection held by the pool."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            _close_quietly(conn)
+        self.writes.close()
+
+
+# Table written by an INSERT/REPLACE/UPDATE/DELETE statement
+_WRITE_TARGET_RE = re.compile(
+    r"^\s*(INSERT|REPLACE|UPDATE|DELETE)(?:\s+OR\s+\w+)?(?:\s+INTO|\s+FROM)?\s+[\"`\[]?(\w+)",
+    re.IGNORECASE
+)
+
+_write_generations = itertools.count(1)
+
+
+class WriteVersions:
+    """Per-table write counters for one database file, used to invalidate cached reads.
+
+    `bump()` is called after a committed write. Writes this module cannot
+    attribute to a table (a raw `commit()`, another process) bump every
+    table; the latter are detected through `PRAGMA data_version` on a
+    dedicated connection, which changes whenever another connection commits.
+    A write from another process that commits in the instant between one of
+    our own commits and the following `bump()` is attributed to our tables.
+    """
+
+    def __init__(self, path: str, profile: str = None):
+        self.path = path
+        self.profile = profile
+        # Distinguishes snapshots of different pools/databases
+        self.generation = next(_write_generations)
+        self._tables = {}
+        self._all = 0
+        self._dependents = None
+        self._watcher = None
+        self._data_version = None
+        self._lock = threading.Lock()
+
+    def _data_version_now(self):
+        try:
+            if self._watcher is None:
+                self._watcher = open_connection(self.path, self.profile)
+                self._watcher.isolation_level = None
+            return self._watcher.execute('PRAGMA data_version').fetchone()[0]
+        except Error as e:
+            print(f"[DB WATCH ERROR] {e}")
+            _close_quietly(self._watcher)
+            self._watcher = None
+            return None
+
+    def _check_foreign_writes(self) -> None:
+        version = self._data_version_now()
+        if version is None or (self._data_version is not None and version != self._data_version):
+            self._all += 1
+        self._data_version = version
+
+    def _cascade_targets(self, table: str) -> set:
+        """`table` plus every table whose rows a delete/update of it can change via foreign keys."""
+        if self._dependents is None:
+            dependents = {}
+            try:
+                conn = self._watcher or open_connection(self.path, self.profile)
+                self._watcher = conn
+                names = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+                for child in names:
+                    for fk in conn.execute(f'PRAGMA foreign_key_list("{child}")'):
+                        dependents.setdefault(fk['table'], set()).add(child)
+            except Error as e:
+                print(f"[DB WATCH ERROR] {e}")
+            self._dependents = dependents
+
+        seen = {table}
+        pending = [table]
+        while pending:
+            for child in self._dependents.get(pending.pop(), ()):
+                if child not in seen:
+                    seen.add(child)
+                    pending.append(child)
+        return seen
+
+    def bump(self, query: str = None) -> None:
+        """Record a committed write made by `query` (None: unknown, bumps every table)."""
+        match = _WRITE_TARGET_RE.match(query) if query else None
+        with self._lock:
+            if match is None:
+                self._all += 1
+            else:
+                verb, table = match.group(1).upper(), match.group(2)
+                targets = {table} if verb == 'INSERT' else self._cascade_targets(table)
+                for name in targets:
+                    self._tables[name] = self._tables.get(name, 0) + 1
+            # Our own commit changed data_version; don't count it as foreign
+            self._data_version = self._data_version_now()
+
+    def snapshot(self, tables) -> tuple:
+        """Version tuple for `tables`; it changes whenever any of them may have changed."""
+        with self._lock:
+            self._check_foreign_writes()
+            return (self.generation, self._all) + tuple(self._tables.get(t, 0) for t in tables)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._watcher is not None:
+                _close_quietly(self._watcher)
+                self._watcher = None
+
+
+def _close_quietly(conn) -> None:
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+POOL_SIZE = 8
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Return the pool for the current `DB_PATH`, rebuilding it if the path or profile changed.
+
+    A database path this process has not initialized yet is initialized here,
+    once, so the per-query path never touches the filesystem or the catalog.
+    """
+    global _pool
+    pool = _pool
+    if pool is not None and pool.path == DB_PATH and pool.profile == DB_PROFILE:
+        return pool
+
+    if DB_PATH not in _initialized_paths:
+        initialize_database()
+
+    with _pool_lock:
+        if _pool is None or _pool.path != DB_PATH or _pool.profile != DB_PROFILE:
+            if _pool is not None:
+                _pool.close_all()
+            _pool = ConnectionPool(DB_PATH, POOL_SIZE, DB_PROFILE)
+        return _pool
+
+
+def close_pool() -> None:
+    """Close all pooled connections (registered as an interpreter shutdown hook)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+            _pool = None
+
+
+atexit.register(close_pool)
+
+
+def get_connection():
+    """Check out a pooled connection. Hand it back with `release_connection()`."""
+    try:
+        return get_pool().acquire()
+    except Exception as e:
+        # Catch all exceptions (including mocks that raise generic Exception)
+        print(f"[DB ERROR] {e}")
+        return None
+
+
+def release_connection(conn) -> None:
+    """Return a connection obtained from `get_connection()` to the pool."""
+    if conn is None:
+        return
+    pool = _pool
+    if pool is not None and pool.path == DB_PATH:
+        pool.release(conn)
+    else:
+        _close_quietly(conn)
+
+
+def note_write(query: str = None) -> None:
+    """Record a committed write so cached reads of the affected tables are refreshed."""
+    pool = _pool
+    if pool is not None and pool.path == DB_PATH:
+        pool.writes.bump(query)
+
+
+def write_version(*tables) -> tuple:
+    """Current write version of `tables` (see WriteVersions.snapshot)."""
+    return get_pool().writes.snapshot(tables)
+
+
+@contextmanager
+def pooled_connection():
+    """Context manager yielding a pooled connection (or None on error)."""
+    conn = get_connection()
+    try:
+        yield conn
+    finally:
+        release_connection(conn)
+
+
+def execute_query(query, params=(), fetch=False):
+    with pooled_connection() as conn:
+        if not conn:
+            return None
+
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+
+            if fetch:
+                results = cursor.fetchall()
+                if not results:
+                    return None
+                return results
+
+            conn.commit()
+            note_write(query)
+            return True
+
+        except Error as e:
+            print(f"[QUERY ERROR] {e}")
+            return None
+
+
+def connect():
+    """Return a pooled DB connection (initialized). Release it with `release_connection()`."""
+    return get_connection()
+
+
+def execute(query: str, params=(), commit: bool = True):
+    """Execute a query (INSERT/UPDATE/DELETE) and optionally commit.
+
+    Returns lastrowid on insert, True on success, or None on error.
+    """
+    with pooled_connection() as conn:
+        if not conn:
+            return None
+
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            if commit:
+                conn.commit()
+                note_write(query)
+
+            lastrowid = cursor.lastrowid
+            return lastrowid if lastrowid else True
+
+        except Error as e:
+            print(f"[DB EXECUTE ERROR] {e}")
+            return None
+
+
+def execute_many(query: str, rows):
+    """Execute one INSERT/UPDATE/DELETE for every params tuple in `rows` and commit once.
+
+    Returns the number of rows changed, or None on error (nothing is written).
+    """
+    with pooled_connection() as conn:
+        if not conn:
+            return None
+
+        try:
+            cursor = conn.executemany(query, rows)
+            conn.commit()
+            note_write(query)
+            return cursor.rowcount
+        except Error as e:
+            print(f"[DB EXECUTE_MANY ERROR] {e}")
+            return None
+
+
+class Transaction:
+    """Writes on one pooled connection that are committed together (see `transaction()`)."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._writes = []  # distinct write statements, noted once the commit succeeds
+
+    def _note(self, query: str) -> None:
+        if query not in self._writes:
+            self._writes.append(query)
+
+    def execute(self, query: str, params=()):
+        """Like `execute()` without the commit: lastrowid on insert, else True."""
+        cursor = self.conn.execute(query, params)
+        self._note(query)
+        return cursor.lastrowid if cursor.lastrowid else True
+
+    def execute_many(self, query: str, rows) -> int:
+        """Like `execute_many()` without the commit: the number of rows changed."""
+        cursor = self.conn.executemany(query, rows)
+        self._note(query)
+        return cursor.rowcount
+
+    def fetch_all(self, query: str, params=()):
+        """Read inside the transaction, seeing its uncommitted writes."""
+        return self.conn.execute(query, params).fetchall()
+
+    def fetch_one(self, query: str, params=()):
+        return self.conn.execute(query, params).fetchone()
+
+
+@contextmanager
+def transaction(immediate: bool = False):
+    """Group many writes into a single commit.
+
+        with db.transaction() as tx:
+            tx.execute_many("INSERT INTO events (...) VALUES (?, ?, ?, ?)", rows)
+            tx.execute("UPDATE matches SET ... WHERE id = ?", (mid,))
+
+    Commits when the block ends; if it raises, everything is rolled back and
+    the exception propagates. Raises sqlite3.Error if no connection is available.
+    `immediate=True` takes the write lock up front (BEGIN IMMEDIATE), for blocks
+    that read before they write and need those reads to stay current.
+    """
+    conn = get_connection()
+    if conn is None:
+        raise Error("no database connection")
+    tx = Transaction(conn)
+    try:
+        if immediate:
+            conn.execute("BEGIN IMMEDIATE")
+        yield tx
+        conn.commit()
+    except BaseException:
+        rollback(conn)
+        raise
+    finally:
+        release_connection(conn)
+    for query in tx._writes:
+        note_write(query)
+
+
+def fetch_all(query: str, params=()):
+    """Fetch all rows for a SELECT query. Returns list of sqlite3.Row or empty list."""
+    with pooled_connection() as conn:
+        if not conn:
+            return []
+
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            return rows
+        except Error as e:
+            print(f"[DB FETCH_ALL ERROR] {e}")
+            return []
+
+
+def fetch_one(query: str, params=()):
+    """Fetch a single row for a SELECT query. Returns sqlite3.Row or None."""
+    rows = fetch_all(query, params)
+    if rows:
+        return rows[0]
+    return None
+
+
+def _rebuild(create) -> bool:
+    with pooled_connection() as conn:
+        if not conn:
+            return False
+
+        try:
+            create(conn)
+            note_write()
+            return True
+        except Error as e:
+            print(f"[DB ERROR] {e}")
+            return False
+
+
+def rebuild_club_stats() -> bool:
+    """Recompute the club_stats table from matches. Returns True on success."""
+    return _rebuild(_create_club_stats)
+
+
+def rebuild_player_stats() -> bool:
+    """Recompute the player_stats table from events. Returns True on success."""
+    return _rebuild(_create_player_stats)
+
+
+def commit(conn):
+    """Commit a provided connection (best-effort)."""
+    try:
+        if conn:
+            conn.commit()
+            note_write()
+    except Exception:
+        pass
+
+
+def rollback(conn):
+    """Rollback a provided connection (best-effort)."""
+    try:
+        if conn:
+            conn.rollback()
+    except Exception:
+        pass
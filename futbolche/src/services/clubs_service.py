@@ -1,10 +1,15 @@
 from db import fetch_one, fetch_all, execute
+from services.resolver import resolve_club_id
+from utils.text import name_key
 
 
 def _normalize_name(name: str) -> str:
     return name.strip()
 
 
+_CLUB_BY_NAME = "SELECT id FROM clubs WHERE name_key = ?"
+
+
 def create_club(name: str, city: str = 'Unknown', founded_year: int = None) -> str:
     """Create a new club with validation.
 
@@ -16,7 +21,7 @@ def create_club(name: str, city: str = 'Unknown', founded_year: int = None) -> s
     name = _normalize_name(name)
 
     # Check duplicate (case-insensitive)
-    existing = fetch_one("SELECT id FROM clubs WHERE LOWER(name) = LOWER(?)", (name,))
+    existing = fetch_one(_CLUB_BY_NAME, (name_key(name),))
     if existing:
         return "Клуб с това име вече съществува."
 
@@ -56,12 +61,11 @@ def list_clubs() -> str:
 
 def update_club(identifier, new_name: str = None, new_city: str = None, new_founded_year: int = None) -> str:
     """Update club by id or name. Returns message."""
-    # Resolve identifier to id
+    # Resolve identifier to id (exact names only)
     club = None
-    if isinstance(identifier, int) or str(identifier).isdigit():
-        club = fetch_one("SELECT * FROM clubs WHERE id = ?", (int(identifier),))
-    else:
-        club = fetch_one("SELECT * FROM clubs WHERE LOWER(name) = LOWER(?)", (str(identifier),))
+    cid = resolve_club_id(identifier, partial=False)
+    if cid:
+        club = fetch_one("SELECT * FROM clubs WHERE id = ?", (cid,))
 
     if not club:
         return "Клубът не беше намерен."
@@ -94,12 +98,11 @@ def update_club(identifier, new_name: str = None, new_city: str = None, new_foun
 
 def delete_club(identifier) -> str:
     """Delete club by id or name."""
-    # Resolve
+    # Resolve (exact names only)
     club = None
-    if isinstance(identifier, int) or str(identifier).isdigit():
-        club = fetch_one("SELECT id, name FROM clubs WHERE id = ?", (int(identifier),))
-    else:
-        club = fetch_one("SELECT id, name FROM clubs WHERE LOWER(name) = LOWER(?)", (str(identifier),))
+    cid = resolve_club_id(identifier, partial=False)
+    if cid:
+        club = fetch_one("SELECT id, name FROM clubs WHERE id = ?", (cid,))
 
     if not club:
         return "Няма такъв клуб."
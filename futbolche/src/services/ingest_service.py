@@ -0,0 +1,332 @@
+"""Live match-event feed ingestion.
+
+A feed is a stream of JSON lines, one event per line:
+
+    {"key": "feed-1:8812", "match_id": 12, "player": "Иван Иванов", "type": "goal", "minute": 23, "ts": 1760760000.5}
+
+`key` (optional) is the producer's idempotency key: an event whose key was
+already recorded is dropped, so retried deliveries are harmless. `type` is an
+event type or its Bulgarian word (see matches_service.EVENT_WORDS). `ts`
+(optional, Unix seconds) is when the event happened; lag is measured from it,
+or from the moment the line was read.
+
+Sources (`follow_file`, `serve_socket`) put events on the bounded queue of an
+`EventIngester`. When the queue is full they block, which stops reading the
+file or the socket until the writer catches up. The writer thread takes
+micro-batches of up to `batch_size` events (waiting at most `max_delay`
+seconds to fill one), resolves all of a batch's matches and players at once
+and writes the batch with `matches_service.record_event_batches` in one
+transaction (group commit).
+"""
+import json
+import os
+import queue
+import socketserver
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from db import fetch_all
+import services.matches_service as matches
+from services.resolver import resolve_player_ids
+
+
+_KNOWN_MATCHES = "SELECT id FROM matches WHERE id IN ({marks})"
+
+
+class IngestMetrics:
+    """Counters and lag of one ingester; `snapshot()` is safe to call from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.received = 0      # events put on the queue
+        self.written = 0       # events inserted into the database
+        self.duplicates = 0    # dropped: idempotency key already recorded
+        self.rejected = 0      # dropped: unknown match/player or invalid type
+        self.malformed = 0     # lines that are not a JSON event object
+        self.failed = 0        # events of batches the database refused
+        self.batches = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._lag_total = 0.0
+
+    def add(self, **counts) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def batch_written(self, written: int, duplicates: int, lags: List[float]) -> None:
+        with self._lock:
+            self.batches += 1
+            self.written += written
+            self.duplicates += duplicates
+            if lags:
+                self.last_lag = lags[-1]
+                self.max_lag = max(self.max_lag, max(lags))
+                self._lag_total += sum(lags)
+
+    def snapshot(self, queue_depth: int = 0) -> dict:
+        with self._lock:
+            elapsed = max(time.time() - self.started, 1e-9)
+            processed = self.written + self.duplicates
+            return {
+                'received': self.received, 'written': self.written, 'duplicates': self.duplicates,
+                'rejected': self.rejected, 'malformed': self.malformed, 'failed': self.failed,
+                'batches': self.batches, 'queue_depth': queue_depth,
+                'events_per_sec': round(self.written / elapsed, 1),
+                'avg_batch': round(processed / self.batches, 1) if self.batches else 0.0,
+                'last_lag': round(self.last_lag, 3), 'max_lag': round(self.max_lag, 3),
+                'avg_lag': round(self._lag_total / processed, 3) if processed else 0.0,
+            }
+
+
+def parse_feed_line(line) -> Optional[dict]:
+    """Decode one feed line into an event dict, or None if it is not a JSON object with a match_id."""
+    try:
+        event = json.loads(line)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(event, dict) or event.get('match_id') is None:
+        return None
+    return event
+
+
+class EventIngester:
+    """Bounded queue of feed events drained by a writer thread in micro-batches."""
+
+    def __init__(self, batch_size: int = 500, max_delay: float = 0.2, queue_size: int = 10000):
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.metrics = IngestMetrics()
+        self._stop = threading.Event()
+        self._writer = None
+
+    # --- producer side ---
+    def submit(self, event: dict, timeout: Optional[float] = None) -> bool:
+        """Queue an event, blocking while the queue is full (back-pressure).
+
+        Returns False if it could not be queued within `timeout` seconds.
+        """
+        event.setdefault('_received', time.time())
+        try:
+            self.queue.put(event, timeout=timeout)
+        except queue.Full:
+            return False
+        self.metrics.add(received=1)
+        return True
+
+    def submit_line(self, line, timeout: Optional[float] = None) -> bool:
+        """Parse and queue one feed line; malformed lines are counted and skipped."""
+        if not line.strip():
+            return True
+        event = parse_feed_line(line)
+        if event is None:
+            self.metrics.add(malformed=1)
+            return True
+        return self.submit(event, timeout)
+
+    # --- writer side ---
+    def start(self) -> 'EventIngester':
+        self._stop.clear()
+        self._writer = threading.Thread(target=self._run, name='event-ingester', daemon=True)
+        self._writer.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Write what is queued, then stop the writer thread."""
+        self._stop.set()
+        if self._writer is not None:
+            self._writer.join(timeout)
+            self._writer = None
+
+    def stats(self) -> dict:
+        return self.metrics.snapshot(self.queue.qsize())
+
+    def _next_batch(self) -> List[dict]:
+        try:
+            batch = [self.queue.get(timeout=0.05)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch:
+                try:
+                    self.write_batch(batch)
+                except Exception as e:
+                    # Never let one bad batch stop the writer: sources would block on a full queue
+                    print(f"[INGEST ERROR] batch of {len(batch)} events dropped: {e}")
+                    self.metrics.add(failed=len(batch))
+            elif self._stop.is_set():
+                return
+
+    def write_batch(self, events: List[dict]) -> int:
+        """Resolve and write one micro-batch; returns the number of events written."""
+        batches = self._resolve(events)
+        queued = sum(len(rows) for rows in batches.values())
+        if not queued:
+            return 0
+        rows_by_match = {mid: [row for row, _ in rows] for mid, rows in batches.items()}
+        written = None
+        for attempt in (1, 2):
+            try:
+                written = matches.record_event_batches(rows_by_match)
+                break
+            except sqlite3.OperationalError as e:
+                # busy/locked: the transaction was rolled back, so a retry cannot duplicate events
+                print(f"[INGEST ERROR] batch of {queued} events (attempt {attempt}): {e}")
+            except Exception as e:
+                # may come after the commit; retrying would insert keyless events twice
+                print(f"[INGEST ERROR] batch of {queued} events: {e}")
+                break
+        if written is None:
+            self.metrics.add(failed=queued)
+            return 0
+
+        now = time.time()
+        lags = [now - started for rows in batches.values() for _, started in rows]
+        self.metrics.batch_written(written, queued - written, lags)
+        return written
+
+    def _resolve(self, events: List[dict]) -> Dict[int, list]:
+        """Validate a batch with one query for its matches and one pass over its players.
+
+        Returns {match_id: [((player_id, event_type, minute, key), event time)]}.
+        """
+        match_ids = set()
+        for event in events:
+            try:
+                match_ids.add(int(event.get('match_id')))
+            except (TypeError, ValueError):
+                pass
+        ids = sorted(match_ids)
+        known = set()
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            marks = ', '.join('?' * len(chunk))
+            known.update(r['id'] for r in fetch_all(_KNOWN_MATCHES.format(marks=marks), tuple(chunk)))
+        pids = resolve_player_ids(str(e['player']) for e in events if e.get('player') not in (None, ''))
+
+        batches, rejected = {}, 0
+        for event in events:
+            event_type = str(event.get('type', '')).lower()
+            event_type = matches.EVENT_WORDS.get(event_type, event_type)
+            player = event.get('player')
+            pid = pids.get(str(player)) if player not in (None, '') else None
+            try:
+                mid = int(event.get('match_id'))
+                minute = int(event['minute']) if event.get('minute') is not None else None
+                started = float(event.get('ts') or event.get('_received') or time.time())
+            except (TypeError, ValueError):
+                rejected += 1
+                continue
+            if mid not in known or event_type not in matches.EVENT_TYPES or (player not in (None, '') and pid is None):
+                rejected += 1
+                continue
+            key = event.get('key')
+            batches.setdefault(mid, []).append(((pid, event_type, minute, None if key is None else str(key)), started))
+        if rejected:
+            self.metrics.add(rejected=rejected)
+        return batches
+
+
+# --- sources ---
+
+def follow_file(path: str, ingester: EventIngester, stop: threading.Event,
+                from_end: bool = False, poll_interval: float = 0.2) -> None:
+    """Tail a JSON-lines file like `tail -F`, feeding each complete line to `ingester` until `stop` is set.
+
+    Waits for the file to appear, reopens it when it is replaced (rotation)
+    and starts over when it shrinks (truncation). A line is only read once
+    its newline has been written.
+    """
+    f, inode, partial = None, None, ''
+    try:
+        while not stop.is_set():
+            if f is None:
+                try:
+                    f = open(path, 'r', encoding='utf-8')
+                except FileNotFoundError:
+                    stop.wait(poll_interval)
+                    continue
+                inode = os.fstat(f.fileno()).st_ino
+                if from_end:
+                    f.seek(0, os.SEEK_END)
+                    from_end = False
+
+            line = f.readline()
+            if line:
+                partial += line
+                if partial.endswith('\n'):
+                    ingester.submit_line(partial)
+                    partial = ''
+                continue
+
+            # At the end of the file: look for rotation or truncation, then wait
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                st = None
+            if st is None or st.st_ino != inode:
+                if st is not None:
+                    f.close()
+                    f, partial = None, ''
+                    continue
+            elif st.st_size < f.tell():
+                f.seek(0)
+                partial = ''
+                continue
+            stop.wait(poll_interval)
+    finally:
+        if f is not None:
+            f.close()
+
+
+class _FeedHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for raw in self.rfile:
+            # Blocks while the queue is full, so the sender is slowed by TCP flow control
+            self.server.ingester.submit_line(raw.decode('utf-8', errors='replace'))
+
+
+class _TCPFeedServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, 'ThreadingUnixStreamServer'):
+    class _UnixFeedServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+else:
+    _UnixFeedServer = None
+
+
+def serve_socket(address, ingester: EventIngester):
+    """Accept feed connections on a local socket; each connection sends JSON lines.
+
+    `address` is (host, port) for TCP or a filesystem path for a Unix socket.
+    Returns the server; run `serve_forever()` (e.g. in a thread) and stop it
+    with `shutdown()` and `server_close()`.
+    """
+    if isinstance(address, str):
+        if _UnixFeedServer is None:
+            raise OSError("Unix sockets are not supported on this platform")
+        if os.path.exists(address):
+            os.unlink(address)
+        server = _UnixFeedServer(address, _FeedHandler)
+    else:
+        server = _TCPFeedServer(tuple(address), _FeedHandler)
+    server.ingester = ingester
+    return server
@@ -1,5 +1,7 @@
 from datetime import date, timedelta, datetime
-from db import execute, fetch_all, fetch_one
+from db import execute, execute_many, fetch_all
+from services.resolver import resolve_club_id, resolve_league_id
+from services import standings
 
 
 def create_league(name: str, season: str):
@@ -13,26 +15,12 @@ def create_league(name: str, season: str):
 
 
 def add_club_to_league(league_identifier, club_identifier):
-    # resolve league id
-    lid = None
-    if isinstance(league_identifier, int) or str(league_identifier).isdigit():
-        lid = int(league_identifier)
-    else:
-        row = fetch_one("SELECT id FROM leagues WHERE LOWER(name)=LOWER(?)", (league_identifier,))
-        if row:
-            lid = row['id']
+    lid = resolve_league_id(league_identifier)
 
     if not lid:
         return "Лигата не съществува."
 
-    # resolve club id
-    cid = None
-    if isinstance(club_identifier, int) or str(club_identifier).isdigit():
-        cid = int(club_identifier)
-    else:
-        row = fetch_one("SELECT id FROM clubs WHERE LOWER(name)=LOWER(?)", (club_identifier,))
-        if row:
-            cid = row['id']
+    cid = resolve_club_id(club_identifier, partial=False)
 
     if not cid:
         return "Клубът не съществува."
@@ -43,175 +31,127 @@ def add_club_to_league(league_identifier, club_identifier):
     return "Клубът беше добавен в лигата успешно."
 
 
+_LEAGUE_CLUBS = "SELECT c.* FROM clubs c JOIN league_teams lt ON c.id = lt.club_id WHERE lt.league_id = ? ORDER BY c.name"
+
+
 def get_league_teams(league_identifier):
-    # resolve league id
-    lid = None
-    if isinstance(league_identifier, int) or str(league_identifier).isdigit():
-        lid = int(league_identifier)
-    else:
-        row = fetch_one("SELECT id FROM leagues WHERE LOWER(name)=LOWER(?)", (league_identifier,))
-        if row:
-            lid = row['id']
+    lid = resolve_league_id(league_identifier)
 
     if not lid:
         return []
 
-    rows = fetch_all("SELECT c.* FROM clubs c JOIN league_teams lt ON c.id = lt.club_id WHERE lt.league_id = ? ORDER BY c.name", (lid,))
+    rows = fetch_all(_LEAGUE_CLUBS, (lid,))
     return rows or []
 
 
+def _round_robin_rounds(club_ids):
+    """Circle (Berger) method: n-1 rounds (n rounded up to even) of (home, away) pairs.
+
+    Every team plays at most once per round and every pair meets once. The
+    first slot stays fixed while the rest rotate; with an odd number of teams
+    it holds the bye. Home sides alternate so home games differ by at most one.
+    """
+    teams = list(club_ids)
+    if len(teams) % 2:
+        teams.insert(0, None)
+    n = len(teams)
+    fixed, rest = teams[0], teams[1:]
+    rounds = []
+    for r in range(n - 1):
+        line = [fixed] + rest
+        pairs = []
+        for i in range(n // 2):
+            a, b = line[i], line[n - 1 - i]
+            if a is None or b is None:
+                continue
+            swap = r % 2 if i == 0 else i % 2 == 0
+            pairs.append((b, a) if swap else (a, b))
+        rounds.append(pairs)
+        rest = rest[-1:] + rest[:-1]
+    return rounds
+
+
 def generate_round_robin(league_identifier, double_round: bool = False, start_date: str = None, interval_days: int = 7):
-    """Generate round-robin fixtures for a league.
+    """Generate round-robin fixtures for a league, one matchday per round.
 
     - `double_round`: if True, generate home+away legs (double round-robin).
     - `start_date`: ISO date string for first match day; defaults to today.
     - `interval_days`: days between matchdays.
+
+    The whole schedule is inserted in one transaction.
     """
     teams = get_league_teams(league_identifier)
     if not teams or len(teams) < 2:
         return "Недостатъчно отбори за създаване на кръгове."
 
     # get league id
-    if isinstance(league_identifier, int) or str(league_identifier).isdigit():
-        lid = int(league_identifier)
-    else:
-        row = fetch_one("SELECT id FROM leagues WHERE LOWER(name)=LOWER(?)", (league_identifier,))
-        lid = row['id'] if row else None
+    lid = resolve_league_id(league_identifier)
 
     if not lid:
         return "Лигата не съществува."
 
-    club_ids = [t['id'] for t in teams]
-
     # schedule dates
     if start_date:
         try:
-            current = datetime.strptime(start_date, "%Y-%m-%d").date()
+            first = datetime.strptime(start_date, "%Y-%m-%d").date()
         except Exception:
-            current = date.today()
+            first = date.today()
     else:
-        current = date.today()
-
-    created = 0
-
-    # Single round-robin: each pair once (i home, j away)
-    for i in range(len(club_ids)):
-        for j in range(i + 1, len(club_ids)):
-            res = execute(
-                "INSERT INTO matches (home_team_id, away_team_id, match_date, league_id) VALUES (?, ?, ?, ?)",
-                (club_ids[i], club_ids[j], current.isoformat(), lid)
-            )
-            if res:
-                created += 1
-            current = current + timedelta(days=interval_days)
-
-    # Double round-robin: add reverse fixtures
+        first = date.today()
+
+    rounds = _round_robin_rounds([t['id'] for t in teams])
     if double_round:
-        for i in range(len(club_ids)):
-            for j in range(i + 1, len(club_ids)):
-                res = execute(
-                    "INSERT INTO matches (home_team_id, away_team_id, match_date, league_id) VALUES (?, ?, ?, ?)",
-                    (club_ids[j], club_ids[i], current.isoformat(), lid)
-                )
-                if res:
-                    created += 1
-                current = current + timedelta(days=interval_days)
+        # second half of the season: same rounds, venues swapped
+        rounds += [[(away, home) for home, away in pairs] for pairs in rounds]
 
-    return f"Създадени {created} мача за лига {league_identifier}."
+    rows = [(home, away, (first + timedelta(days=interval_days * r)).isoformat(), lid)
+            for r, pairs in enumerate(rounds) for home, away in pairs]
 
+    if execute_many("INSERT INTO matches (home_team_id, away_team_id, match_date, league_id) VALUES (?, ?, ?, ?)",
+                    rows) is None:
+        return "Грешка при създаване на кръговете."
 
-def get_standings(league_identifier):
+    return f"Създадени {len(rows)} мача за лига {league_identifier}."
+
+
+def get_standings(league_identifier, tie_breakers=standings.DEFAULT_TIE_BREAKERS):
     """Compute standings for a league: played, won, draw, lost, goals for/against, goal diff, points."""
-    # resolve league id
-    lid = None
-    if isinstance(league_identifier, int) or str(league_identifier).isdigit():
-        lid = int(league_identifier)
-    else:
-        row = fetch_one("SELECT id FROM leagues WHERE LOWER(name)=LOWER(?)", (league_identifier,))
-        if row:
-            lid = row['id']
+    lid = resolve_league_id(league_identifier)
 
     if not lid:
         return "Лигата не съществува."
 
-    rows = fetch_all(
-        "SELECT m.*, hc.name as home_name, ac.name as away_name FROM matches m JOIN clubs hc ON m.home_team_id = hc.id JOIN clubs ac ON m.away_team_id = ac.id WHERE m.league_id = ?",
-        (lid,)
-    )
-
-    if not rows:
+    table = standings.league_table(lid, tie_breakers)
+    if not any(r.played for r in table):
         return "Няма мачове в тази лига."
 
-    table = {}
-    def ensure(team_name):
-        if team_name not in table:
-            table[team_name] = {'P':0, 'W':0, 'D':0, 'L':0, 'GF':0, 'GA':0, 'GD':0, 'Pts':0}
-
-    for r in rows:
-        home = r['home_name']
-        away = r['away_name']
-        ensure(home)
-        ensure(away)
-        hg = r['home_goals'] if r['home_goals'] is not None else 0
-        ag = r['away_goals'] if r['away_goals'] is not None else 0
-        table[home]['P'] += 1
-        table[away]['P'] += 1
-        table[home]['GF'] += hg
-        table[home]['GA'] += ag
-        table[away]['GF'] += ag
-        table[away]['GA'] += hg
-        if hg > ag:
-            table[home]['W'] += 1
-            table[away]['L'] += 1
-            table[home]['Pts'] += 3
-        elif hg < ag:
-            table[away]['W'] += 1
-            table[home]['L'] += 1
-            table[away]['Pts'] += 3
-        else:
-            table[home]['D'] += 1
-            table[away]['D'] += 1
-            table[home]['Pts'] += 1
-            table[away]['Pts'] += 1
-
-    # finalize GD and sort
-    out = []
-    for team, stats in table.items():
-        stats['GD'] = stats['GF'] - stats['GA']
-        out.append((team, stats))
-
-    out.sort(key=lambda x: (-x[1]['Pts'], -x[1]['GD'], -x[1]['GF'], x[0]))
-
     lines = []
-    for pos, (team, s) in enumerate(out, start=1):
-        lines.append(f"{pos}. {team} | P:{s['P']} W:{s['W']} D:{s['D']} L:{s['L']} GF:{s['GF']} GA:{s['GA']} GD:{s['GD']} Pts:{s['Pts']}")
+    for pos, r in enumerate(table, start=1):
+        lines.append(f"{pos}. {r.name} | P:{r.played} W:{r.wins} D:{r.draws} L:{r.losses} GF:{r.goals_for} GA:{r.goals_against} GD:{r.goal_difference} Pts:{r.points}")
 
     return "\n".join(lines)
 
 
+_LEAGUE_FIXTURES = ("SELECT m.*, hc.name as home_name, ac.name as away_name FROM matches m "
+                    "JOIN clubs hc ON m.home_team_id = hc.id JOIN clubs ac ON m.away_team_id = ac.id "
+                    "WHERE m.league_id = ? ORDER BY m.match_date")
+
+
 def get_fixtures(league_identifier):
-    # resolve league id
-    lid = None
-    if isinstance(league_identifier, int) or str(league_identifier).isdigit():
-        lid = int(league_identifier)
-    else:
-        row = fetch_one("SELECT id FROM leagues WHERE LOWER(name)=LOWER(?)", (league_identifier,))
-        if row:
-            lid = row['id']
+    lid = resolve_league_id(league_identifier)
 
     if not lid:
         return "Лигата не съществува."
 
-    rows = fetch_all(
-        "SELECT m.*, hc.name as home_name, ac.name as away_name FROM matches m JOIN clubs hc ON m.home_team_id = hc.id JOIN clubs ac ON m.away_team_id = ac.id WHERE m.league_id = ? ORDER BY m.match_date",
-        (lid,)
-    )
+    rows = fetch_all(_LEAGUE_FIXTURES, (lid,))
 
     if not rows:
         return "Няма насрочени мачове."
 
     out = []
     for r in rows:
-        out.append(f"{r['match_date']}: {r['home_name']} vs {r['away_name']} ({r['home_goals']}-{r['away_goals']})")
+        hg = r['home_goals'] if r['home_goals'] is not None else '-'
+        ag = r['away_goals'] if r['away_goals'] is not None else '-'
+        out.append(f"{r['match_date']}: {r['home_name']} vs {r['away_name']} ({hg}-{ag})")
 
     return "\n".join(out)
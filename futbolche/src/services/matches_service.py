@@ -1,63 +1,56 @@
-from db import fetch_one, fetch_all, execute
+import re
+from db import fetch_one, fetch_all, execute, transaction
 import services.players_service as players
+from services import standings
+from services.resolver import resolve_club_id, resolve_league_id, resolve_player_ids
 from typing import Optional
 
 
-def _resolve_club_id(club_identifier):
-    if not club_identifier:
-        return None
-    try:
-        cid = int(club_identifier)
-        row = fetch_one("SELECT id FROM clubs WHERE id = ?", (cid,))
-        if row:
-            return row['id']
-    except Exception:
-        pass
-
-    row = fetch_one("SELECT id FROM clubs WHERE LOWER(name) = LOWER(?)", (str(club_identifier),))
-    return row['id'] if row else None
+# A match with its clubs' names; the lookups below add their WHERE clause
+_MATCH_WITH_CLUBS = ("SELECT m.*, hc.name as home_name, ac.name as away_name FROM matches m "
+                     "JOIN clubs hc ON m.home_team_id = hc.id JOIN clubs ac ON m.away_team_id = ac.id")
+_MATCH = _MATCH_WITH_CLUBS + " WHERE m.id = ?"
+_CLUB_MATCHES = _MATCH_WITH_CLUBS + " WHERE m.home_team_id = ? OR m.away_team_id = ?"
+_LEAGUE_FIXTURES = _MATCH_WITH_CLUBS + " WHERE m.league_id = ? ORDER BY m.match_date"
 
 
 def record_match(home_team_id, away_team_id, match_date, home_goals=None, away_goals=None, league_id=None):
     """Insert a match record. Goals may be None for unplayed fixtures."""
-    hid = _resolve_club_id(home_team_id)
-    aid = _resolve_club_id(away_team_id)
+    hid = resolve_club_id(home_team_id, partial=False)
+    aid = resolve_club_id(away_team_id, partial=False)
     if not hid or not aid:
         return "Един от клубовете не съществува."
     if hid == aid:
         return "Двата отбора не могат да бъдат едни и същи."
 
     try:
+        before = standings.cache.version()
         res = execute(
             "INSERT INTO matches (home_team_id, away_team_id, match_date, home_goals, away_goals, league_id) VALUES (?, ?, ?, ?, ?, ?)",
             (hid, aid, match_date, home_goals, away_goals, league_id)
         )
         if res is None:
             return "Грешка при запис на мача."
+        if league_id is not None:
+            standings.cache.apply_result(league_id, before, added=(hid, aid, home_goals, away_goals))
         return f"Мачът беше записан с ID {res}."
     except Exception:
         return "Грешка при запис на мача."
 
 
 def get_match(match_id):
-    row = fetch_one(
-        "SELECT m.*, hc.name as home_name, ac.name as away_name FROM matches m JOIN clubs hc ON m.home_team_id = hc.id JOIN clubs ac ON m.away_team_id = ac.id WHERE m.id = ?",
-        (match_id,)
-    )
+    row = fetch_one(_MATCH, (match_id,))
     if not row:
         return None
     return row
 
 
 def compute_club_stats(club_identifier):
-    cid = _resolve_club_id(club_identifier)
+    cid = resolve_club_id(club_identifier, partial=False)
     if not cid:
         return "Клубът не съществува."
 
-    rows = fetch_all(
-        "SELECT m.*, hc.name as home_name, ac.name as away_name FROM matches m JOIN clubs hc ON m.home_team_id = hc.id JOIN clubs ac ON m.away_team_id = ac.id WHERE m.home_team_id = ? OR m.away_team_id = ?",
-        (cid, cid)
-    )
+    rows = fetch_all(_CLUB_MATCHES, (cid, cid))
 
     if not rows:
         return {
@@ -102,19 +95,12 @@ def compute_club_stats(club_identifier):
 
 
 def get_league_fixtures(league_identifier):
-    # resolve league id
-    lid = None
-    try:
-        lid = int(league_identifier)
-    except Exception:
-        row = fetch_one("SELECT id FROM leagues WHERE LOWER(name)=LOWER(?)", (league_identifier,))
-        if row:
-            lid = row['id']
+    lid = resolve_league_id(league_identifier)
 
     if not lid:
         return "Лигата не съществува."
 
-    rows = fetch_all("SELECT m.*, hc.name as home_name, ac.name as away_name FROM matches m JOIN clubs hc ON m.home_team_id = hc.id JOIN clubs ac ON m.away_team_id = ac.id WHERE m.league_id = ? ORDER BY m.match_date", (lid,))
+    rows = fetch_all(_LEAGUE_FIXTURES, (lid,))
     if not rows:
         return "Няма мачове за тази лига."
 
@@ -127,12 +113,15 @@ def get_league_fixtures(league_identifier):
     return "\n".join(out)
 
 
+_MATCH_ID = "SELECT id FROM matches WHERE id = ?"
+
+
 def _resolve_match_id(match_identifier) -> Optional[int]:
     if not match_identifier:
         return None
     try:
         mid = int(match_identifier)
-        row = fetch_one("SELECT id FROM matches WHERE id = ?", (mid,))
+        row = fetch_one(_MATCH_ID, (mid,))
         if row:
             return row['id']
     except Exception:
@@ -140,13 +129,17 @@ def _resolve_match_id(match_identifier) -> Optional[int]:
     return None
 
 
+EVENT_TYPES = ('goal', 'assist', 'yellow', 'red', 'appearance')
+
+
 def record_event(match_identifier, player_identifier, event_type, minute=None):
     """Record a match event (goal, assist, yellow, red, appearance).
 
     If event_type is 'goal' the match goals are incremented for the player's team.
+    The event and the score change are written in one transaction; the score is
+    incremented in SQL, so concurrent goals for the same match are all counted.
     """
-    allowed = ('goal', 'assist', 'yellow', 'red', 'appearance')
-    if event_type not in allowed:
+    if event_type not in EVENT_TYPES:
         return "Невалиден тип събитие. Допустими: goal, assist, yellow, red, appearance."
 
     mid = _resolve_match_id(match_identifier)
@@ -160,39 +153,218 @@ def record_event(match_identifier, player_identifier, event_type, minute=None):
             return f"Играч '{player_identifier}' не съществува."
 
     try:
-        res = execute(
-            "INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)",
-            (mid, pid, event_type, minute)
-        )
-        if res is None:
-            return "Грешка при запис на събитието."
-
-        # If goal, update match goals depending on player's club
-        if event_type == 'goal' and pid is not None:
-            p = fetch_one("SELECT club_id FROM players WHERE id = ?", (pid,))
-            m = fetch_one("SELECT home_team_id, away_team_id, home_goals, away_goals FROM matches WHERE id = ?", (mid,))
-            if p and m:
-                try:
-                    if p['club_id'] == m['home_team_id']:
-                        execute("UPDATE matches SET home_goals = ? WHERE id = ?", ( (m['home_goals'] or 0) + 1, mid))
-                    elif p['club_id'] == m['away_team_id']:
-                        execute("UPDATE matches SET away_goals = ? WHERE id = ?", ( (m['away_goals'] or 0) + 1, mid))
-                except Exception:
-                    pass
-
+        before = standings.cache.version()
+        with transaction() as tx:
+            # The insert takes the write lock, so the match read below cannot go stale
+            tx.execute(
+                "INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)",
+                (mid, pid, event_type, minute)
+            )
+            change = _apply_goals(tx, mid, [pid]) if event_type == 'goal' and pid is not None else None
+
+        if change is not None:
+            league_id, removed, added = change
+            standings.cache.apply_result(league_id, before, removed=removed, added=added)
         return "Събитието беше записано успешно."
     except Exception:
         return "Грешка при запис на събитието."
 
 
+# Chat/CLI words for event types (see parse_event_lines); the English names are accepted too
+EVENT_WORDS = {
+    'гол': 'goal',
+    'асист': 'assist',
+    'жълт картон': 'yellow',
+    'червен картон': 'red',
+    'поява': 'appearance',
+}
+
+_EVENT_WORD = '|'.join(sorted(list(EVENT_WORDS) + list(EVENT_WORDS.values()), key=len, reverse=True))
+_EVENT_LINE = re.compile(
+    r"^(?P<type>%s)\s+(?P<player>.+?)(?:\s+(?:минута\s+)?(?P<minute>\d{1,3})'?)?$" % _EVENT_WORD,
+    re.IGNORECASE
+)
+# A minute followed by the next event, in a list whose line breaks were collapsed (chat input).
+# Only a minute ends an event here, so a player name may contain an event word.
+_NEXT_EVENT = re.compile(r"(\b\d{1,3}'?)\s+(?=(?:%s)\s)" % _EVENT_WORD, re.IGNORECASE)
+
+
+def parse_event_lines(text: str):
+    """Parse an event list, one event per line or separated by ';'.
+
+    Each entry is `[event] [player] [minute]`, e.g. "гол Иван Иванов 23";
+    the minute is optional. A line holding several entries (chat input,
+    where line breaks are collapsed) is split after each minute that is
+    followed by an event word; entries without a minute need ';' there.
+    Returns (events, bad_entries) where events are
+    (player_identifier, event_type, minute) tuples for record_events_bulk.
+    """
+    events, bad = [], []
+    for entry in re.split(r"[;\n]", _NEXT_EVENT.sub(r"\1;", text or '')):
+        entry = ' '.join(entry.split())
+        if not entry:
+            continue
+        m = _EVENT_LINE.match(entry)
+        if not m:
+            bad.append(entry)
+            continue
+        word = m.group('type').lower()
+        minute = int(m.group('minute')) if m.group('minute') else None
+        events.append((m.group('player'), EVENT_WORDS.get(word, word), minute))
+    return events, bad
+
+
+def record_events_bulk(match_identifier, events):
+    """Record many events of one match at once.
+
+    `events` are (player_identifier, event_type, minute) tuples. All players
+    are resolved in one pass and nothing is written unless every event is
+    valid. The events are inserted with one executemany and the goals are
+    added to the score with one UPDATE, all in one transaction.
+    """
+    events = list(events)
+    if not events:
+        return "Няма събития за запис."
+    malformed = [e for e in events if not isinstance(e, (tuple, list)) or not 1 <= len(e) <= 3]
+    if malformed:
+        return f"Невалидно събитие: {malformed[0]!r}. Всяко събитие е (играч, тип, минута)."
+    events = [tuple(e) + (None,) * (3 - len(e)) for e in events]
+
+    invalid = sorted({e[1] for e in events if e[1] not in EVENT_TYPES}, key=str)
+    if invalid:
+        return f"Невалиден тип събитие: {', '.join(map(str, invalid))}. Допустими: goal, assist, yellow, red, appearance."
+
+    mid = _resolve_match_id(match_identifier)
+    if not mid:
+        return "Мачът не е намерен. Моля укажете валиден ID на мача."
+
+    pids = resolve_player_ids(e[0] for e in events if e[0])
+    missing = [str(identifier) for identifier, pid in pids.items() if pid is None]
+    if missing:
+        return f"Играчи, които не съществуват: {', '.join(missing)}."
+
+    rows = [(mid, pids[player] if player else None, event_type, minute) for player, event_type, minute in events]
+    scorers = [row[1] for row in rows if row[2] == 'goal' and row[1] is not None]
+    try:
+        before = standings.cache.version()
+        with transaction() as tx:
+            tx.execute_many("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)", rows)
+            change = _apply_goals(tx, mid, scorers) if scorers else None
+
+        if change is not None:
+            league_id, removed, added = change
+            standings.cache.apply_result(league_id, before, removed=removed, added=added)
+        return f"Записани {len(rows)} събития за мач {mid}."
+    except Exception:
+        return "Грешка при запис на събитията."
+
+
+def record_event_batches(batches):
+    """Write resolved feed events of many matches in one transaction (group commit).
+
+    `batches` maps match id -> [(player_id, event_type, minute, ingest_key)].
+    Events whose ingest_key is already stored, or repeated within `batches`,
+    are skipped, so a redelivered event is recorded once. Goals are applied
+    per match as in record_events_bulk. Returns the number of events written;
+    database errors propagate and then nothing is written.
+    """
+    written, changes = 0, []
+    before = standings.cache.version()
+    with transaction(immediate=True) as tx:
+        seen = _stored_ingest_keys(tx, [row[3] for rows in batches.values() for row in rows if row[3] is not None])
+        for mid, rows in batches.items():
+            fresh = []
+            for pid, event_type, minute, key in rows:
+                if key is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                fresh.append((mid, pid, event_type, minute, key))
+            if not fresh:
+                continue
+            tx.execute_many("INSERT INTO events (match_id, player_id, event_type, minute, ingest_key) "
+                            "VALUES (?, ?, ?, ?, ?)", fresh)
+            written += len(fresh)
+            scorers = [row[1] for row in fresh if row[2] == 'goal' and row[1] is not None]
+            change = _apply_goals(tx, mid, scorers) if scorers else None
+            if change is not None:
+                changes.append(change)
+
+    for league_id, removed, added in changes:
+        standings.cache.apply_result(league_id, before, removed=removed, added=added)
+    return written
+
+
+_STORED_INGEST_KEYS = "SELECT ingest_key FROM events WHERE ingest_key IN ({marks})"
+
+
+def _stored_ingest_keys(tx, keys):
+    stored = set()
+    keys = list(set(keys))
+    for start in range(0, len(keys), 500):
+        chunk = keys[start:start + 500]
+        marks = ', '.join('?' * len(chunk))
+        stored.update(r['ingest_key'] for r in tx.fetch_all(_STORED_INGEST_KEYS.format(marks=marks), tuple(chunk)))
+    return stored
+
+
+_MATCH_SCORE = "SELECT home_team_id, away_team_id, home_goals, away_goals, league_id FROM matches WHERE id = ?"
+_PLAYER_CLUBS = "SELECT id, club_id FROM players WHERE id IN ({marks})"
+
+
+def _apply_goals(tx, mid, scorers):
+    """Credit goals to their teams in match `mid` with one atomic UPDATE inside transaction `tx`.
+
+    `scorers` holds one player id per goal; goals by players in neither team
+    are not counted and an unplayed fixture (NULL goals) starts at 0-0.
+    Returns (league_id, removed, added) results for the standings cache, or
+    None if the score did not change or the match has no league.
+    """
+    m = tx.fetch_one(_MATCH_SCORE, (mid,))
+    distinct = sorted(set(scorers))
+    marks = ', '.join('?' * len(distinct))
+    clubs = {r['id']: r['club_id']
+             for r in tx.fetch_all(_PLAYER_CLUBS.format(marks=marks), tuple(distinct))}
+    home = sum(1 for pid in scorers if clubs.get(pid) == m['home_team_id'])
+    away = sum(1 for pid in scorers if clubs.get(pid) == m['away_team_id'])
+    if not home and not away:
+        return None
+    # Incremented in SQL, so concurrent writers never overwrite each other's goals
+    tx.execute("UPDATE matches SET home_goals = COALESCE(home_goals, 0) + ?, away_goals = COALESCE(away_goals, 0) + ? "
+               "WHERE id = ?", (home, away, mid))
+
+    if m['league_id'] is None:
+        return None
+    teams = (m['home_team_id'], m['away_team_id'])
+    return (m['league_id'], teams + (m['home_goals'], m['away_goals']),
+            teams + ((m['home_goals'] or 0) + home, (m['away_goals'] or 0) + away))
+
+
+def delete_match(match_identifier):
+    """Delete a match (and its events) and take its result out of the league table."""
+    mid = _resolve_match_id(match_identifier)
+    if not mid:
+        return "Мачът не е намерен."
+
+    m = fetch_one(_MATCH_SCORE, (mid,))
+    before = standings.cache.version()
+    if not execute("DELETE FROM matches WHERE id = ?", (mid,)):
+        return "Грешка при изтриване на мача."
+    if m and m['league_id'] is not None:
+        standings.cache.apply_result(m['league_id'], before,
+                                     removed=(m['home_team_id'], m['away_team_id'], m['home_goals'], m['away_goals']))
+    return f"Мачът с ID {mid} беше изтрит."
+
+
+_MATCH_EVENTS = ("SELECT e.*, p.full_name as player_name FROM events e LEFT JOIN players p ON e.player_id = p.id "
+                 "WHERE e.match_id = ? ORDER BY COALESCE(e.minute, 0)")
+
+
 def get_match_events(match_identifier):
     mid = _resolve_match_id(match_identifier)
     if not mid:
         return "Мачът не е намерен."
-    rows = fetch_all(
-        "SELECT e.*, p.full_name as player_name FROM events e LEFT JOIN players p ON e.player_id = p.id WHERE e.match_id = ? ORDER BY COALESCE(e.minute, 0)",
-        (mid,)
-    )
+    rows = fetch_all(_MATCH_EVENTS, (mid,))
     if not rows:
         return "Няма записани събития за този мач."
     out = []
@@ -203,81 +375,18 @@ def get_match_events(match_identifier):
     return "\n".join(out)
 
 
-def get_league_standings(league_identifier):
-    # resolve league id
-    lid = None
-    try:
-        lid = int(league_identifier)
-    except Exception:
-        row = fetch_one("SELECT id FROM leagues WHERE LOWER(name)=LOWER(?)", (league_identifier,))
-        if row:
-            lid = row['id']
+def get_league_standings(league_identifier, tie_breakers=standings.DEFAULT_TIE_BREAKERS):
+    lid = resolve_league_id(league_identifier)
 
     if not lid:
         return "Лигата не съществува."
 
-    teams = fetch_all("SELECT lt.club_id, c.name FROM league_teams lt JOIN clubs c ON lt.club_id = c.id WHERE lt.league_id = ?", (lid,))
-    if not teams:
+    table = standings.league_table(lid, tie_breakers)
+    if not table:
         return "Няма отбори в тази лига."
 
-    table = []
-    for t in teams:
-        cid = t['club_id']
-        rows = fetch_all("SELECT * FROM matches WHERE league_id = ? AND (home_team_id = ? OR away_team_id = ?)", (lid, cid, cid))
-        stats = {'P': 0, 'W': 0, 'D': 0, 'L': 0, 'GF': 0, 'GA': 0, 'Pts': 0}
-        for r in rows:
-            # skip matches without recorded goals (consider played if home_goals or away_goals is not null)
-            if r['home_goals'] is None or r['away_goals'] is None:
-                continue
-            hg = r['home_goals']
-            ag = r['away_goals']
-            is_home = (r['home_team_id'] == cid)
-            is_away = (r['away_team_id'] == cid)
-            stats['P'] += 1
-            if is_home:
-                stats['GF'] += hg
-                stats['GA'] += ag
-                if hg > ag:
-                    stats['W'] += 1
-                    stats['Pts'] += 3
-                elif hg < ag:
-                    stats['L'] += 1
-                else:
-                    stats['D'] += 1
-                    stats['Pts'] += 1
-            elif is_away:
-                stats['GF'] += ag
-                stats['GA'] += hg
-                if ag > hg:
-                    stats['W'] += 1
-                    stats['Pts'] += 3
-                elif ag < hg:
-                    stats['L'] += 1
-                else:
-                    stats['D'] += 1
-                    stats['Pts'] += 1
-
-        stats['GD'] = stats['GF'] - stats['GA']
-        table.append({
-            'club_id': cid,
-            'club_name': t['name'],
-            'played': stats['P'],
-            'wins': stats['W'],
-            'draws': stats['D'],
-            'losses': stats['L'],
-            'goals_for': stats['GF'],
-            'goals_against': stats['GA'],
-            'goal_difference': stats['GD'],
-            'points': stats['Pts']
-        })
-
-    # sort by points, GD, GF, name
-    table.sort(key=lambda x: (-x['points'], -x['goal_difference'], -x['goals_for'], x['club_name']))
-
     out = []
-    pos = 1
-    for row in table:
-        out.append(f"{pos}. {row['club_name']} — P:{row['played']} W:{row['wins']} D:{row['draws']} L:{row['losses']} GF:{row['goals_for']} GA:{row['goals_against']} GD:{row['goal_difference']} Pts:{row['points']}")
-        pos += 1
+    for pos, r in enumerate(table, start=1):
+        out.append(f"{pos}. {r.name} — P:{r.played} W:{r.wins} D:{r.draws} L:{r.losses} GF:{r.goals_for} GA:{r.goals_against} GD:{r.goal_difference} Pts:{r.points}")
 
     return "\n".join(out)
@@ -1,5 +1,8 @@
+import re
 from db import fetch_one, fetch_all, execute
 from datetime import datetime, date
+from services.resolver import resolve_club_id, resolve_player_id
+from utils.text import name_key
 
 
 def validate_position(position: str) -> bool:
@@ -23,69 +26,21 @@ def validate_birth_date(birth_date: str) -> bool:
 
 
 def get_club_id(club_identifier):
-    # Try by name
     if not club_identifier:
         return None
-    import re
     # Normalize common leading tokens that may be present from user input
-    cid = club_identifier.strip()
+    cid = str(club_identifier).strip()
     cid = re.sub(r'^(в\s+клуб\s+|в\s+|на\s+клуб\s+|на\s+)', '', cid, flags=re.IGNORECASE).strip()
-    # Try exact (case-insensitive) match first using Python casefold for reliable Unicode handling
-    try:
-        clubs = fetch_all("SELECT id, name FROM clubs")
-        if clubs:
-            target = cid.casefold()
-            for c in clubs:
-                if c['name'] and c['name'].casefold() == target:
-                    return c['id']
-    except Exception:
-        pass
-
-    try:
-        club_id = int(cid)
-        row = fetch_one("SELECT id FROM clubs WHERE id = ?", (club_id,))
-        if row:
-            return row['id']
-    except Exception:
-        pass
-    # Try fuzzy match (contains) using Python comparison
-    try:
-        if not locals().get('clubs'):
-            clubs = fetch_all("SELECT id, name FROM clubs")
-        target = cid.casefold()
-        for c in clubs or []:
-            if c['name'] and target in c['name'].casefold():
-                return c['id']
-    except Exception:
-        pass
-
-    return None
+    return resolve_club_id(cid)
 
 
 def get_player_id(player_identifier):
     if not player_identifier:
         return None
-    
-    player_lower = player_identifier.lower()
-    row = fetch_one("SELECT id, full_name FROM players")
-    if row:
-        if row['full_name'].lower() == player_lower:
-            return row['id']
-    
-    all_players = fetch_all("SELECT id, full_name FROM players")
-    for row in all_players:
-        if player_lower in row['full_name'].lower():
-            return row['id']
+    return resolve_player_id(player_identifier)
 
-    try:
-        pid = int(player_identifier)
-        row = fetch_one("SELECT id FROM players WHERE id = ?", (pid,))
-        if row:
-            return row['id']
-    except Exception:
-        pass
 
-    return None
+_PLAYER_IN_CLUB = "SELECT * FROM players WHERE name_key = ? AND club_id = ?"
 
 
 def add_player(club_id, full_name, birth_date, nationality, position, number, status):
@@ -106,10 +61,7 @@ def add_player(club_id, full_name, birth_date, nationality, position, number, st
     if not club:
         return f"Клуб с ID {club_id} не съществува."
 
-    existing = fetch_one(
-        "SELECT * FROM players WHERE LOWER(full_name) = LOWER(?) AND club_id = ?",
-        (full_name, club_id)
-    )
+    existing = fetch_one(_PLAYER_IN_CLUB, (name_key(full_name), club_id))
     if existing:
         return f"Играч с име '{full_name}' вече съществува в този клуб."
 
@@ -122,15 +74,16 @@ def add_player(club_id, full_name, birth_date, nationality, position, number, st
     return f"Играч '{full_name}' беше добавен успешно."
 
 
+_SQUAD = ("SELECT p.*, c.name as club_name FROM players p JOIN clubs c ON p.club_id = c.id "
+          "WHERE p.club_id = ? ORDER BY p.number")
+
+
 def get_players_by_club(club_identifier=None):
     if club_identifier:
         club_id = get_club_id(club_identifier)
         if not club_id:
             return f"Клуб '{club_identifier}' не съществува."
-        rows = fetch_all(
-            "SELECT p.*, c.name as club_name FROM players p JOIN clubs c ON p.club_id = c.id WHERE p.club_id = ? ORDER BY p.number",
-            (club_id,)
-        )
+        rows = fetch_all(_SQUAD, (club_id,))
     else:
         rows = fetch_all(
             "SELECT p.*, c.name as club_name FROM players p JOIN clubs c ON p.club_id = c.id ORDER BY c.name, p.number"
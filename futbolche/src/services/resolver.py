@@ -0,0 +1,119 @@
+"""Shared resolution of club, player and league identifiers to row ids.
+
+Identifiers are either numeric ids or names. Names are matched against the
+indexed, casefolded `name_key` columns: exact match first, then the lowest
+id whose name contains the text, as with the old row-by-row loops. A prefix
+match (an index range scan) is tried first and bounds the substring search
+through the trigram index to lower ids, so it never changes which row wins.
+"""
+from typing import Dict, Iterable, Optional
+
+from db import fetch_all, fetch_one
+from services.search_service import first_substring_match
+from utils.text import name_key
+
+
+# Identifiers per IN (...) query in resolve_player_ids
+_ID_CHUNK = 500
+
+# Appended to a prefix to get the exclusive upper bound of its key range
+_KEY_RANGE_END = '\U0010ffff'
+
+
+# Lookups by id / name key; {table} is clubs, players or leagues
+_BY_ID = "SELECT id FROM {table} WHERE id = ?"
+_EXACT_NAME = "SELECT MIN(id) AS id FROM {table} WHERE name_key = ?"
+_NAME_PREFIX = "SELECT MIN(id) AS id FROM {table} WHERE name_key >= ? AND name_key < ?"
+_PLAYERS_BY_ID = "SELECT id FROM players WHERE id IN ({marks})"
+_PLAYERS_BY_NAME = "SELECT name_key, MIN(id) AS id FROM players WHERE name_key IN ({marks}) GROUP BY name_key"
+
+
+def _is_numeric_id(identifier) -> bool:
+    return isinstance(identifier, int) or (isinstance(identifier, str) and identifier.strip().isdigit())
+
+
+def _resolve(table: str, identifier, partial: bool) -> Optional[int]:
+    if identifier is None or identifier == '':
+        return None
+
+    if _is_numeric_id(identifier):
+        row = fetch_one(_BY_ID.format(table=table), (int(identifier),))
+        if row:
+            return row['id']
+
+    key = name_key(identifier)
+    if not key:
+        return None
+
+    row = fetch_one(_EXACT_NAME.format(table=table), (key,))
+    if row and row['id'] is not None:
+        return row['id']
+    if not partial:
+        return None
+
+    row = fetch_one(_NAME_PREFIX.format(table=table), (key, key + _KEY_RANGE_END))
+    if row and row['id'] is not None:
+        # A lower id may still contain the text further into its name
+        return first_substring_match(table, key, below=row['id']) or row['id']
+
+    return first_substring_match(table, key)
+
+
+def resolve_club_id(identifier, partial: bool = True) -> Optional[int]:
+    """Resolve a club id or name. `partial=False` accepts exact names only."""
+    return _resolve('clubs', identifier, partial)
+
+
+def resolve_player_id(identifier, partial: bool = True) -> Optional[int]:
+    """Resolve a player id or name. `partial=False` accepts exact names only."""
+    return _resolve('players', identifier, partial)
+
+
+def resolve_player_ids(identifiers: Iterable, partial: bool = True) -> Dict[object, Optional[int]]:
+    """Resolve many player ids/names at once: {identifier: player id or None}.
+
+    Numeric ids and exact names are looked up with one IN (...) query each
+    (per 500 identifiers); only the rest fall back to `resolve_player_id`.
+    Results are the same as calling `resolve_player_id` for each identifier.
+    """
+    result = {}
+    numbers, keys = {}, {}
+    for identifier in identifiers:
+        if identifier in result or identifier is None or identifier == '':
+            result.setdefault(identifier, None)
+            continue
+        result[identifier] = None
+        if _is_numeric_id(identifier):
+            numbers.setdefault(int(identifier), []).append(identifier)
+        key = name_key(identifier)
+        if key:
+            keys.setdefault(key, []).append(identifier)
+
+    numeric = list(numbers)
+    for start in range(0, len(numeric), _ID_CHUNK):
+        chunk = numeric[start:start + _ID_CHUNK]
+        marks = ', '.join('?' * len(chunk))
+        for row in fetch_all(_PLAYERS_BY_ID.format(marks=marks), tuple(chunk)):
+            for identifier in numbers[row['id']]:
+                result[identifier] = row['id']
+
+    names = list(keys)
+    for start in range(0, len(names), _ID_CHUNK):
+        chunk = names[start:start + _ID_CHUNK]
+        marks = ', '.join('?' * len(chunk))
+        rows = fetch_all(_PLAYERS_BY_NAME.format(marks=marks), tuple(chunk))
+        for row in rows:
+            for identifier in keys[row['name_key']]:
+                if result[identifier] is None:
+                    result[identifier] = row['id']
+
+    if partial:
+        for identifier, pid in result.items():
+            if pid is None and identifier is not None and identifier != '':
+                result[identifier] = _resolve('players', identifier, partial)
+    return result
+
+
+def resolve_league_id(identifier, partial: bool = False) -> Optional[int]:
+    """Resolve a league id or name (exact names by default)."""
+    return _resolve('leagues', identifier, partial)
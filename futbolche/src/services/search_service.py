@@ -0,0 +1,107 @@
+"""Name search over clubs and players backed by the FTS5 trigram index.
+
+The `clubs_fts`/`players_fts` tables (sql/search_index.sql) index the
+casefolded `name_key` columns, so a trigram MATCH finds substrings of any
+length >= 3 without reading the base tables. When the index is missing
+(SQLite without FTS5 trigram) or the term is shorter than a trigram, the
+queries fall back to `instr()` over `name_key`.
+"""
+from typing import Optional
+
+import db
+from db import fetch_all, fetch_one
+from utils.text import name_key
+
+
+SEARCHABLE = {
+    'clubs': 'name',
+    'players': 'full_name',
+}
+
+# A trigram index cannot answer queries shorter than this
+MIN_TRIGRAM_LENGTH = 3
+
+# DB path -> whether the FTS tables exist there
+_fts_present = {}
+
+
+def _has_fts() -> bool:
+    path = db.DB_PATH
+    present = _fts_present.get(path)
+    if present is None:
+        row = fetch_one("SELECT COUNT(*) AS cnt FROM sqlite_master WHERE type = 'table' AND name = 'clubs_fts'")
+        present = bool(row and row['cnt'])
+        _fts_present[path] = present
+    return present
+
+
+def _phrase(text: str) -> str:
+    """Quote text as an FTS5 phrase so it is matched literally."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def first_substring_match(table: str, key: str, below: Optional[int] = None):
+    """Lowest id in `table` whose name_key contains `key`, or None.
+
+    With `below`, only ids lower than it are considered.
+    """
+    if not key:
+        return None
+    bound, bound_params = ('', ()) if below is None else (' AND {} < ?', (below,))
+    if table in SEARCHABLE and len(key) >= MIN_TRIGRAM_LENGTH and _has_fts():
+        row = fetch_one(f"SELECT MIN(rowid) AS id FROM {table}_fts WHERE {table}_fts MATCH ?" + bound.format('rowid'),
+                        (_phrase(key),) + bound_params)
+    else:
+        row = fetch_one(f"SELECT MIN(id) AS id FROM {table} WHERE instr(name_key, ?) > 0" + bound.format('id'),
+                        (key,) + bound_params)
+    return row['id'] if row and row['id'] is not None else None
+
+
+def search_names(table: str, term: str, limit: int = 10):
+    """Return up to `limit` rows (id, name) of `table` ranked by relevance to `term`.
+
+    Rows containing the whole term rank first (bm25), followed by rows that
+    only contain some of its words, so small typos in one word still match.
+    """
+    key = name_key(term)
+    if not key:
+        return []
+    name_col = SEARCHABLE[table]
+
+    if len(key) >= MIN_TRIGRAM_LENGTH and _has_fts():
+        words = [w for w in key.split() if len(w) >= MIN_TRIGRAM_LENGTH]
+        query = _phrase(key)
+        if len(words) > 1:
+            query += ' OR ' + ' OR '.join(_phrase(w) for w in words)
+        return fetch_all(
+            f"SELECT t.id, t.{name_col} AS name FROM {table}_fts f JOIN {table} t ON t.id = f.rowid "
+            f"WHERE {table}_fts MATCH ? "
+            f"ORDER BY instr(t.name_key, ?) = 0, bm25({table}_fts), t.id LIMIT ?",
+            (query, key, limit)
+        )
+
+    return fetch_all(
+        f"SELECT id, {name_col} AS name FROM {table} WHERE instr(name_key, ?) > 0 "
+        f"ORDER BY name_key = ? DESC, instr(name_key, ?), id LIMIT ?",
+        (key, key, key, limit)
+    )
+
+
+def search(term: str, limit: int = 10) -> str:
+    """Human readable ranked search over clubs and players."""
+    if not term or not term.strip():
+        return "Укажете какво да търся. Формат: търси [текст]"
+
+    clubs = search_names('clubs', term, limit)
+    players = search_names('players', term, limit)
+    if not clubs and not players:
+        return f"Няма намерени резултати за '{term.strip()}'."
+
+    lines = [f"Резултати за '{term.strip()}':"]
+    if clubs:
+        lines.append("Клубове:")
+        lines.extend(f"- {r['name']} (ID {r['id']})" for r in clubs)
+    if players:
+        lines.append("Играчи:")
+        lines.extend(f"- {r['name']} (ID {r['id']})" for r in players)
+    return "\n".join(lines)
@@ -0,0 +1,201 @@
+"""League standings shared by leagues_service and matches_service.
+
+A league's table lists every club registered in the league plus any club
+with a result in it. Totals come from the trigger-maintained `club_stats`
+table, so unplayed fixtures (NULL goals) are never counted and reading a
+table costs one indexed query however many seasons are stored. Tables are
+kept in `cache` and patched in place by the match writes in matches_service.
+"""
+import threading
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import db
+from db import fetch_all
+
+
+class TeamRecord:
+    """One team's line in a league table."""
+
+    __slots__ = ('club_id', 'name', 'played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against')
+
+    def __init__(self, club_id, name, played=0, wins=0, draws=0, losses=0, goals_for=0, goals_against=0):
+        self.club_id = club_id
+        self.name = name
+        self.played = played
+        self.wins = wins
+        self.draws = draws
+        self.losses = losses
+        self.goals_for = goals_for
+        self.goals_against = goals_against
+
+    @property
+    def goal_difference(self) -> int:
+        return self.goals_for - self.goals_against
+
+    @property
+    def points(self) -> int:
+        return self.wins * 3 + self.draws
+
+    def adjusted(self, scored: int, conceded: int, sign: int = 1) -> 'TeamRecord':
+        """Copy of this record with one result added (sign=1) or taken out (sign=-1)."""
+        return TeamRecord(self.club_id, self.name, self.played + sign,
+                          self.wins + sign * (scored > conceded), self.draws + sign * (scored == conceded),
+                          self.losses + sign * (scored < conceded),
+                          self.goals_for + sign * scored, self.goals_against + sign * conceded)
+
+
+# Tie-breaker name -> sort key (ascending sort puts the better team first)
+TIE_BREAKERS = {
+    'points': lambda r: -r.points,
+    'goal_difference': lambda r: -r.goal_difference,
+    'goals_for': lambda r: -r.goals_for,
+    'wins': lambda r: -r.wins,
+    'goals_against': lambda r: r.goals_against,
+    'name': lambda r: r.name,
+}
+
+DEFAULT_TIE_BREAKERS = ('points', 'goal_difference', 'goals_for', 'name')
+
+
+def rank(records: Iterable[TeamRecord], tie_breakers: Sequence[str] = DEFAULT_TIE_BREAKERS) -> List[TeamRecord]:
+    """Sort records best first, comparing `tie_breakers` (names from TIE_BREAKERS) in order."""
+    unknown = [name for name in tie_breakers if name not in TIE_BREAKERS]
+    if unknown:
+        raise ValueError(f"Unknown tie-breaker(s): {', '.join(unknown)}")
+    keys = [TIE_BREAKERS[name] for name in tie_breakers]
+    return sorted(records, key=lambda r: tuple(key(r) for key in keys))
+
+
+# Every club of a league (entered or with results in it) and its club_stats totals there
+_LEAGUE_RECORDS = """SELECT c.id, c.name, cs.played, cs.wins, cs.draws, cs.losses, cs.goals_for, cs.goals_against
+                     FROM clubs c LEFT JOIN club_stats cs ON cs.club_id = c.id AND cs.league_id = :lid
+                     WHERE c.id IN (SELECT club_id FROM league_teams WHERE league_id = :lid
+                                    UNION SELECT club_id FROM club_stats WHERE league_id = :lid)"""
+
+
+def _load_league(league_id: int) -> List[TeamRecord]:
+    rows = fetch_all(_LEAGUE_RECORDS, {'lid': league_id})
+    return [TeamRecord(r['id'], r['name'], r['played'] or 0, r['wins'] or 0, r['draws'] or 0,
+                       r['losses'] or 0, r['goals_for'] or 0, r['goals_against'] or 0)
+            for r in rows]
+
+
+# Tables whose writes can change a league table; matches must stay first (see StandingsCache)
+_READS = ('matches', 'league_teams', 'clubs')
+
+# (home_team_id, away_team_id, home_goals, away_goals)
+Result = Tuple[int, int, Optional[int], Optional[int]]
+
+
+class _Entry:
+    __slots__ = ('version', 'records', 'ranked')
+
+    def __init__(self, version, records):
+        self.version = version
+        self.records = records  # club_id -> TeamRecord
+        self.ranked = {}        # tie_breakers -> ranked list
+
+
+class StandingsCache:
+    """Ranked league tables kept in memory and patched by match writes.
+
+    An entry remembers `db.write_version()` of the tables a league table
+    reads. A writer takes `version()` just before writing one match and then
+    calls `apply_result()`: if nothing but that write happened in between,
+    the two teams' records are adjusted and the table is re-ranked on the
+    next read; otherwise the entry is dropped. Any other write moves the
+    version on, so the next read recomputes the table from club_stats.
+    Records are replaced, never modified, so returned lists stay valid.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.deltas = 0
+
+    @staticmethod
+    def version() -> tuple:
+        return db.write_version(*_READS)
+
+    def table(self, league_id: int, tie_breakers: Sequence[str] = DEFAULT_TIE_BREAKERS) -> List[TeamRecord]:
+        tie_breakers = tuple(tie_breakers)
+        version = self.version()
+        with self._lock:
+            entry = self._entries.get(league_id)
+            if entry is not None and entry.version == version:
+                self.hits += 1
+                ranked = entry.ranked.get(tie_breakers)
+                if ranked is None:
+                    ranked = entry.ranked[tie_breakers] = rank(entry.records.values(), tie_breakers)
+                return list(ranked)
+            self.misses += 1
+
+        records = _load_league(league_id)
+        ranked = rank(records, tie_breakers)
+        with self._lock:
+            entry = _Entry(version, {r.club_id: r for r in records})
+            entry.ranked[tie_breakers] = ranked
+            self._entries[league_id] = entry
+        return list(ranked)
+
+    def apply_result(self, league_id, before: tuple, removed: Optional[Result] = None,
+                     added: Optional[Result] = None) -> None:
+        """Patch a league's table after one committed write to a match.
+
+        `before` is `version()` taken just before the write; `removed` and
+        `added` are the match's result before and after it (None or NULL
+        goals: not counted).
+        """
+        after = self.version()
+        with self._lock:
+            entry = self._entries.get(league_id)
+            if entry is None:
+                return
+            # Only our single write to matches may separate the entry from `after`
+            expected = before[:2] + (before[2] + 1,) + before[3:]
+            if entry.version != before or after != expected:
+                del self._entries[league_id]
+                return
+
+            records = dict(entry.records)
+            for result, sign in ((removed, -1), (added, 1)):
+                if result is None or result[2] is None or result[3] is None:
+                    continue
+                home, away, home_goals, away_goals = result
+                try:
+                    home_goals, away_goals = int(home_goals), int(away_goals)
+                except (TypeError, ValueError):
+                    del self._entries[league_id]
+                    return
+                for club_id, scored, conceded in ((home, home_goals, away_goals), (away, away_goals, home_goals)):
+                    record = records.get(club_id)
+                    if record is None:
+                        # A club new to this league: let the next read load it
+                        del self._entries[league_id]
+                        return
+                    records[club_id] = record.adjusted(scored, conceded, sign)
+
+            entry.records = records
+            entry.ranked = {}
+            entry.version = after
+            self.deltas += 1
+
+    def info(self) -> dict:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'deltas': self.deltas,
+                    'leagues': len(self._entries)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.deltas = 0
+
+
+cache = StandingsCache()
+
+
+def league_table(league_id: int, tie_breakers: Sequence[str] = DEFAULT_TIE_BREAKERS) -> List[TeamRecord]:
+    """Ranked TeamRecords for a league (empty if it has neither teams nor results)."""
+    return cache.table(league_id, tie_breakers)
@@ -1,104 +1,200 @@
 from db import fetch_one, fetch_all, fetch_all as fetchAll, fetch_one as fetchOne
+from services.resolver import resolve_club_id, resolve_player_id
 
 
-def _resolve_club_id(identifier):
-    # identifier may be int or name
-    if isinstance(identifier, int) or (isinstance(identifier, str) and identifier.isdigit()):
-        return int(identifier)
-    row = fetch_one("SELECT id FROM clubs WHERE LOWER(name) = LOWER(?)", (str(identifier),))
-    if row:
-        return row['id']
-    # try contains
-    rows = fetch_all("SELECT id, name FROM clubs")
-    for r in rows:
-        if str(identifier).casefold() in r['name'].casefold():
-            return r['id']
-    return None
+# Max ids bound into one IN (...) list
+_ID_CHUNK = 500
+
+
+def _club_stats(cid, row):
+    played = row['played'] or 0 if row else 0
+    wins = row['wins'] or 0 if row else 0
+    draws = row['draws'] or 0 if row else 0
+    goals_for = row['goals_for'] or 0 if row else 0
+    goals_against = row['goals_against'] or 0 if row else 0
+    return {
+        'club_id': cid,
+        'played': played,
+        'wins': wins,
+        'draws': draws,
+        'losses': played - wins - draws,
+        'goals_for': goals_for,
+        'goals_against': goals_against,
+        'goal_difference': goals_for - goals_against,
+        'points': wins * 3 + draws
+    }
+
+
+# club_stats keeps one row per league the club played in (primary key lookup)
+_CLUB_STATS = """SELECT SUM(played) AS played, SUM(wins) AS wins, SUM(draws) AS draws,
+                        SUM(goals_for) AS goals_for, SUM(goals_against) AS goals_against
+                 FROM club_stats WHERE club_id = ?"""
 
 
 def get_club_statistics(identifier):
     """Return aggregated statistics for a club: matches, wins, draws, losses, goals for/against, points."""
-    cid = _resolve_club_id(identifier)
+    cid = resolve_club_id(identifier)
     if not cid:
         return None
 
-    played_q = "SELECT COUNT(*) as cnt FROM matches WHERE home_team_id = ? OR away_team_id = ?"
-    played = fetch_one(played_q, (cid, cid))['cnt'] or 0
+    row = fetch_one(_CLUB_STATS, (cid,))
+    return _club_stats(cid, row)
 
-    wins_home = fetch_one("SELECT COUNT(*) as cnt FROM matches WHERE home_team_id = ? AND home_goals > away_goals", (cid,))['cnt'] or 0
-    wins_away = fetch_one("SELECT COUNT(*) as cnt FROM matches WHERE away_team_id = ? AND away_goals > home_goals", (cid,))['cnt'] or 0
-    wins = wins_home + wins_away
 
-    draws = fetch_one("SELECT COUNT(*) as cnt FROM matches WHERE (home_team_id = ? OR away_team_id = ?) AND home_goals = away_goals", (cid, cid))['cnt'] or 0
-    losses = (played - wins - draws) if played is not None else 0
+_CLUB_TOTALS = """SELECT c.id AS club_id, SUM(cs.played) AS played, SUM(cs.wins) AS wins,
+                         SUM(cs.draws) AS draws, SUM(cs.goals_for) AS goals_for,
+                         SUM(cs.goals_against) AS goals_against
+                  FROM clubs c LEFT JOIN club_stats cs ON cs.club_id = c.id
+                  {filter} GROUP BY c.id"""
 
-    gf_home = fetch_one("SELECT COALESCE(SUM(home_goals),0) as s FROM matches WHERE home_team_id = ?", (cid,))['s'] or 0
-    gf_away = fetch_one("SELECT COALESCE(SUM(away_goals),0) as s FROM matches WHERE away_team_id = ?", (cid,))['s'] or 0
-    goals_for = gf_home + gf_away
 
-    ga_home = fetch_one("SELECT COALESCE(SUM(away_goals),0) as s FROM matches WHERE home_team_id = ?", (cid,))['s'] or 0
-    ga_away = fetch_one("SELECT COALESCE(SUM(home_goals),0) as s FROM matches WHERE away_team_id = ?", (cid,))['s'] or 0
-    goals_against = ga_home + ga_away
+def get_club_statistics_many(club_ids=None):
+    """Statistics for many clubs at once: {club_id: stats dict as from get_club_statistics}.
 
-    goal_diff = goals_for - goals_against
-    points = wins * 3 + draws
+    One grouped read of `club_stats` (per chunk of ids) instead of one query
+    per club. `club_ids=None` means every club; ids that are not clubs are
+    left out.
+    """
+    if club_ids is None:
+        rows = fetch_all(_CLUB_TOTALS.format(filter=''))
+    else:
+        ids = list(dict.fromkeys(int(i) for i in club_ids))
+        rows = []
+        for start in range(0, len(ids), _ID_CHUNK):
+            chunk = ids[start:start + _ID_CHUNK]
+            marks = ', '.join('?' * len(chunk))
+            rows.extend(fetch_all(_CLUB_TOTALS.format(filter=f"WHERE c.id IN ({marks})"), tuple(chunk)))
+    return {r['club_id']: _club_stats(r['club_id'], r) for r in rows}
+
+
+def check_club_stats():
+    """Compare club_stats with totals recomputed from matches.
+
+    Returns a list of (club_id, league_id, stored, expected) for every row
+    that differs; `stored`/`expected` are dicts or None when the row is
+    missing. An empty list means the table is consistent.
+    """
+    columns = ('played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against')
+    select = "SELECT club_id, league_id, " + ", ".join(columns)
+    rows = fetch_all(
+        f"""SELECT 'stored' AS side, * FROM ({select} FROM club_stats
+                EXCEPT {select} FROM club_stats_from_matches)
+            UNION ALL
+            SELECT 'expected', * FROM ({select} FROM club_stats_from_matches
+                EXCEPT {select} FROM club_stats)"""
+    )
+    diffs = {}
+    for r in rows:
+        key = (r['club_id'], r['league_id'])
+        diffs.setdefault(key, {'stored': None, 'expected': None})[r['side']] = {c: r[c] for c in columns}
+    return [(cid, lid, d['stored'], d['expected']) for (cid, lid), d in sorted(diffs.items())]
 
-    return {
-        'club_id': cid,
-        'played': played,
-        'wins': wins,
-        'draws': draws,
-        'losses': losses,
-        'goals_for': goals_for,
-        'goals_against': goals_against,
-        'goal_difference': goal_diff,
-        'points': points
-    }
 
+# events.event_type -> key in the player statistics dict
+EVENT_STAT_KEYS = {
+    'goal': 'goals',
+    'assist': 'assists',
+    'appearance': 'appearances',
+    'yellow': 'yellow_cards',
+    'red': 'red_cards',
+}
 
-def _resolve_player_id(identifier):
-    if isinstance(identifier, int) or (isinstance(identifier, str) and identifier.isdigit()):
-        return int(identifier)
-    row = fetch_one("SELECT id FROM players WHERE LOWER(full_name) = LOWER(?)", (str(identifier),))
-    if row:
-        return row['id']
-    rows = fetch_all("SELECT id, full_name FROM players")
-    for r in rows:
-        if str(identifier).casefold() in r['full_name'].casefold():
-            return r['id']
-    return None
 
+# player_stats columns, also the keys of the player statistics dict
+PLAYER_STAT_COLUMNS = ('goals', 'assists', 'appearances', 'yellow_cards', 'red_cards', 'minutes')
 
-def get_player_statistics(identifier):
-    pid = _resolve_player_id(identifier)
-    if not pid:
-        return None
 
-    goals = fetch_one("SELECT COUNT(*) as cnt FROM events WHERE player_id = ? AND event_type = 'goal'", (pid,))['cnt'] or 0
-    assists = fetch_one("SELECT COUNT(*) as cnt FROM events WHERE player_id = ? AND event_type = 'assist'", (pid,))['cnt'] or 0
-    yellows = fetch_one("SELECT COUNT(*) as cnt FROM events WHERE player_id = ? AND event_type = 'yellow'", (pid,))['cnt'] or 0
-    reds = fetch_one("SELECT COUNT(*) as cnt FROM events WHERE player_id = ? AND event_type = 'red'", (pid,))['cnt'] or 0
-    appearances = fetch_one("SELECT COUNT(*) as cnt FROM events WHERE player_id = ? AND event_type = 'appearance'", (pid,))['cnt'] or 0
+def _player_stats(pid, row):
+    stats = {'player_id': pid}
+    for key in PLAYER_STAT_COLUMNS:
+        stats[key] = (row[key] or 0) if row else 0
+    return stats
 
-    return {
-        'player_id': pid,
-        'goals': goals,
-        'assists': assists,
-        'appearances': appearances,
-        'yellow_cards': yellows,
-        'red_cards': reds
-    }
 
+# player_stats is kept up to date by triggers on events (primary key lookup)
+_PLAYER_STATS = "SELECT * FROM player_stats WHERE player_id = ?"
 
-def get_player_advanced_metrics(identifier):
-    """Compute advanced per-90 metrics for a player: minutes played (approx), goals/90, assists/90."""
-    stats = get_player_statistics(identifier)
-    if not stats:
+
+def get_player_statistics(identifier):
+    pid = resolve_player_id(identifier)
+    if not pid:
         return None
 
-    # Approximate minutes played as appearances * 90 (best-effort when no minutes data available)
-    appearances = stats.get('appearances', 0) or 0
-    minutes_played = appearances * 90
+    row = fetch_one(_PLAYER_STATS, (pid,))
+    return _player_stats(pid, row)
+
+
+# Same totals as the player_stats_from_events view, for events of one league
+_LEAGUE_EVENT_TOTALS = """SELECT player_id,
+                                 SUM(event_type = 'goal') AS goals,
+                                 SUM(event_type = 'assist') AS assists,
+                                 SUM(event_type = 'appearance') AS appearances,
+                                 SUM(event_type = 'yellow') AS yellow_cards,
+                                 SUM(event_type = 'red') AS red_cards,
+                                 SUM(event_type = 'appearance') * 90 AS minutes
+                          FROM events
+                          WHERE player_id IN (SELECT id FROM players{player_filter})
+                            AND match_id IN (SELECT id FROM matches WHERE league_id = ?)
+                          GROUP BY player_id"""
+
+
+_ALL_PLAYER_STATS = "SELECT p.id AS player_id, ps.* FROM players p LEFT JOIN player_stats ps ON ps.player_id = p.id"
+_SQUAD_FILTER = " WHERE p.club_id = ?"
+# Players of a league's clubs, optionally narrowed to one club by _LEAGUE_CLUB_FILTER
+_LEAGUE_PLAYERS_FILTER = " WHERE club_id IN (SELECT club_id FROM league_teams WHERE league_id = ?)"
+_LEAGUE_CLUB_FILTER = " AND club_id = ?"
+_PLAYER_IDS = "SELECT id FROM players{player_filter}"
+
+
+def get_player_statistics_many(club_id=None, league_id=None):
+    """Statistics for many players at once: {player_id: stats dict as from get_player_statistics}.
+
+    By default every player is included. `club_id` limits it to one squad.
+    Totals come from `player_stats`. `league_id` limits it to players of the
+    league's clubs and counts only events from that league's matches, which
+    is summed from `events` since player_stats is not split by league.
+    """
+    if league_id is None:
+        if club_id is not None:
+            rows = fetch_all(_ALL_PLAYER_STATS + _SQUAD_FILTER, (club_id,))
+        else:
+            rows = fetch_all(_ALL_PLAYER_STATS)
+        return {r['player_id']: _player_stats(r['player_id'], r) for r in rows}
+
+    player_filter = _LEAGUE_PLAYERS_FILTER
+    params = (league_id,)
+    if club_id is not None:
+        player_filter += _LEAGUE_CLUB_FILTER
+        params += (club_id,)
+    totals = {r['id']: None for r in fetch_all(_PLAYER_IDS.format(player_filter=player_filter), params)}
+    for r in fetch_all(_LEAGUE_EVENT_TOTALS.format(player_filter=player_filter), params + (league_id,)):
+        if r['player_id'] in totals:
+            totals[r['player_id']] = r
+    return {pid: _player_stats(pid, row) for pid, row in totals.items()}
+
+
+def check_player_stats():
+    """Compare player_stats with totals recomputed from events.
+
+    Returns a list of (player_id, stored, expected) like check_club_stats().
+    """
+    select = "SELECT player_id, " + ", ".join(PLAYER_STAT_COLUMNS)
+    expected = f"{select} FROM player_stats_from_events WHERE player_id IN (SELECT id FROM players)"
+    rows = fetch_all(
+        f"""SELECT 'stored' AS side, * FROM ({select} FROM player_stats EXCEPT {expected})
+            UNION ALL
+            SELECT 'expected', * FROM ({expected} EXCEPT {select} FROM player_stats)"""
+    )
+    diffs = {}
+    for r in rows:
+        diffs.setdefault(r['player_id'], {'stored': None, 'expected': None})[r['side']] = \
+            {c: r[c] for c in PLAYER_STAT_COLUMNS}
+    return [(pid, d['stored'], d['expected']) for pid, d in sorted(diffs.items())]
+
+
+def _advanced_metrics(stats):
+    # Minutes are approximated in player_stats as 90 per appearance
+    minutes_played = stats.get('minutes', 0) or 0
 
     goals = stats.get('goals', 0) or 0
     assists = stats.get('assists', 0) or 0
@@ -116,3 +212,17 @@ def get_player_advanced_metrics(identifier):
         'goals_per_90': goals_per_90,
         'assists_per_90': assists_per_90
     }
+
+
+def get_player_advanced_metrics(identifier):
+    """Compute advanced per-90 metrics for a player: minutes played (approx), goals/90, assists/90."""
+    stats = get_player_statistics(identifier)
+    if not stats:
+        return None
+    return _advanced_metrics(stats)
+
+
+def get_player_advanced_metrics_many(club_id=None, league_id=None):
+    """Advanced metrics for many players, from one get_player_statistics_many() query."""
+    return {pid: _advanced_metrics(stats)
+            for pid, stats in get_player_statistics_many(club_id, league_id).items()}
@@ -1,8 +1,12 @@
-from db import connect, commit, rollback
+from db import connect, commit, rollback, release_connection
 from services.players_service import get_player_id, get_club_id
 from utils.logger import log_command
 
 
+_NUMBER_TAKEN = "SELECT id FROM players WHERE club_id = ? AND number = ? AND id != ?"
+_CLUB_NUMBERS = "SELECT number FROM players WHERE club_id = ? ORDER BY number"
+
+
 def transfer_player(player_identifier, to_club_identifier):
     """Transfer a player to another club inside a DB transaction.
 
@@ -33,12 +37,12 @@ def transfer_player(player_identifier, to_club_identifier):
             return "Играчът вече е в този клуб."
 
         # check if jersey number is taken in target club
-        cur.execute("SELECT id FROM players WHERE club_id = ? AND number = ? AND id != ?", (to_cid, p['number'], pid))
+        cur.execute(_NUMBER_TAKEN, (to_cid, p['number'], pid))
         conflict = cur.fetchone()
         assigned_number = p['number']
         if conflict:
             # find smallest available number in target club
-            cur.execute("SELECT number FROM players WHERE club_id = ? ORDER BY number", (to_cid,))
+            cur.execute(_CLUB_NUMBERS, (to_cid,))
             used = {r['number'] for r in cur.fetchall()}
             for n in range(1, 100):
                 if n not in used:
@@ -64,7 +68,4 @@ def transfer_player(player_identifier, to_club_identifier):
         rollback(conn)
         return "Грешка при трансфер на играча."
     finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
+        release_connection(conn)
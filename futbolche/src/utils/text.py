@@ -0,0 +1,9 @@
+def name_key(value):
+    """Return the lookup key for a club/player/league name.
+
+    Keys are stripped and casefolded in Python, which (unlike SQLite's LOWER)
+    folds Cyrillic, so "Левски София" and "левски софия" share one key.
+    """
+    if value is None:
+        return None
+    return str(value).strip().casefold()
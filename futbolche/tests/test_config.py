@@ -46,6 +46,8 @@ class TestConfig:
         """Cleanup test environment"""
         try:
             import db as real_db
+            # release pooled connections to the temporary database
+            real_db.close_pool()
             # restore original paths
             if self.original_db_path is not None:
                 real_db.DB_PATH = self.original_db_path
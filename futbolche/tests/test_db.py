@@ -4,6 +4,7 @@ Unit tests for database operations (db.py)
 """
 
 import os
+import sqlite3
 import sys
 import tempfile
 import unittest
@@ -18,6 +19,24 @@ sys.path.insert(0, os.path.dirname(__file__))
 import db
 from db import initialize_database, get_connection, execute_query
 
+# Tables as created by the original schema.sql, before PRAGMA user_version
+LEGACY_SCHEMA_V1 = """
+CREATE TABLE clubs (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE,
+                    city TEXT NOT NULL, founded_year INTEGER NOT NULL);
+CREATE TABLE players (id INTEGER PRIMARY KEY AUTOINCREMENT, club_id INTEGER NOT NULL,
+                      full_name TEXT NOT NULL, birth_date TEXT NOT NULL, nationality TEXT NOT NULL,
+                      position TEXT NOT NULL, number INTEGER NOT NULL, status TEXT NOT NULL,
+                      FOREIGN KEY (club_id) REFERENCES clubs(id) ON DELETE CASCADE);
+CREATE TABLE matches (id INTEGER PRIMARY KEY AUTOINCREMENT, home_team_id INTEGER NOT NULL,
+                      away_team_id INTEGER NOT NULL, home_goals INTEGER NOT NULL DEFAULT 0,
+                      away_goals INTEGER NOT NULL DEFAULT 0, match_date TEXT NOT NULL, league_id INTEGER);
+CREATE TABLE leagues (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, season TEXT NOT NULL);
+CREATE TABLE league_teams (id INTEGER PRIMARY KEY AUTOINCREMENT, league_id INTEGER NOT NULL,
+                           club_id INTEGER NOT NULL, UNIQUE(league_id, club_id));
+CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, match_id INTEGER NOT NULL, player_id INTEGER,
+                     event_type TEXT NOT NULL, minute INTEGER);
+"""
+
 
 class TestDatabaseOperations(unittest.TestCase):
     """Test cases for database operations"""
@@ -192,5 +211,384 @@ class TestDatabaseOperations(unittest.TestCase):
         self.assertEqual(fk_info[0]['table'], 'clubs', "Should reference clubs table")
 
 
+
+class TestDatabaseInitialization(unittest.TestCase):
+    """Test cases for one-time, versioned database initialization"""
+
+    def setUp(self):
+        self.test_config = __import__('test_config').test_config
+        self.test_config.setup_test_environment()
+
+    def tearDown(self):
+        self.test_config.cleanup_test_environment()
+
+    def _user_version(self):
+        conn = sqlite3.connect(db.DB_PATH)
+        try:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_initialize_records_schema_version(self):
+        """initialize_database stamps PRAGMA user_version"""
+        self.assertEqual(self._user_version(), db.SCHEMA_VERSION)
+
+    def test_hot_path_skips_initialization(self):
+        """Queries never re-run initialization or touch the filesystem"""
+        db.fetch_one("SELECT 1")
+        with patch('db.initialize_database', side_effect=AssertionError("initialized again")), \
+                patch('os.path.exists', side_effect=AssertionError("filesystem probe")):
+            row = db.fetch_one("SELECT COUNT(*) as count FROM clubs")
+        self.assertEqual(row['count'], 8)
+
+    def _create_version_1_database(self, user_version):
+        """Replace the test database with one using the original (version 1) tables"""
+        db.close_pool()
+        os.remove(db.DB_PATH)
+        conn = sqlite3.connect(db.DB_PATH)
+        conn.executescript(LEGACY_SCHEMA_V1)
+        conn.execute("INSERT INTO clubs (name, city, founded_year) VALUES ('Левски София', 'София', 1914)")
+        conn.execute("INSERT INTO players (club_id, full_name, birth_date, nationality, position, number, status) "
+                     "VALUES (1, 'Иван Иванов', '1995-03-15', 'България', 'GK', 1, 'Активен')")
+        conn.execute(f"PRAGMA user_version = {user_version}")
+        conn.commit()
+        conn.close()
+
+    def test_legacy_database_is_stamped_without_reseeding(self):
+        """An unversioned database with tables keeps its data"""
+        self._create_version_1_database(user_version=0)
+
+        initialize_database()
+
+        self.assertEqual(self._user_version(), db.SCHEMA_VERSION)
+        row = db.fetch_one("SELECT COUNT(*) as count FROM clubs")
+        self.assertEqual(row['count'], 1)
+
+    def test_migrations_upgrade_version_1_database(self):
+        """A version 1 database gains indexes and name keys in place"""
+        self._create_version_1_database(user_version=1)
+
+        initialize_database()
+
+        self.assertEqual(self._user_version(), db.SCHEMA_VERSION)
+        indexes = {r['name'] for r in db.fetch_all("SELECT name FROM sqlite_master WHERE type='index'")}
+        self.assertIn('idx_matches_home_team', indexes)
+        self.assertIn('idx_events_player_type', indexes)
+        self.assertIn('idx_players_name_key', indexes)
+        tables = {r['name'] for r in db.fetch_all("SELECT name FROM sqlite_master WHERE type='table'")}
+        self.assertIn('players_fts', tables)
+        row = db.fetch_one("SELECT name_key FROM players WHERE id = 1")
+        self.assertEqual(row['name_key'], 'иван иванов')
+
+    def test_migration_fills_club_stats_from_existing_matches(self):
+        """club_stats added by migration 5 starts out with the stored matches"""
+        self._create_version_1_database(user_version=1)
+        conn = sqlite3.connect(db.DB_PATH)
+        conn.execute("INSERT INTO clubs (name, city, founded_year) VALUES ('ЦСКА София', 'София', 1948)")
+        conn.execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) "
+                     "VALUES (1, 2, 2, 0, '2025-09-01')")
+        conn.commit()
+        conn.close()
+
+        initialize_database()
+
+        rows = db.fetch_all("SELECT club_id, played, wins, losses, goals_for FROM club_stats ORDER BY club_id")
+        self.assertEqual([tuple(r) for r in rows], [(1, 1, 1, 0, 2), (2, 1, 0, 1, 0)])
+
+    def test_migration_fills_player_stats_from_existing_events(self):
+        """player_stats added by migration 6 starts out with the stored events"""
+        self._create_version_1_database(user_version=1)
+        conn = sqlite3.connect(db.DB_PATH)
+        conn.execute("INSERT INTO clubs (name, city, founded_year) VALUES ('ЦСКА София', 'София', 1948)")
+        conn.execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) "
+                     "VALUES (1, 2, 1, 0, '2025-09-01')")
+        conn.executemany("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (1, 1, ?, ?)",
+                         [('goal', 10), ('appearance', 0)])
+        conn.commit()
+        conn.close()
+
+        initialize_database()
+
+        row = db.fetch_one("SELECT goals, appearances, minutes FROM player_stats WHERE player_id = 1")
+        self.assertEqual(tuple(row), (1, 1, 90))
+
+    def test_migration_makes_goals_nullable_and_keeps_events(self):
+        """Migration 7 rebuilds matches without dropping the events that reference them"""
+        self._create_version_1_database(user_version=1)
+        conn = sqlite3.connect(db.DB_PATH)
+        conn.execute("INSERT INTO clubs (name, city, founded_year) VALUES ('ЦСКА София', 'София', 1948)")
+        conn.execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) "
+                     "VALUES (1, 2, 1, 0, '2025-09-01')")
+        conn.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (1, 1, 'goal', 10)")
+        conn.commit()
+        conn.close()
+
+        initialize_database()
+
+        self.assertEqual(db.fetch_one("SELECT COUNT(*) AS n FROM events")['n'], 1)
+        self.assertEqual(db.fetch_all("PRAGMA foreign_key_check"), [])
+        fixture = db.execute("INSERT INTO matches (home_team_id, away_team_id, match_date) VALUES (2, 1, '2025-09-08')")
+        row = db.fetch_one("SELECT home_goals, away_goals FROM matches WHERE id = ?", (fixture,))
+        self.assertEqual((row['home_goals'], row['away_goals']), (None, None))
+        self.assertEqual(db.fetch_one("SELECT played FROM club_stats WHERE club_id = 1")['played'], 1)
+        db.execute("UPDATE matches SET home_goals = 0, away_goals = 0 WHERE id = ?", (fixture,))
+        self.assertEqual(db.fetch_one("SELECT played FROM club_stats WHERE club_id = 1")['played'], 2)
+
+    def test_migration_adds_unique_event_ingest_key(self):
+        """Migration 8 adds events.ingest_key; a key can be stored once, NULL any number of times"""
+        self._create_version_1_database(user_version=1)
+
+        initialize_database()
+
+        columns = {r['name'] for r in db.fetch_all("PRAGMA table_info(events)")}
+        self.assertIn('ingest_key', columns)
+        db.execute("INSERT INTO matches (home_team_id, away_team_id, match_date) VALUES (1, 1, '2025-09-01')")
+        insert = "INSERT INTO events (match_id, player_id, event_type, ingest_key) VALUES (1, 1, 'yellow', ?)"
+        with db.transaction() as tx:
+            tx.execute_many(insert, [(None,), (None,), ('feed:1',)])
+        with self.assertRaises(sqlite3.IntegrityError):
+            with db.transaction(immediate=True) as tx:
+                tx.execute(insert, ('feed:1',))
+        self.assertEqual(db.fetch_one("SELECT COUNT(*) AS n FROM events")['n'], 3)
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Test cases for the pooled connection subsystem"""
+
+    def setUp(self):
+        self.test_config = __import__('test_config').test_config
+        self.test_config.setup_test_environment()
+
+    def tearDown(self):
+        self.test_config.cleanup_test_environment()
+
+    def test_released_connection_is_reused(self):
+        """A released connection is handed out again on the next checkout"""
+        conn = get_connection()
+        db.release_connection(conn)
+        self.assertIs(get_connection(), conn)
+
+    def test_fetch_helpers_do_not_open_new_connections(self):
+        """Repeated queries reuse pooled connections instead of reconnecting"""
+        db.fetch_one("SELECT 1")
+        with patch.object(db.ConnectionPool, '_open', side_effect=Exception("should not reconnect")):
+            for _ in range(20):
+                row = db.fetch_one("SELECT COUNT(*) as count FROM clubs")
+                self.assertEqual(row['count'], 8)
+
+    def test_closed_connection_fails_health_check(self):
+        """A connection closed by the caller is discarded on checkout"""
+        conn = get_connection()
+        db.release_connection(conn)
+        conn.close()
+        fresh = get_connection()
+        self.assertIsNot(fresh, conn)
+        self.assertEqual(fresh.execute("SELECT 1").fetchone()[0], 1)
+        db.release_connection(fresh)
+
+    def test_release_rolls_back_uncommitted_work(self):
+        """Uncommitted changes never leak into the next checkout"""
+        db.execute("INSERT INTO clubs (name, city, founded_year) VALUES (?, ?, ?)",
+                   ("Незаписан Клуб", "Град", 2000), commit=False)
+        row = db.fetch_one("SELECT COUNT(*) as count FROM clubs WHERE name = ?", ("Незаписан Клуб",))
+        self.assertEqual(row['count'], 0)
+
+    def test_pool_follows_db_path_and_shuts_down(self):
+        """Changing DB_PATH rebuilds the pool; close_pool drops idle connections"""
+        pool = db.get_pool()
+        self.assertEqual(pool.path, db.DB_PATH)
+        db.fetch_one("SELECT 1")
+        db.close_pool()
+        self.assertIsNot(db.get_pool(), pool)
+
+    def test_pool_is_usable_from_threads(self):
+        """Worker threads can share the pool without sqlite thread errors"""
+        import threading
+        errors = []
+
+        def worker():
+            for _ in range(25):
+                row = db.fetch_one("SELECT COUNT(*) as count FROM players")
+                if not row or row['count'] != 38:
+                    errors.append(row)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+
+
+
+class TestPragmaProfile(unittest.TestCase):
+    """Test cases for the configurable SQLite pragma profile"""
+
+    def setUp(self):
+        self.test_config = __import__('test_config').test_config
+        self.test_config.setup_test_environment()
+        self.original_profile = db.DB_PROFILE
+
+    def tearDown(self):
+        db.DB_PROFILE = self.original_profile
+        self.test_config.cleanup_test_environment()
+
+    def _pragma(self, name):
+        return db.fetch_one(f"PRAGMA {name}")[0]
+
+    def test_performance_profile_is_applied(self):
+        """Pooled connections run with WAL, NORMAL sync, mmap and busy timeout"""
+        db.DB_PROFILE = 'performance'
+        self.assertEqual(self._pragma('journal_mode'), 'wal')
+        self.assertEqual(self._pragma('synchronous'), 1)
+        self.assertEqual(self._pragma('cache_size'), -65536)
+        self.assertEqual(self._pragma('mmap_size'), 268435456)
+        self.assertEqual(self._pragma('temp_store'), 2)
+        self.assertEqual(self._pragma('busy_timeout'), 5000)
+        self.assertEqual(self._pragma('foreign_keys'), 1)
+
+    def test_switching_profile_rebuilds_pool(self):
+        """Changing DB_PROFILE takes effect on the next checkout"""
+        db.DB_PROFILE = 'safe'
+        self.assertEqual(self._pragma('journal_mode'), 'delete')
+        self.assertEqual(self._pragma('synchronous'), 2)
+
+    def test_unknown_profile_falls_back(self):
+        """An unknown profile name uses the performance settings"""
+        self.assertEqual(db.get_pragma_profile('no-such-profile'), db.PRAGMA_PROFILES['performance'])
+
+    def test_reader_not_blocked_by_open_write_transaction(self):
+        """With WAL a reader sees committed data while a writer holds a transaction"""
+        db.DB_PROFILE = 'performance'
+        writer = get_connection()
+        try:
+            writer.execute("BEGIN IMMEDIATE")
+            writer.execute("INSERT INTO clubs (name, city, founded_year) VALUES ('Пишещ Клуб', 'Град', 2000)")
+            row = db.fetch_one("SELECT COUNT(*) as count FROM clubs")
+            self.assertEqual(row['count'], 8)
+        finally:
+            db.release_connection(writer)
+
+    def test_environment_overrides_path_and_profile(self):
+        """FUTBOLCHE_DB_PATH and FUTBOLCHE_DB_PROFILE configure the module"""
+        import subprocess
+        env = dict(os.environ, FUTBOLCHE_DB_PATH='/tmp/configured.db', FUTBOLCHE_DB_PROFILE='safe')
+        src_dir = os.path.join(os.path.dirname(__file__), '..', 'src')
+        out = subprocess.run(
+            [sys.executable, '-c', 'import db; print(db.DB_PATH, db.DB_PROFILE)'],
+            cwd=src_dir, env=env, capture_output=True, text=True, check=True
+        ).stdout.split()
+        self.assertEqual(out, ['/tmp/configured.db', 'safe'])
+
+
+class TestWriteVersions(unittest.TestCase):
+    """Test cases for the per-table write versions used by cached reads"""
+
+    def setUp(self):
+        self.test_config = __import__('test_config').test_config
+        self.test_config.setup_test_environment()
+
+    def tearDown(self):
+        self.test_config.cleanup_test_environment()
+
+    def test_execute_bumps_only_the_written_table(self):
+        clubs = db.write_version('clubs')
+        players = db.write_version('players')
+        db.execute("UPDATE players SET status = 'Контузен' WHERE id = 1")
+        self.assertEqual(db.write_version('clubs'), clubs)
+        self.assertNotEqual(db.write_version('players'), players)
+
+    def test_insert_does_not_cascade(self):
+        players = db.write_version('players')
+        db.execute("INSERT INTO clubs (name, city, founded_year) VALUES ('Нов Клуб', 'София', 2000)")
+        self.assertEqual(db.write_version('players'), players)
+
+    def test_delete_cascades_to_child_tables(self):
+        before = db.write_version('players', 'matches', 'events')
+        db.execute("DELETE FROM clubs WHERE id = 8")
+        after = db.write_version('players', 'matches', 'events')
+        for i in range(2, len(before)):
+            self.assertNotEqual(before[i], after[i])
+
+    def test_raw_commit_bumps_every_table(self):
+        before = db.write_version('clubs')
+        conn = db.connect()
+        conn.execute("UPDATE clubs SET city = 'Пловдив' WHERE id = 3")
+        db.commit(conn)
+        db.release_connection(conn)
+        self.assertNotEqual(db.write_version('clubs'), before)
+
+    def test_write_from_other_connection_is_detected(self):
+        before = db.write_version('clubs')
+        other = sqlite3.connect(db.DB_PATH)
+        other.execute("UPDATE clubs SET city = 'Русе' WHERE id = 2")
+        other.commit()
+        other.close()
+        self.assertNotEqual(db.write_version('clubs'), before)
+        self.assertEqual(db.write_version('clubs'), db.write_version('clubs'))
+
+    def test_failed_write_does_not_bump(self):
+        before = db.write_version('clubs')
+        self.assertIsNone(db.execute("INSERT INTO clubs (name) VALUES (NULL)"))
+        self.assertEqual(db.write_version('clubs'), before)
+
+    def test_versions_differ_between_databases(self):
+        first = db.write_version('clubs')
+        self.test_config.cleanup_test_environment()
+        self.test_config.setup_test_environment()
+        self.assertNotEqual(db.write_version('clubs'), first)
+
+
+class TestBulkWrites(unittest.TestCase):
+    """Test cases for execute_many() and transaction()"""
+
+    def setUp(self):
+        self.test_config = __import__('test_config').test_config
+        self.test_config.setup_test_environment()
+
+    def tearDown(self):
+        self.test_config.cleanup_test_environment()
+
+    def _events(self):
+        return db.fetch_one("SELECT COUNT(*) AS n FROM events")['n']
+
+    def test_execute_many_commits_once(self):
+        before = self._events()
+        rows = [(1, 1, 'appearance', 0), (1, 2, 'appearance', 0), (1, 3, 'yellow', 40)]
+        with patch.object(db, 'note_write', wraps=db.note_write) as commits:
+            changed = db.execute_many("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)", rows)
+        self.assertEqual(changed, 3)
+        self.assertEqual(commits.call_count, 1)
+        self.assertEqual(self._events(), before + 3)
+
+    def test_execute_many_error_writes_nothing(self):
+        before = self._events()
+        rows = [(1, 1, 'goal', 10), (1, 2, 'goal', 11), (999999, 1, 'goal', 12)]
+        self.assertIsNone(db.execute_many("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)", rows))
+        self.assertEqual(self._events(), before)
+
+    def test_transaction_commits_all_writes_together(self):
+        events, players = db.write_version('events'), db.write_version('players')
+        with db.transaction() as tx:
+            eid = tx.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (1, 1, 'goal', 5)")
+            tx.execute_many("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)",
+                            [(1, 1, 'assist', 6), (1, 2, 'assist', 7)])
+            self.assertEqual(tx.fetch_one("SELECT COUNT(*) AS n FROM events WHERE id >= ?", (eid,))['n'], 3)
+            # not visible outside until the block ends
+            self.assertIsNone(db.fetch_one("SELECT id FROM events WHERE id = ?", (eid,)))
+        self.assertIsNotNone(db.fetch_one("SELECT id FROM events WHERE id = ?", (eid,)))
+        self.assertNotEqual(db.write_version('events'), events)
+        self.assertEqual(db.write_version('players'), players)
+
+    def test_transaction_rolls_back_on_error(self):
+        before, version = self._events(), db.write_version('events')
+        with self.assertRaises(sqlite3.IntegrityError):
+            with db.transaction() as tx:
+                tx.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (1, 1, 'goal', 5)")
+                tx.execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (999999, 1, 'goal', 6)")
+        self.assertEqual(self._events(), before)
+        self.assertEqual(db.write_version('events'), version)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
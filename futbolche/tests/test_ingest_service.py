@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""Unit tests for live event-feed ingestion (services.ingest_service)"""
+
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+# Ensure src is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from test_config import test_config
+from services import ingest_service as ingest
+from services import leagues_service as leagues
+from services import matches_service as matches
+from services import standings
+from db import fetch_one, fetch_all
+
+
+def _line(**event):
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+
+class IngestTestCase(unittest.TestCase):
+    def setUp(self):
+        test_config.setup_test_environment()
+        res = matches.record_match('Левски София', 'ЦСКА София', '2025-09-10')
+        self.mid = int(res.rsplit(' ', 1)[1].rstrip('.'))
+
+    def tearDown(self):
+        test_config.cleanup_test_environment()
+
+    def _events(self):
+        return fetch_all("SELECT player_id, event_type, minute, ingest_key FROM events WHERE match_id = ? ORDER BY id",
+                         (self.mid,))
+
+    def _wait_for(self, ingester, processed, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            s = ingester.stats()
+            if s['written'] + s['duplicates'] + s['rejected'] + s['failed'] >= processed:
+                return s
+            time.sleep(0.01)
+        self.fail(f"ingester did not catch up: {ingester.stats()}")
+
+
+class TestWriteBatch(IngestTestCase):
+    def test_batch_is_one_transaction_with_goals(self):
+        ingester = ingest.EventIngester()
+        events = [{'key': 'a1', 'match_id': self.mid, 'player': 'Иван Иванов', 'type': 'goal', 'minute': 5},
+                  {'key': 'a2', 'match_id': self.mid, 'player': 'Петър Петров', 'type': 'асист', 'minute': 5},
+                  {'key': 'a3', 'match_id': str(self.mid), 'player': 'Кристиян Стоянов', 'type': 'гол', 'minute': 70},
+                  {'key': 'a4', 'match_id': self.mid, 'type': 'yellow'}]
+        with mock.patch.object(matches, 'transaction', wraps=matches.transaction) as tx:
+            self.assertEqual(ingester.write_batch([dict(e, _received=time.time()) for e in events]), 4)
+        self.assertEqual(tx.call_count, 1)
+        m = matches.get_match(self.mid)
+        self.assertEqual((m['home_goals'], m['away_goals']), (1, 1))
+        self.assertEqual([r['ingest_key'] for r in self._events()], ['a1', 'a2', 'a3', 'a4'])
+
+    def test_redelivered_events_are_dropped(self):
+        ingester = ingest.EventIngester()
+        goal = {'key': 'g1', 'match_id': self.mid, 'player': 'Иван Иванов', 'type': 'goal', 'minute': 5}
+        now = time.time()
+        self.assertEqual(ingester.write_batch([dict(goal, _received=now), dict(goal, _received=now)]), 1)
+        self.assertEqual(ingester.write_batch([dict(goal, _received=now)]), 0)
+        self.assertEqual(len(self._events()), 1)
+        self.assertEqual(matches.get_match(self.mid)['home_goals'], 1)
+        self.assertEqual(ingester.stats()['duplicates'], 2)
+
+    def test_invalid_events_are_rejected_not_written(self):
+        ingester = ingest.EventIngester()
+        now = time.time()
+        events = [{'match_id': 999999, 'player': 'Иван Иванов', 'type': 'goal'},
+                  {'match_id': self.mid, 'player': 'Никой Никой', 'type': 'goal'},
+                  {'match_id': self.mid, 'player': 'Иван Иванов', 'type': 'penalty'},
+                  {'match_id': self.mid, 'player': 'Иван Иванов', 'type': 'goal', 'minute': 'x'},
+                  {'match_id': self.mid, 'player': 'Иван Иванов', 'type': 'appearance'}]
+        self.assertEqual(ingester.write_batch([dict(e, _received=now) for e in events]), 1)
+        self.assertEqual(ingester.stats()['rejected'], 4)
+        self.assertEqual(ingester.write_batch([{'player': 'Иван Иванов', 'type': 'goal'}]), 0)
+        self.assertEqual(ingester.stats()['rejected'], 5)
+
+    def test_events_not_submitted_through_the_queue(self):
+        """write_batch() is public: events without ts or _received are still written"""
+        ingester = ingest.EventIngester()
+        events = [{'key': 'd1', 'match_id': self.mid, 'player': 'Иван Иванов', 'type': 'goal'},
+                  {'key': 'd2', 'match_id': self.mid, 'type': 'yellow', 'ts': None}]
+        self.assertEqual(ingester.write_batch(events), 2)
+        self.assertEqual(ingester.stats()['rejected'], 0)
+        self.assertGreaterEqual(ingester.stats()['max_lag'], 0.0)
+
+    def test_failed_batch_is_counted_and_writes_nothing(self):
+        ingester = ingest.EventIngester()
+        locked = sqlite3.OperationalError("database is locked")
+        with mock.patch.object(matches, 'record_event_batches', side_effect=locked) as write:
+            self.assertEqual(ingester.write_batch([{'match_id': self.mid, 'type': 'yellow', '_received': time.time()}]), 0)
+        self.assertEqual(write.call_count, 2)
+        self.assertEqual(ingester.stats()['failed'], 1)
+        self.assertEqual(self._events(), [])
+
+    def test_locked_database_is_retried_once(self):
+        ingester = ingest.EventIngester()
+        write = mock.Mock(side_effect=[sqlite3.OperationalError("database is locked"), 1])
+        with mock.patch.object(matches, 'record_event_batches', write):
+            self.assertEqual(ingester.write_batch([{'match_id': self.mid, 'type': 'yellow'}]), 1)
+        self.assertEqual(write.call_count, 2)
+        self.assertEqual(ingester.stats()['failed'], 0)
+
+    def test_other_errors_are_not_retried(self):
+        """An error after the commit must not write keyless events a second time"""
+        ingester = ingest.EventIngester()
+        events = [{'match_id': self.mid, 'type': 'yellow'}, {'match_id': self.mid, 'type': 'red'}]
+        with mock.patch('db.note_write', side_effect=RuntimeError("write version")), \
+                mock.patch.object(matches, 'record_event_batches', wraps=matches.record_event_batches) as write:
+            self.assertEqual(ingester.write_batch(events), 0)
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(len(self._events()), 2)
+
+    def test_goals_of_a_batch_reach_the_standings(self):
+        leagues.create_league('Фийд Лига', '2025')
+        lid = fetch_one("SELECT id FROM leagues WHERE name = ?", ('Фийд Лига',))['id']
+        res = matches.record_match('Левски София', 'ЦСКА София', '2025-09-11', league_id=lid)
+        mid = int(res.rsplit(' ', 1)[1].rstrip('.'))
+        standings.league_table(lid)
+        ingest.EventIngester().write_batch([
+            {'match_id': mid, 'player': 'Иван Иванов', 'type': 'goal', '_received': time.time()},
+            {'match_id': mid, 'player': 'Иван Иванов', 'type': 'goal', '_received': time.time()}])
+        top = standings.league_table(lid)[0]
+        self.assertEqual((top.name, top.goals_for, top.points), ('Левски София', 2, 3))
+        self.assertEqual([(r.name, r.goals_for) for r in standings.league_table(lid)],
+                         [(r.name, r.goals_for) for r in standings.rank(standings._load_league(lid))])
+
+
+class TestIngesterThread(IngestTestCase):
+    def test_micro_batches_and_lag_metrics(self):
+        ingester = ingest.EventIngester(batch_size=10, max_delay=0.5)
+        for i in range(25):
+            ingester.submit({'key': f"m{i}", 'match_id': self.mid, 'player': 'Петър Петров',
+                             'type': 'appearance', 'ts': time.time() - 1.0})
+        ingester.start()
+        stats = self._wait_for(ingester, 25)
+        ingester.stop()
+        self.assertEqual(stats['written'], 25)
+        self.assertEqual(stats['batches'], 3)
+        self.assertGreaterEqual(stats['max_lag'], 1.0)
+        self.assertGreater(stats['events_per_sec'], 0)
+
+    def test_full_queue_applies_back_pressure(self):
+        ingester = ingest.EventIngester(queue_size=2)
+        self.assertTrue(ingester.submit({'match_id': self.mid, 'type': 'yellow'}))
+        self.assertTrue(ingester.submit({'match_id': self.mid, 'type': 'yellow'}))
+        self.assertFalse(ingester.submit({'match_id': self.mid, 'type': 'yellow'}, timeout=0.05))
+        ingester.start()
+        self.assertTrue(ingester.submit({'match_id': self.mid, 'type': 'yellow'}, timeout=2.0))
+        self._wait_for(ingester, 3)
+        ingester.stop()
+        self.assertEqual(len(self._events()), 3)
+
+    def test_writer_survives_events_without_match_id(self):
+        ingester = ingest.EventIngester(max_delay=0.01).start()
+        self.assertTrue(ingester.submit({'player': 'Иван Иванов', 'type': 'goal'}))
+        self._wait_for(ingester, 1)
+        self.assertTrue(ingester.submit({'match_id': self.mid, 'type': 'yellow'}, timeout=2.0))
+        stats = self._wait_for(ingester, 2)
+        ingester.stop()
+        self.assertEqual((stats['rejected'], stats['written']), (1, 1))
+        self.assertEqual(len(self._events()), 1)
+
+    def test_unexpected_batch_error_is_counted_and_writer_keeps_running(self):
+        ingester = ingest.EventIngester(max_delay=0.01)
+        with mock.patch.object(ingester, '_resolve', side_effect=[AttributeError("bad event"), {}]) as resolve:
+            ingester.start()
+            ingester.submit({'match_id': self.mid, 'type': 'yellow'})
+            self._wait_for(ingester, 1)
+            ingester.submit({'match_id': self.mid, 'type': 'yellow'}, timeout=2.0)
+            deadline = time.monotonic() + 5
+            while resolve.call_count < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.assertTrue(ingester._writer.is_alive())
+        ingester.stop()
+        self.assertEqual(ingester.stats()['failed'], 1)
+
+    def test_stop_writes_queued_events(self):
+        ingester = ingest.EventIngester(batch_size=1000, max_delay=10.0).start()
+        for i in range(5):
+            ingester.submit({'match_id': self.mid, 'type': 'yellow'})
+        ingester.stop(timeout=15)
+        self.assertEqual(len(self._events()), 5)
+
+
+class TestSources(IngestTestCase):
+    def test_follow_file_reads_appended_lines_and_survives_truncation(self):
+        path = os.path.join(os.path.dirname(test_config.test_db_path), 'feed.jsonl')
+        ingester = ingest.EventIngester(max_delay=0.01).start()
+        stop = threading.Event()
+        reader = threading.Thread(target=ingest.follow_file, args=(path, ingester, stop, False, 0.01))
+        reader.start()
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(_line(key='f1', match_id=self.mid, player='Иван Иванов', type='goal', minute=1))
+                f.write("not json\n")
+                # half a line: only read once its newline arrives
+                f.write('{"key": "f2", "match_id": %d, ' % self.mid)
+                f.flush()
+                time.sleep(0.1)
+                f.write('"type": "yellow"}\n')
+            self._wait_for(ingester, 2)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(_line(key='f3', match_id=self.mid, type='red'))
+            self._wait_for(ingester, 3)
+        finally:
+            stop.set()
+            reader.join()
+            ingester.stop()
+        self.assertEqual([r['ingest_key'] for r in self._events()], ['f1', 'f2', 'f3'])
+        self.assertEqual(ingester.stats()['malformed'], 1)
+
+    def test_tcp_socket_feed(self):
+        ingester = ingest.EventIngester(max_delay=0.01).start()
+        server = ingest.serve_socket(('127.0.0.1', 0), ingester)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            with socket.create_connection(server.server_address) as conn:
+                conn.sendall(''.join(_line(key=f"t{i}", match_id=self.mid, player='Васил Андреев', type='goal')
+                                     for i in range(3)).encode('utf-8'))
+                # a retry of the same delivery
+                conn.sendall(_line(key='t0', match_id=self.mid, player='Васил Андреев', type='goal').encode('utf-8'))
+            self._wait_for(ingester, 4)
+        finally:
+            server.shutdown()
+            server.server_close()
+            ingester.stop()
+        self.assertEqual(matches.get_match(self.mid)['away_goals'], 3)
+        self.assertEqual(ingester.stats()['duplicates'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
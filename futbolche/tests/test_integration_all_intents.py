@@ -3,11 +3,8 @@
 Comprehensive integration tests for ALL chatbot intents.
 Tests NLU parsing, routing, service calls, and response generation.
 
-KNOWN LIMITATIONS:
-The NLU uses order-dependent pattern matching. Some patterns may match earlier/more
-general intents instead of the intended specific ones. This is a design limitation
-that should be documented and potentially fixed by reordering intents or using a
-more sophisticated matching algorithm.
+The NLU picks the most specific matching pattern (most literal text, fewest
+placeholders), so general patterns no longer shadow specific ones.
 """
 
 import os
@@ -109,12 +106,10 @@ class TestAllIntentsIntegration(unittest.TestCase):
         self.assertIn("club_name", params)
 
     def test_nlu_delete_player_patterns(self):
-        """Test delete_player patterns - KNOWN ISSUE: 'изтрий играч' matches delete_club due to ordering"""
-        # This currently fails because "изтрий [club_name]" in delete_club matches first
+        """Test delete_player patterns - regression: 'изтрий играч' used to match delete_club"""
         intent, params = parse_input_wrapper("изтрий играч Иван")
-        # Expected: delete_player, Actual: delete_club (due to pattern ordering)
-        # This documents the current behavior
-        self.assertEqual(intent, "delete_club")  # Current (incorrect) behavior
+        self.assertEqual(intent, "delete_player")
+        self.assertEqual(params, {"player_identifier": "иван"})
 
     def test_nlu_update_club_patterns(self):
         """Test update_club patterns"""
@@ -136,11 +131,10 @@ class TestAllIntentsIntegration(unittest.TestCase):
         self.assertIn("club_identifier", params)
 
     def test_nlu_list_all_players_patterns(self):
-        """Test list_all_players patterns - KNOWN ISSUE: 'покажи всички играчи' matches list_players"""
-        # This fails because "покажи играчи [club_identifier]" in list_players matches first
+        """Test list_all_players patterns - regression: 'покажи всички играчи' used to match list_players"""
         intent, params = parse_input_wrapper("покажи всички играчи")
-        # Expected: list_all_players, Actual: list_players (due to pattern ordering)
-        self.assertEqual(intent, "list_players")  # Current (incorrect) behavior
+        self.assertEqual(intent, "list_all_players")
+        self.assertIsNone(params)
 
     def test_nlu_update_player_position_patterns(self):
         """Test update_player_position patterns"""
@@ -203,11 +197,11 @@ class TestAllIntentsIntegration(unittest.TestCase):
         self.assertIn("season", params)
 
     def test_nlu_add_club_to_league_patterns(self):
-        """Test add_club_to_league patterns - KNOWN ISSUE: 'добави клуб ... в лига' matches add_club"""
-        # This fails because "добави клуб [club_name]" in add_club matches first
+        """Test add_club_to_league patterns - regression: 'добави клуб ... в лига' used to match add_club"""
         intent, params = parse_input_wrapper("добави клуб Левски София в лига Нова Лига")
-        # Expected: add_club_to_league, Actual: add_club (due to pattern ordering)
-        self.assertEqual(intent, "add_club")  # Current (incorrect) behavior
+        self.assertEqual(intent, "add_club_to_league")
+        self.assertIn("club_identifier", params)
+        self.assertIn("league_identifier", params)
 
     def test_nlu_get_league_teams_patterns(self):
         """Test get_league_teams patterns"""
@@ -260,9 +254,9 @@ class TestAllIntentsIntegration(unittest.TestCase):
 
     def test_e2e_add_club(self):
         """Test add_club end-to-end"""
-        response = parse_and_handle("добави клуб Спартак Варна")
+        response = parse_and_handle("добави клуб Спартак Плевен")
         self.assertIn("успешно", response.lower())
-        clubs = execute_query("SELECT * FROM clubs WHERE name = ?", ("Спартак Варна",), fetch=True)
+        clubs = execute_query("SELECT * FROM clubs WHERE name_key = ?", ("спартак плевен",), fetch=True)
         self.assertEqual(len(clubs), 1)
 
     def test_e2e_list_clubs(self):
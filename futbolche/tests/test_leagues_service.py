@@ -2,6 +2,8 @@
 import os
 import sys
 import unittest
+from collections import Counter
+from unittest import mock
 
 # ensure src is importable
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -11,7 +13,8 @@ sys.path.insert(0, os.path.dirname(__file__))
 
 from test_config import test_config, create_test_clubs
 from services.leagues_service import create_league, add_club_to_league, generate_round_robin, get_fixtures
-from db import execute_query
+from services import leagues_service
+from db import execute_query, fetch_all
 
 
 class TestLeaguesService(unittest.TestCase):
@@ -45,5 +48,76 @@ class TestLeaguesService(unittest.TestCase):
         self.assertEqual(rows[0]['count'], expected)
 
 
+class TestRoundRobinSchedule(unittest.TestCase):
+    def setUp(self):
+        test_config.setup_test_environment()
+        create_test_clubs()
+
+    def tearDown(self):
+        test_config.cleanup_test_environment()
+
+    def _league(self, n_teams):
+        create_league(f'Лига {n_teams}', '2025')
+        lid = execute_query("SELECT id FROM leagues WHERE name = ?", (f'Лига {n_teams}',), fetch=True)[0]['id']
+        clubs = execute_query('SELECT id FROM clubs ORDER BY id LIMIT ?', (n_teams,), fetch=True)
+        self.assertEqual(len(clubs), n_teams)
+        for c in clubs:
+            add_club_to_league(lid, c['id'])
+        return lid
+
+    def _fixtures(self, lid):
+        return fetch_all("SELECT home_team_id, away_team_id, match_date FROM matches WHERE league_id = ?", (lid,))
+
+    def test_every_team_plays_once_per_matchday(self):
+        for n in (4, 5):
+            lid = self._league(n)
+            generate_round_robin(lid, start_date='2025-08-01', interval_days=7)
+            rows = self._fixtures(lid)
+            self.assertEqual(len(rows), n * (n - 1) // 2)
+            rounds = {}
+            for r in rows:
+                rounds.setdefault(r['match_date'], []).extend((r['home_team_id'], r['away_team_id']))
+            # n-1 matchdays for an even n, n for an odd one (everyone gets one bye)
+            self.assertEqual(len(rounds), n - 1 if n % 2 == 0 else n)
+            self.assertIn('2025-08-01', rounds)
+            for teams in rounds.values():
+                self.assertEqual(len(teams), len(set(teams)))
+            pairs = {frozenset((r['home_team_id'], r['away_team_id'])) for r in rows}
+            self.assertEqual(len(pairs), len(rows))
+
+    def test_home_and_away_are_balanced(self):
+        lid = self._league(6)
+        generate_round_robin(lid, double_round=True)
+        rows = self._fixtures(lid)
+        self.assertEqual(len(rows), 6 * 5)
+        self.assertEqual(len({r['match_date'] for r in rows}), 2 * 5)
+        # each pair meets once at each ground
+        self.assertEqual(len({(r['home_team_id'], r['away_team_id']) for r in rows}), len(rows))
+        self.assertTrue(all(home == 5 for home in Counter(r['home_team_id'] for r in rows).values()))
+
+        # and within the first half no team hosts more than one game more than another
+        homes = Counter(r['home_team_id'] for r in sorted(rows, key=lambda r: r['match_date'])[:15])
+        self.assertLessEqual(max(homes.values()) - min(homes.values()), 1)
+
+    def test_season_is_inserted_in_one_transaction(self):
+        lid = self._league(4)
+        with mock.patch.object(leagues_service, 'execute', wraps=leagues_service.execute) as single, \
+                mock.patch.object(leagues_service, 'execute_many', wraps=leagues_service.execute_many) as bulk:
+            res = generate_round_robin(lid, double_round=True)
+        self.assertEqual(res, f"Създадени 12 мача за лига {lid}.")
+        self.assertEqual(bulk.call_count, 1)
+        self.assertEqual(len(bulk.call_args.args[1]), 12)
+        self.assertFalse([c for c in single.call_args_list if 'INSERT INTO matches' in c.args[0]])
+
+    def test_failed_insert_leaves_no_fixtures(self):
+        lid = self._league(4)
+        execute_query("CREATE TRIGGER stop_fixtures BEFORE INSERT ON matches "
+                      "WHEN (SELECT COUNT(*) FROM matches WHERE league_id = NEW.league_id) >= 3 "
+                      "BEGIN SELECT RAISE(ABORT, 'stop'); END")
+        res = generate_round_robin(lid)
+        self.assertEqual(res, "Грешка при създаване на кръговете.")
+        self.assertEqual(self._fixtures(lid), [])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -2,18 +2,23 @@
 """Unit tests for match events recording and standings computation"""
 
 import os
+import random
 import sys
+import threading
 import unittest
+from unittest import mock
 
 # Ensure src is importable
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 sys.path.insert(0, os.path.dirname(__file__))
 
 from test_config import test_config
+from chatbot.chatbot import parse_and_handle
 from services import matches_service as matches
 from services import leagues_service as leagues
 from services import players_service as players
-from db import fetch_one, fetch_all
+from services import standings
+from db import execute, fetch_one, fetch_all
 
 
 class TestMatchesEvents(unittest.TestCase):
@@ -77,6 +82,166 @@ class TestMatchesEvents(unittest.TestCase):
         self.assertIn('Левски София', standings)
         self.assertIn('Pts:4', standings)
 
+    def test_get_league_standings_query_count_does_not_grow_with_teams(self):
+        rng = random.Random(3)
+        leagues.create_league('Голяма лига', '2025')
+        lid = fetch_one("SELECT id FROM leagues WHERE name = ?", ('Голяма лига',))['id']
+        names = [r['name'] for r in fetch_all("SELECT name FROM clubs")]
+        for name in names:
+            leagues.add_club_to_league(lid, name)
+        tally = {name: [0, 0, 0] for name in names}  # played, points, goal difference
+        for home in names:
+            for away in names:
+                if home != away:
+                    hg, ag = rng.randint(0, 3), rng.randint(0, 3)
+                    matches.record_match(home, away, '2025-09-01', home_goals=hg, away_goals=ag, league_id=lid)
+                    for team, mine, theirs in ((home, hg, ag), (away, ag, hg)):
+                        tally[team][0] += 1
+                        tally[team][1] += 3 if mine > theirs else 1 if mine == theirs else 0
+                        tally[team][2] += mine - theirs
+
+        with mock.patch.object(standings, 'fetch_all', wraps=standings.fetch_all) as q:
+            table = matches.get_league_standings(lid)
+        self.assertEqual(q.call_count, 1)
+        lines = table.splitlines()
+        self.assertEqual(len(lines), len(names))
+        for name, (played, points, diff) in tally.items():
+            line = next(l for l in lines if f" {name} — " in l)
+            self.assertIn(f"P:{played} ", line)
+            self.assertIn(f"GD:{diff} ", line)
+            self.assertTrue(line.endswith(f"Pts:{points}"), line)
+
+
+class TestRecordEventTransaction(unittest.TestCase):
+    def setUp(self):
+        test_config.setup_test_environment()
+        res = matches.record_match('Левски София', 'ЦСКА София', '2025-09-10')
+        self.mid = int(res.rsplit(' ', 1)[1].rstrip('.'))
+
+    def tearDown(self):
+        test_config.cleanup_test_environment()
+
+    def _count_events(self):
+        return fetch_one("SELECT COUNT(*) AS n FROM events WHERE match_id = ?", (self.mid,))['n']
+
+    def test_goal_in_unplayed_fixture_starts_at_nil_nil(self):
+        matches.record_event(self.mid, 'Кристиян Стоянов', 'goal', 5)
+        m = matches.get_match(self.mid)
+        self.assertEqual((m['home_goals'], m['away_goals']), (0, 1))
+
+    def test_failed_score_update_keeps_no_event(self):
+        execute("CREATE TRIGGER stop_score BEFORE UPDATE OF home_goals ON matches "
+                "BEGIN SELECT RAISE(ABORT, 'stop'); END")
+        self.assertEqual(matches.record_event(self.mid, 'Иван Иванов', 'goal', 5), "Грешка при запис на събитието.")
+        self.assertEqual(self._count_events(), 0)
+        self.assertIsNone(matches.get_match(self.mid)['home_goals'])
+
+    def test_concurrent_goals_are_all_counted(self):
+        per_thread, errors = 15, []
+
+        def score(player):
+            for minute in range(per_thread):
+                res = matches.record_event(self.mid, player, 'goal', minute)
+                if 'успешно' not in res:
+                    errors.append(res)
+
+        threads = [threading.Thread(target=score, args=(p,))
+                   for p in ('Иван Иванов', 'Александър Николов', 'Кристиян Стоянов')]
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # interleave the writers as much as possible
+        try:
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            sys.setswitchinterval(interval)
+
+        self.assertEqual(errors, [])
+        m = matches.get_match(self.mid)
+        self.assertEqual((m['home_goals'], m['away_goals']), (2 * per_thread, per_thread))
+        self.assertEqual(self._count_events(), 3 * per_thread)
+
+
+class TestRecordEventsBulk(unittest.TestCase):
+    def setUp(self):
+        test_config.setup_test_environment()
+        leagues.create_league('Лайв Лига', '2025')
+        self.lid = fetch_one("SELECT id FROM leagues WHERE name = ?", ('Лайв Лига',))['id']
+        leagues.add_club_to_league(self.lid, 'Левски София')
+        leagues.add_club_to_league(self.lid, 'ЦСКА София')
+        res = matches.record_match('Левски София', 'ЦСКА София', '2025-09-10', league_id=self.lid)
+        self.mid = int(res.rsplit(' ', 1)[1].rstrip('.'))
+        standings.cache.clear()
+
+    def tearDown(self):
+        test_config.cleanup_test_environment()
+
+    def _events(self):
+        return [(r['player_id'], r['event_type'], r['minute'])
+                for r in fetch_all("SELECT player_id, event_type, minute FROM events WHERE match_id = ? ORDER BY id", (self.mid,))]
+
+    def test_events_and_goals_are_recorded_together(self):
+        events = [('Иван Иванов', 'goal', 10), ('Петър Петров', 'assist', 10), ('Кристиян Стоянов', 'goal', 30),
+                  ('Иван Иванов', 'goal', 55), ('Васил Андреев', 'yellow', 60), ('Мария Георгиева', 'appearance', None)]
+        with mock.patch.object(matches, 'resolve_player_ids', wraps=matches.resolve_player_ids) as resolve, \
+                mock.patch.object(players, 'get_player_id', wraps=players.get_player_id) as single:
+            res = matches.record_events_bulk(self.mid, events)
+        self.assertEqual(res, f"Записани 6 събития за мач {self.mid}.")
+        self.assertEqual(resolve.call_count, 1)
+        single.assert_not_called()
+
+        ivan = players.get_player_id('Иван Иванов')
+        stored = self._events()
+        self.assertEqual(len(stored), 6)
+        self.assertEqual(stored[0], (ivan, 'goal', 10))
+        m = matches.get_match(self.mid)
+        self.assertEqual((m['home_goals'], m['away_goals']), (2, 1))
+
+    def test_goals_reach_the_standings_as_one_delta(self):
+        standings.league_table(self.lid)
+        matches.record_events_bulk(self.mid, [('Иван Иванов', 'goal', 10), ('Иван Иванов', 'goal', 20)])
+        self.assertEqual(standings.cache.info()['deltas'], 1)
+        self.assertEqual(standings.league_table(self.lid)[0].name, 'Левски София')
+        self.assertEqual(standings.league_table(self.lid)[0].goals_for, 2)
+
+    def test_invalid_entries_write_nothing(self):
+        res = matches.record_events_bulk(self.mid, [('Иван Иванов', 'goal', 10), ('Никой Никой', 'goal', 11)])
+        self.assertIn('Никой Никой', res)
+        res = matches.record_events_bulk(self.mid, [('Иван Иванов', 'goal', 10), ('Иван Иванов', 'penalty', 11)])
+        self.assertIn('penalty', res)
+        self.assertEqual(matches.record_events_bulk(999999, [('Иван Иванов', 'goal', 10)]),
+                         "Мачът не е намерен. Моля укажете валиден ID на мача.")
+        res = matches.record_events_bulk(self.mid, [('Иван Иванов', 'goal', 10), ('Иван Иванов', 'goal', 11, 'x')])
+        self.assertTrue(res.startswith("Невалидно събитие"))
+        self.assertTrue(matches.record_events_bulk(self.mid, ['гол']).startswith("Невалидно събитие"))
+        self.assertEqual(self._events(), [])
+        self.assertIsNone(matches.get_match(self.mid)['home_goals'])
+
+    def test_parse_event_lines(self):
+        events, bad = matches.parse_event_lines("гол Иван Иванов 23\nжълт картон Петър Петров минута 40'; "
+                                                "поява 7\n\ngoal Кристиян Стоянов; дузпа Иван 3")
+        self.assertEqual(events, [('Иван Иванов', 'goal', 23), ('Петър Петров', 'yellow', 40),
+                                  ('7', 'appearance', None), ('Кристиян Стоянов', 'goal', None)])
+        self.assertEqual(bad, ['дузпа Иван 3'])
+        events, bad = matches.parse_event_lines("гол иван иванов 12 асист петър петров 12' червен картон васил андреев")
+        self.assertEqual(events, [('иван иванов', 'goal', 12), ('петър петров', 'assist', 12),
+                                  ('васил андреев', 'red', None)])
+
+    def test_player_name_may_contain_an_event_word(self):
+        events, bad = matches.parse_event_lines("гол Иван Гол 23 асист Ред Поява 24; поява Гол")
+        self.assertEqual(events, [('Иван Гол', 'goal', 23), ('Ред Поява', 'assist', 24), ('Гол', 'appearance', None)])
+        self.assertEqual(bad, [])
+
+    def test_multi_line_chat_command(self):
+        res = parse_and_handle(f"запиши събития за мач {self.mid}\n"
+                               "гол Иван Иванов 12\n"
+                               "асист Петър Петров 12\n"
+                               "червен картон Васил Андреев 80")
+        self.assertEqual(res, f"Записани 3 събития за мач {self.mid}.")
+        self.assertEqual(matches.get_match(self.mid)['home_goals'], 1)
+        self.assertIn('Неразпознати', parse_and_handle(f"запиши събития за мач {self.mid} гол Иван 5; дузпа Иван 6"))
+
 
 if __name__ == '__main__':
     unittest.main()
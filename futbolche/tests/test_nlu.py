@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""Unit tests for the compiled intent model (chatbot.nlu)"""
+
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+# Ensure src is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from chatbot import nlu
+
+
+SAMPLE_INPUTS = [
+    "помощ",
+    "покажи всички клубове",
+    "добави клуб Нови Клуб",
+    "покажи играчи на клуб Левски",
+    "покажи статистика на играч Иван Петров",
+    "трансферирай играч Иван в клуб ЦСКА",
+    "запиши мач Левски срещу ЦСКА дата 2025-09-01 резултат 2-1",
+    "покажи класиране на лига Първа Лига",
+    "нещо напълно непознато",
+]
+
+
+def _legacy_parse_input(user_input):
+    """parse_input as it worked before the compiled model: read + compile per call."""
+    text = user_input.strip()
+    with open(nlu.INTENTS_PATH, 'r', encoding='utf-8') as f:
+        intents = json.load(f).get('intents', [])
+    for intent in intents:
+        for pattern in intent.get('patterns', []):
+            regex, groups = nlu._pattern_to_regex(pattern)
+            m = regex.match(text.lower())
+            if m:
+                params = {k: v.strip() for k, v in m.groupdict().items() if v}
+                return intent.get('tag'), params if params else None
+    return 'unknown', None
+
+
+class TestIntentModel(unittest.TestCase):
+    def test_patterns_are_precompiled(self):
+        model = nlu.get_intent_model()
+        self.assertTrue(model.patterns)
+        for tag, regex, groups in model.patterns:
+            self.assertIsInstance(regex, re.Pattern)
+            self.assertEqual(sorted(groups), sorted(regex.groupindex))
+
+    def test_parse_does_not_recompile(self):
+        nlu.get_intent_model()
+        with mock.patch.object(nlu, '_pattern_to_regex') as compile_mock, \
+                mock.patch.object(nlu, '_read_intents_file') as read_mock:
+            for text in SAMPLE_INPUTS * 10:
+                nlu.parse_input(text)
+        compile_mock.assert_not_called()
+        read_mock.assert_not_called()
+
+    def test_results_match_legacy_parser(self):
+        for text in SAMPLE_INPUTS:
+            self.assertEqual(nlu.parse_input(text), _legacy_parse_input(text), text)
+
+
+class TestDispatchIndex(unittest.TestCase):
+    def test_bucket_holds_only_patterns_for_first_word(self):
+        model = nlu.get_intent_model()
+        bucket = model.candidates("изтрий играч иван")
+        self.assertTrue(bucket)
+        self.assertLess(len(bucket), len(model.patterns))
+        for tag, regex, groups in bucket:
+            self.assertTrue(regex.pattern.startswith("^изтрий"), regex.pattern)
+
+    def test_unknown_first_word_has_no_candidates(self):
+        model = nlu.get_intent_model()
+        self.assertEqual(model.candidates("нещо напълно непознато"), [])
+        self.assertEqual(model.candidates(""), [])
+
+    def test_placeholder_first_patterns_are_in_every_bucket(self):
+        model = nlu.IntentModel([
+            {"tag": "a", "patterns": ["покажи [x]"]},
+            {"tag": "any", "patterns": ["[x] моля"]},
+            {"tag": "b", "patterns": ["покажи всичко"]},
+        ], None, 1)
+        self.assertEqual([t for t, _, _ in model.candidates("покажи всичко")], ["b", "a", "any"])
+        self.assertEqual([t for t, _, _ in model.candidates("дай моля")], ["any"])
+
+    def test_bucket_size_independent_of_other_intents(self):
+        base = [{"tag": "show", "patterns": ["покажи [x]"]}]
+        extra = [{"tag": f"t{i}", "patterns": [f"команда{i} [x]"]} for i in range(500)]
+        small = nlu.IntentModel(base, None, 1)
+        large = nlu.IntentModel(base + extra, None, 1)
+        self.assertEqual(len(small.candidates("покажи нещо")), len(large.candidates("покажи нещо")))
+        self.assertEqual(large.candidates("непозната команда"), [])
+
+
+class TestMostSpecificMatch(unittest.TestCase):
+    def test_specific_pattern_wins_regardless_of_file_order(self):
+        intents = [
+            {"tag": "general", "patterns": ["изтрий [name]"]},
+            {"tag": "specific", "patterns": ["изтрий играч [name]"]},
+        ]
+        for ordered in (intents, list(reversed(intents))):
+            model = nlu.IntentModel(ordered, None, 1)
+            self.assertEqual(model.candidates("изтрий играч иван")[0][0], "specific")
+
+    def test_fewer_placeholders_break_literal_ties(self):
+        self.assertGreater(nlu._specificity("покажи всички играчи"), nlu._specificity("покажи всички [x]"))
+        self.assertGreater(nlu._specificity("a b [x]"), nlu._specificity("a [x] b [y]"))
+
+    def test_previously_shadowed_commands(self):
+        cases = [
+            ("изтрий играч Иван", "delete_player"),
+            ("изтрий Левски", "delete_club"),
+            ("покажи всички играчи", "list_all_players"),
+            ("покажи играчи Левски", "list_players"),
+            ("добави клуб Левски в лига Първа Лига", "add_club_to_league"),
+            ("добави клуб Левски", "add_club"),
+            ("класиране на лига Първа Лига", "get_standings"),
+        ]
+        for text, expected in cases:
+            self.assertEqual(nlu.parse_input(text)[0], expected, text)
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        nlu.parse_input("помощ")  # settle the model version
+        nlu.clear_parse_cache()
+
+    def test_repeat_input_is_a_hit(self):
+        first = nlu.parse_input("покажи класиране Първа лига")
+        with mock.patch.object(nlu, 'get_intent_model', wraps=nlu.get_intent_model) as model_mock:
+            second = nlu.parse_input("покажи класиране Първа лига")
+        self.assertEqual(first, second)
+        # only the version check, no pattern lookup
+        self.assertEqual(model_mock.call_count, 1)
+        self.assertEqual(nlu.parse_cache_info()['hits'], 1)
+        self.assertEqual(nlu.parse_cache_info()['misses'], 1)
+
+    def test_key_is_normalized(self):
+        nlu.parse_input("покажи клубове")
+        self.assertEqual(nlu.parse_input("  Покажи   КЛУБОВЕ "), ("list_clubs", None))
+        self.assertEqual(nlu.parse_cache_info()['hits'], 1)
+
+    def test_line_breaks_are_whitespace(self):
+        self.assertEqual(nlu.normalize_input("покажи\tклубове\n"), "покажи клубове")
+        self.assertEqual(nlu.parse_input("Запиши събития за мач 3\n  гол Иван 10 \n\nпоява Петър\n"),
+                         ("record_events", {'match_id': '3', 'events': 'гол иван 10 поява петър'}))
+
+    def test_cached_params_are_not_shared(self):
+        _, params = nlu.parse_input("изтрий играч Иван")
+        params['player_identifier'] = 'changed'
+        self.assertEqual(nlu.parse_input("изтрий играч Иван")[1], {'player_identifier': 'иван'})
+
+    def test_cache_is_bounded(self):
+        for i in range(nlu.PARSE_CACHE_SIZE + 50):
+            nlu.parse_input(f"търси играч{i}")
+        self.assertEqual(nlu.parse_cache_info()['size'], nlu.PARSE_CACHE_SIZE)
+
+    def test_reload_clears_cache(self):
+        nlu.parse_input("покажи клубове")
+        nlu.reload_intents()
+        nlu.parse_input("покажи клубове")
+        info = nlu.parse_cache_info()
+        self.assertEqual((info['hits'], info['misses']), (0, 1))
+
+
+class TestIntentHotReload(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_path = nlu.INTENTS_PATH
+        nlu.INTENTS_PATH = os.path.join(self.temp_dir, 'intents.json')
+        self._write([{"tag": "greet", "patterns": ["здравей"]}])
+        nlu.reload_intents()
+
+    def tearDown(self):
+        nlu.INTENTS_PATH = self.original_path
+        nlu.reload_intents()
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, intents, mtime_offset=0):
+        with open(nlu.INTENTS_PATH, 'w', encoding='utf-8') as f:
+            json.dump({"intents": intents}, f, ensure_ascii=False)
+        stamp = time.time() + mtime_offset
+        os.utime(nlu.INTENTS_PATH, (stamp, stamp))
+
+    def test_reloads_when_file_changes(self):
+        self.assertEqual(nlu.parse_input("здравей")[0], "greet")
+        version = nlu.get_intent_model().version
+
+        self._write([{"tag": "greet", "patterns": ["привет"]}], mtime_offset=10)
+        nlu._next_check = 0.0
+        self.assertEqual(nlu.parse_input("привет")[0], "greet")
+        self.assertEqual(nlu.parse_input("здравей")[0], "unknown")
+        self.assertGreater(nlu.get_intent_model().version, version)
+
+    def test_unchanged_file_is_not_reread(self):
+        nlu._next_check = 0.0
+        with mock.patch.object(nlu, '_read_intents_file') as read_mock:
+            nlu.parse_input("здравей")
+        read_mock.assert_not_called()
+
+
+class TestParseUsesBucketAndCache(unittest.TestCase):
+    def test_new_input_tries_one_bucket_and_repeat_is_cached(self):
+        nlu.clear_parse_cache()
+        model = nlu.get_intent_model()
+        with mock.patch.object(model, 'candidates', wraps=model.candidates) as candidates:
+            nlu.parse_input("Трансферирай играч Иван в клуб ЦСКА")
+            nlu.parse_input("трансферирай  играч иван в клуб цска")
+        candidates.assert_called_once_with("трансферирай играч иван в клуб цска")
+        self.assertLess(len(model.candidates("трансферирай играч иван в клуб цска")), len(model.patterns))
+        self.assertEqual(nlu.parse_cache_info()['hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
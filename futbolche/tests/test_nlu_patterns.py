@@ -31,6 +31,7 @@ tests = [
     ("генерирай кръгове за лига Нова Лига", "generate_round_robin"),
     ("покажи класиране Нова Лига", "get_standings"),
     ("запиши гол Иван в мач 1 минута 23", "record_event"),
+    ("запиши събития за мач 1\nгол Иван 23\nасист Петър 23", "record_events"),
     ("покажи мачове в лига Нова Лига", "get_fixtures"),
 ]
 
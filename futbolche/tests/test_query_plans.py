@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Checks that every service lookup query is served by an index (EXPLAIN QUERY PLAN)"""
+
+import os
+import sys
+import unittest
+
+# Ensure src is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from test_config import test_config
+from db import fetch_all
+from services import (clubs_service, ingest_service, leagues_service, matches_service, players_service,
+                      resolver, standings, statistics_service, transfers_service)
+
+
+MARKS = '?, ?'
+STATS = statistics_service
+
+# Filtered queries issued by the services, taken from the services themselves so
+# the list cannot drift from the code. Plain listings of a whole table (e.g.
+# list_clubs, get_player_statistics_many without a filter) are intentionally
+# absent: they read every row anyway. services.search_service is absent too:
+# FTS plans read as SCAN of the virtual table and the instr() fallback scans
+# by design.
+LOOKUP_QUERIES = [
+    # services.resolver: ids, exact and prefix name matches, batched lookups
+    *[(resolver._BY_ID.format(table=t), (1,)) for t in ('clubs', 'players', 'leagues')],
+    *[(resolver._EXACT_NAME.format(table=t), ('x',)) for t in ('clubs', 'players', 'leagues')],
+    *[(resolver._NAME_PREFIX.format(table=t), ('x', 'x' + resolver._KEY_RANGE_END)) for t in ('clubs', 'players')],
+    (resolver._PLAYERS_BY_ID.format(marks=MARKS), (1, 2)),
+    (resolver._PLAYERS_BY_NAME.format(marks=MARKS), ('x', 'y')),
+    # clubs_service / players_service duplicate checks and squad listing
+    (clubs_service._CLUB_BY_NAME, ('x',)),
+    (players_service._PLAYER_IN_CLUB, ('x', 1)),
+    (players_service._SQUAD, (1,)),
+    # transfers_service number checks
+    (transfers_service._NUMBER_TAKEN, (1, 1, 1)),
+    (transfers_service._CLUB_NUMBERS, (1,)),
+    # matches_service, including the events.ingest_key lookup of add_match_events
+    (matches_service._MATCH, (1,)),
+    (matches_service._CLUB_MATCHES, (1, 1)),
+    (matches_service._LEAGUE_FIXTURES, (1,)),
+    (matches_service._MATCH_ID, (1,)),
+    (matches_service._MATCH_SCORE, (1,)),
+    (matches_service._PLAYER_CLUBS.format(marks=MARKS), (1, 2)),
+    (matches_service._MATCH_EVENTS, (1,)),
+    (matches_service._STORED_INGEST_KEYS.format(marks=MARKS), ('a', 'b')),
+    (ingest_service._KNOWN_MATCHES.format(marks=MARKS), (1, 2)),
+    # leagues_service
+    (leagues_service._LEAGUE_CLUBS, (1,)),
+    (leagues_service._LEAGUE_FIXTURES, (1,)),
+    # services.standings
+    (standings._LEAGUE_RECORDS, {'lid': 1}),
+    # statistics_service: club_stats / player_stats reads and league totals
+    (STATS._CLUB_STATS, (1,)),
+    (STATS._CLUB_TOTALS.format(filter=f"WHERE c.id IN ({MARKS})"), (1, 2)),
+    (STATS._PLAYER_STATS, (1,)),
+    (STATS._ALL_PLAYER_STATS + STATS._SQUAD_FILTER, (1,)),
+    (STATS._PLAYER_IDS.format(player_filter=STATS._LEAGUE_PLAYERS_FILTER + STATS._LEAGUE_CLUB_FILTER), (1, 1)),
+    (STATS._LEAGUE_EVENT_TOTALS.format(player_filter=STATS._LEAGUE_PLAYERS_FILTER), (1, 1)),
+    (STATS._LEAGUE_EVENT_TOTALS.format(player_filter=STATS._LEAGUE_PLAYERS_FILTER + STATS._LEAGUE_CLUB_FILTER),
+     (1, 1, 1)),
+    # club_stats triggers (schema SQL, not service code)
+    ("UPDATE club_stats SET played = played - 1 WHERE club_id = ? AND league_id = ?", (1, 0)),
+    # cascades from deleting a club / player / match follow the foreign keys
+    ("SELECT id FROM players WHERE club_id = ?", (1,)),
+    ("SELECT id FROM league_teams WHERE club_id = ?", (1,)),
+    ("SELECT id FROM events WHERE player_id = ?", (1,)),
+]
+
+
+class TestQueryPlans(unittest.TestCase):
+    def setUp(self):
+        test_config.setup_test_environment()
+
+    def tearDown(self):
+        test_config.cleanup_test_environment()
+
+    def test_no_service_lookup_scans_a_table(self):
+        for query, params in LOOKUP_QUERIES:
+            with self.subTest(query=query):
+                plan = fetch_all(f"EXPLAIN QUERY PLAN {query}", params)
+                self.assertTrue(plan, "query plan should not be empty")
+                scans = [r['detail'] for r in plan if r['detail'].startswith('SCAN ')]
+                self.assertEqual(scans, [], f"full scan in plan: {[r['detail'] for r in plan]}")
+
+
+if __name__ == '__main__':
+    unittest.main()
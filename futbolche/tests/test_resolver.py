@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Unit tests for shared entity resolution (services.resolver)"""
+
+import os
+import sys
+import unittest
+import unittest.mock
+
+# Ensure src is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from test_config import test_config
+from db import execute, fetch_one, fetch_all
+from services import resolver
+from services.resolver import resolve_club_id, resolve_player_id, resolve_league_id, resolve_player_ids
+
+
+class TestResolver(unittest.TestCase):
+    def setUp(self):
+        test_config.setup_test_environment()
+        self.levski = fetch_one("SELECT id FROM clubs WHERE name = ?", ("Левски София",))['id']
+        self.cska = fetch_one("SELECT id FROM clubs WHERE name = ?", ("ЦСКА София",))['id']
+
+    def tearDown(self):
+        test_config.cleanup_test_environment()
+
+    def test_exact_match_ignores_cyrillic_case(self):
+        self.assertEqual(resolve_club_id('левски софия'), self.levski)
+        self.assertEqual(resolve_club_id('  ЛЕВСКИ СОФИЯ '), self.levski)
+
+    def test_prefix_and_contains_matches(self):
+        self.assertEqual(resolve_club_id('левски'), self.levski)
+        self.assertEqual(resolve_club_id('цска'), self.cska)
+        # substring in the middle of the name
+        self.assertEqual(resolve_club_id('море'), fetch_one("SELECT id FROM clubs WHERE name = ?", ("Черно море Варна",))['id'])
+
+    def test_lowest_id_wins_among_matches(self):
+        # two sample players are called Иван Иванов (Levski and Beroe)
+        first = fetch_one("SELECT MIN(id) AS id FROM players WHERE full_name = ?", ("Иван Иванов",))['id']
+        self.assertEqual(resolve_player_id('иван иванов'), first)
+        # "София" matches Левски София and ЦСКА София
+        self.assertEqual(resolve_club_id('софия'), min(self.levski, self.cska))
+
+    def test_prefix_match_does_not_beat_lower_id(self):
+        """The lowest id containing the text wins even if a later row starts with it"""
+        sea = fetch_one("SELECT id FROM clubs WHERE name = ?", ("Черно море Варна",))['id']
+        execute("INSERT INTO clubs (name, city, founded_year) VALUES (?, ?, ?)", ("Море Бургас", "Бургас", 1990))
+        self.assertEqual(resolve_club_id('море'), sea)
+        # too short for the trigram index
+        lowest = min(r['id'] for r in fetch_all("SELECT id, name FROM clubs") if 'с' in r['name'].casefold())
+        self.assertEqual(resolve_club_id('с'), lowest)
+
+    def test_exact_only_mode(self):
+        self.assertIsNone(resolve_club_id('левски', partial=False))
+        self.assertEqual(resolve_club_id('Левски София', partial=False), self.levski)
+
+    def test_numeric_ids(self):
+        self.assertEqual(resolve_club_id(str(self.levski)), self.levski)
+        self.assertEqual(resolve_club_id(self.cska), self.cska)
+        self.assertIsNone(resolve_player_id('99999'))
+
+    def test_name_keys_follow_inserts_and_renames(self):
+        execute("INSERT INTO leagues (name, season) VALUES (?, ?)", ("Първа Лига", "2025"))
+        lid = resolve_league_id('първа лига')
+        self.assertIsNotNone(lid)
+        execute("UPDATE leagues SET name = ? WHERE id = ?", ("Втора Лига", lid))
+        self.assertIsNone(resolve_league_id('първа лига'))
+        self.assertEqual(resolve_league_id('ВТОРА ЛИГА'), lid)
+
+    def test_unknown_names(self):
+        self.assertIsNone(resolve_club_id('Несъществуващ Клуб'))
+        self.assertIsNone(resolve_player_id(''))
+        self.assertIsNone(resolve_league_id(None))
+
+    def test_many_players_resolve_like_one_at_a_time(self):
+        identifiers = ['иван иванов', 'ИВАН ИВАНОВ', '3', 3, 'кейсел', 'Несъществуващ', '99999', '', None]
+        expected = {i: resolve_player_id(i) for i in identifiers}
+        with unittest.mock.patch.object(resolver, '_resolve', wraps=resolver._resolve) as single:
+            self.assertEqual(resolve_player_ids(identifiers), expected)
+        # only the names without an exact match fall back to one lookup each
+        self.assertEqual(sorted(str(c.args[1]) for c in single.call_args_list), ['99999', 'Несъществуващ', 'кейсел'])
+        self.assertEqual(resolve_player_ids(['кейсел'], partial=False), {'кейсел': None})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Unit tests for the intent handler registry (chatbot.router)"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Ensure src is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from test_config import test_config
+from db import execute
+from chatbot import nlu, router
+from chatbot.chatbot import parse_and_handle
+from chatbot.router import ROUTES, UNKNOWN_RESPONSE, get_help, handle_intent, response_cache, route
+
+
+class TestRouteRegistry(unittest.TestCase):
+    def test_every_help_category_tag_is_registered(self):
+        for tags in router.CATEGORIES.values():
+            for tag in tags:
+                if tag in ('create_league', 'add_club_to_league', 'get_league_teams',
+                           'generate_round_robin'):
+                    continue  # listed in help, not routed yet
+                self.assertIn(tag, ROUTES, tag)
+        self.assertIn('help', ROUTES)
+        self.assertIn('exit', ROUTES)
+
+    def test_unknown_intent(self):
+        self.assertEqual(handle_intent('unknown', None), UNKNOWN_RESPONSE)
+        self.assertEqual(handle_intent('no_such_intent', {'x': '1'}), UNKNOWN_RESPONSE)
+
+    def test_missing_required_params_return_declared_error(self):
+        entry = ROUTES['transfer_player']
+        self.assertEqual(entry.required, ('player_identifier', 'club_identifier'))
+        self.assertEqual(handle_intent('transfer_player', None), entry.error)
+        self.assertEqual(handle_intent('transfer_player', {'player_identifier': 'иван'}), entry.error)
+
+    def test_handler_not_called_without_required_params(self):
+        handler = mock.Mock(return_value='ok')
+        with mock.patch.dict(ROUTES, {'delete_player': ROUTES['delete_player']._replace(handler=handler)}):
+            handle_intent('delete_player', {})
+            handler.assert_not_called()
+            self.assertEqual(handle_intent('delete_player', {'player_identifier': '7'}), 'ok')
+            handler.assert_called_once_with({'player_identifier': '7'})
+
+    def test_handlers_receive_dict_for_missing_params(self):
+        handler = mock.Mock(return_value='ok')
+        with mock.patch.dict(ROUTES, {'list_clubs': ROUTES['list_clubs']._replace(handler=handler, reads=())}):
+            handle_intent('list_clubs', None)
+        handler.assert_called_once_with({})
+
+    def test_register_new_intent(self):
+        with mock.patch.dict(ROUTES):
+            @route('echo', ('text',), "Формат: ехо [text]")
+            def _echo(params):
+                return params['text']
+
+            self.assertEqual(handle_intent('echo', {'text': 'здравей'}), 'здравей')
+            self.assertEqual(handle_intent('echo', None), "Формат: ехо [text]")
+        self.assertNotIn('echo', ROUTES)
+
+    def test_exit(self):
+        self.assertEqual(handle_intent('exit', None), 'exit')
+
+
+class TestHelp(unittest.TestCase):
+    def setUp(self):
+        router._help_pages.clear()
+
+    def test_help_built_once_per_intents_version(self):
+        with mock.patch.object(router, '_build_help_pages', wraps=router._build_help_pages) as build:
+            first = handle_intent('help', None)
+            second = handle_intent('help', None)
+            self.assertEqual(first, second)
+            self.assertEqual(build.call_count, 1)
+
+            nlu.reload_intents()
+            self.assertEqual(handle_intent('help', None), first)
+            self.assertEqual(build.call_count, 2)
+
+    def test_full_help_lists_categories(self):
+        text = parse_and_handle("помощ")
+        self.assertTrue(text.startswith("Налични команди:"))
+        for category in ("Клубове:", "Играчи:", "Лиги:"):
+            self.assertIn(category, text)
+
+    def test_category_page(self):
+        text = parse_and_handle("помощ играчи")
+        self.assertTrue(text.startswith("Играчи:"))
+        self.assertIn("- изтрий играч [player_identifier]", text)
+        self.assertNotIn("Клубове:", text)
+        self.assertLess(len(text), len(get_help()))
+
+    def test_category_is_case_insensitive(self):
+        self.assertEqual(get_help("СТАТИСТИКА"), get_help("статистика"))
+
+    def test_unknown_category_lists_categories(self):
+        text = parse_and_handle("помощ голф")
+        self.assertIn("Няма категория 'голф'", text)
+        self.assertIn("клубове", text)
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        test_config.setup_test_environment()
+        response_cache.clear()
+
+    def tearDown(self):
+        test_config.cleanup_test_environment()
+
+    def test_repeat_read_is_served_from_cache(self):
+        with mock.patch.object(router, 'list_clubs', wraps=router.list_clubs) as service:
+            first = parse_and_handle("покажи клубове")
+            second = parse_and_handle("покажи всички клубове")
+        self.assertEqual(first, second)
+        self.assertEqual(service.call_count, 1)
+        info = response_cache.info()
+        self.assertEqual((info['hits'], info['misses']), (1, 1))
+
+    def test_params_are_normalized_in_key(self):
+        first = handle_intent('club_statistics', {'club_identifier': 'левски  софия'})
+        self.assertEqual(handle_intent('club_statistics', {'club_identifier': ' левски софия '}), first)
+        self.assertEqual(response_cache.info()['hits'], 1)
+
+    def test_write_to_read_table_invalidates(self):
+        self.assertNotIn("кешов клуб", parse_and_handle("покажи клубове"))
+        parse_and_handle("добави клуб Кешов Клуб")
+        self.assertIn("кешов клуб", parse_and_handle("покажи клубове"))
+        self.assertEqual(response_cache.info()['stale'], 1)
+
+    def test_unrelated_write_keeps_entry(self):
+        parse_and_handle("покажи клубове")
+        execute("UPDATE players SET number = 99 WHERE id = 1")
+        parse_and_handle("покажи клубове")
+        self.assertEqual(response_cache.info()['hits'], 1)
+
+    def test_match_write_refreshes_club_statistics(self):
+        before = parse_and_handle("покажи статистика на клуб Левски София")
+        execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) "
+                "VALUES (1, 4, 5, 0, '2025-09-01')")
+        after = parse_and_handle("покажи статистика на клуб Левски София")
+        self.assertNotEqual(before, after)
+
+    def test_transfer_invalidates_player_list(self):
+        before = parse_and_handle("покажи всички играчи")
+        parse_and_handle("трансферирай играч Васил Лечков в клуб Берое")
+        self.assertNotEqual(parse_and_handle("покажи всички играчи"), before)
+
+    def test_write_intents_are_not_cached(self):
+        self.assertEqual(ROUTES['add_club'].reads, ())
+        parse_and_handle("добави клуб Първи Нов")
+        self.assertIn("вече съществува", parse_and_handle("добави клуб Първи Нов"))
+        self.assertEqual(response_cache.info()['size'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Unit tests for the FTS5 trigram name search (search_service)"""
+
+import os
+import sys
+import unittest
+
+# Ensure src is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from test_config import test_config
+from db import execute, fetch_all, fetch_one
+from services.search_service import search, search_names, first_substring_match
+from chatbot.chatbot import parse_and_handle
+
+
+class TestSearchService(unittest.TestCase):
+    def setUp(self):
+        test_config.setup_test_environment()
+
+    def tearDown(self):
+        test_config.cleanup_test_environment()
+
+    def test_search_index_is_created(self):
+        rows = fetch_all("SELECT name FROM sqlite_master WHERE name IN ('clubs_fts', 'players_fts')")
+        self.assertEqual(len(rows), 2)
+
+    def test_substring_match_handles_cyrillic_case(self):
+        pid = first_substring_match('players', 'лечков')
+        row = fetch_one("SELECT full_name FROM players WHERE id = ?", (pid,))
+        self.assertEqual(row['full_name'], 'Васил Лечков')
+
+    def test_index_follows_inserts_renames_and_deletes(self):
+        cid = execute("INSERT INTO clubs (name, city, founded_year) VALUES (?, ?, ?)", ("Славия София", "София", 1913))
+        self.assertEqual(first_substring_match('clubs', 'слави'), cid)
+        execute("UPDATE clubs SET name = ? WHERE id = ?", ("Етър Велико Търново", cid))
+        self.assertIsNone(first_substring_match('clubs', 'слави'))
+        self.assertEqual(first_substring_match('clubs', 'търново'), cid)
+        execute("DELETE FROM clubs WHERE id = ?", (cid,))
+        self.assertIsNone(first_substring_match('clubs', 'търново'))
+
+    def test_ranked_search_prefers_whole_term(self):
+        names = [r['name'] for r in search_names('players', 'иван иванов')]
+        self.assertEqual(names[:2], ['Иван Иванов', 'Иван Иванов'])
+        # players matching only one of the words are still returned, later
+        self.assertIn('Ивелин Попов', [r['name'] for r in search_names('players', 'ивелин иванов')])
+
+    def test_short_terms_fall_back_to_scan(self):
+        self.assertTrue(search_names('clubs', 'цс'))
+
+    def test_search_output_and_intent(self):
+        self.assertIn('Левски София', search('левски'))
+        self.assertIn('Няма намерени резултати', search('несъществуващо'))
+        response = parse_and_handle('търси стоянов')
+        self.assertIn('Играчи:', response)
+        self.assertIn('Кристиян Стоянов', response)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Unit tests for the shared standings engine (services.standings)"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Ensure src is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from test_config import test_config
+from services import standings
+from services import leagues_service as leagues
+from services import matches_service as matches
+from db import execute, fetch_one, fetch_all
+
+
+class TestStandingsEngine(unittest.TestCase):
+    def setUp(self):
+        test_config.setup_test_environment()
+        leagues.create_league('Тест Лига', '2025')
+        self.lid = fetch_one("SELECT id FROM leagues WHERE name = ?", ('Тест Лига',))['id']
+        for name in ('Левски София', 'ЦСКА София', 'Ботев Пловдив'):
+            leagues.add_club_to_league(self.lid, name)
+
+    def tearDown(self):
+        test_config.cleanup_test_environment()
+
+    def _by_name(self):
+        return {r.name: r for r in standings.league_table(self.lid)}
+
+    def test_record_has_no_instance_dict(self):
+        record = standings.TeamRecord(1, 'Левски София')
+        self.assertFalse(hasattr(record, '__dict__'))
+        with self.assertRaises(AttributeError):
+            record.extra = 1
+
+    def test_unplayed_fixtures_are_not_counted(self):
+        leagues.generate_round_robin(self.lid)
+        table = self._by_name()
+        self.assertEqual(len(table), 3)
+        self.assertTrue(all(r.played == 0 and r.points == 0 for r in table.values()))
+        self.assertEqual(leagues.get_standings(self.lid), "Няма мачове в тази лига.")
+
+        mid = fetch_one("SELECT id FROM matches WHERE league_id = ? ORDER BY id", (self.lid,))['id']
+        execute("UPDATE matches SET home_goals = 2, away_goals = 0 WHERE id = ?", (mid,))
+        table = self._by_name()
+        self.assertEqual(sum(r.played for r in table.values()), 2)
+        self.assertEqual(sorted(r.points for r in table.values()), [0, 0, 3])
+
+    def test_record_match_without_score_is_a_fixture(self):
+        res = matches.record_match('Левски София', 'ЦСКА София', '2025-09-01', league_id=self.lid)
+        self.assertIn('записан', res)
+        self.assertEqual(self._by_name()['Левски София'].played, 0)
+
+    def test_both_services_rank_the_same(self):
+        matches.record_match('Левски София', 'ЦСКА София', '2025-09-01', home_goals=2, away_goals=1, league_id=self.lid)
+        matches.record_match('ЦСКА София', 'Ботев Пловдив', '2025-09-02', home_goals=0, away_goals=1, league_id=self.lid)
+        matches.record_match('Ботев Пловдив', 'Левски София', '2025-09-03', home_goals=0, away_goals=0, league_id=self.lid)
+
+        order = [r.name for r in standings.league_table(self.lid)]
+        self.assertEqual(order, ['Левски София', 'Ботев Пловдив', 'ЦСКА София'])
+        for text in (matches.get_league_standings(self.lid), leagues.get_standings(self.lid)):
+            lines = text.splitlines()
+            self.assertEqual(len(lines), 3)
+            for pos, (line, name) in enumerate(zip(lines, order), start=1):
+                self.assertTrue(line.startswith(f"{pos}. {name} "), line)
+
+    def test_club_with_result_but_not_registered_is_listed(self):
+        matches.record_match('Левски София', 'Черно море Варна', '2025-09-01', home_goals=1, away_goals=1, league_id=self.lid)
+        self.assertIn('Черно море Варна', self._by_name())
+
+    def test_tie_breakers_are_configurable(self):
+        records = [standings.TeamRecord(1, 'Б', played=2, wins=1, losses=1, goals_for=5, goals_against=4),
+                   standings.TeamRecord(2, 'А', played=2, wins=1, losses=1, goals_for=2, goals_against=0)]
+        self.assertEqual([r.name for r in standings.rank(records)], ['А', 'Б'])
+        self.assertEqual([r.name for r in standings.rank(records, ('points', 'goals_for'))], ['Б', 'А'])
+        with self.assertRaises(ValueError):
+            standings.rank(records, ('points', 'head_to_head'))
+
+
+class TestStandingsCache(unittest.TestCase):
+    def setUp(self):
+        test_config.setup_test_environment()
+        leagues.create_league('Кеш Лига', '2025')
+        self.lid = fetch_one("SELECT id FROM leagues WHERE name = ?", ('Кеш Лига',))['id']
+        for name in ('Левски София', 'ЦСКА София', 'Ботев Пловдив'):
+            leagues.add_club_to_league(self.lid, name)
+        standings.cache.clear()
+
+    def tearDown(self):
+        test_config.cleanup_test_environment()
+
+    def _snapshot(self):
+        return [(r.name, r.played, r.wins, r.draws, r.losses, r.goals_for, r.goals_against)
+                for r in standings.league_table(self.lid)]
+
+    def _fresh(self):
+        return [(r.name, r.played, r.wins, r.draws, r.losses, r.goals_for, r.goals_against)
+                for r in standings.rank(standings._load_league(self.lid))]
+
+    def _reads_after_write(self):
+        """Table as served after a write, and how many queries serving it took."""
+        with mock.patch.object(standings, 'fetch_all', wraps=standings.fetch_all) as q:
+            table = self._snapshot()
+        return table, q.call_count
+
+    def test_warm_table_needs_no_query(self):
+        self._snapshot()
+        table, queries = self._reads_after_write()
+        self.assertEqual(queries, 0)
+        self.assertEqual(table, self._fresh())
+
+    def test_record_match_is_applied_as_delta(self):
+        self._snapshot()
+        matches.record_match('Левски София', 'ЦСКА София', '2025-09-01', home_goals=3, away_goals=1, league_id=self.lid)
+        table, queries = self._reads_after_write()
+        self.assertEqual(queries, 0)
+        self.assertEqual(table, self._fresh())
+        self.assertEqual(table[0][:3], ('Левски София', 1, 1))
+        self.assertEqual(standings.cache.info()['deltas'], 1)
+
+    def test_goal_and_delete_are_applied_as_deltas(self):
+        matches.record_match('ЦСКА София', 'Ботев Пловдив', '2025-09-01', league_id=self.lid)
+        mid = fetch_one("SELECT MAX(id) AS id FROM matches")['id']
+        self._snapshot()
+
+        matches.record_event(mid, 'Иван Иванов', 'goal', 10)  # not in this match: no score change
+        botev_player = fetch_all("SELECT full_name FROM players WHERE club_id = "
+                                 "(SELECT id FROM clubs WHERE name = 'Ботев Пловдив') LIMIT 1")[0]['full_name']
+        matches.record_event(mid, botev_player, 'goal', 20)
+        table, queries = self._reads_after_write()
+        self.assertEqual(queries, 0)
+        self.assertEqual(table, self._fresh())
+        self.assertEqual(table[0][:3], ('Ботев Пловдив', 1, 1))
+
+        self.assertIn('изтрит', matches.delete_match(mid))
+        table, queries = self._reads_after_write()
+        self.assertEqual(queries, 0)
+        self.assertEqual(table, self._fresh())
+        self.assertTrue(all(row[1] == 0 for row in table))
+
+    def test_other_writes_fall_back_to_recompute(self):
+        self._snapshot()
+        execute("UPDATE matches SET home_goals = 5, away_goals = 0 WHERE home_team_id = 1 AND away_team_id = 2")
+        execute("UPDATE matches SET league_id = ? WHERE home_team_id = 1 AND away_team_id = 2", (self.lid,))
+        table, queries = self._reads_after_write()
+        self.assertEqual(queries, 1)
+        self.assertEqual(table, self._fresh())
+
+    def test_new_club_in_league_falls_back_to_recompute(self):
+        self._snapshot()
+        matches.record_match('Левски София', 'Черно море Варна', '2025-09-01', home_goals=1, away_goals=0, league_id=self.lid)
+        table, queries = self._reads_after_write()
+        self.assertEqual(queries, 1)
+        self.assertIn('Черно море Варна', [row[0] for row in table])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,14 +4,19 @@
 import os
 import sys
 import unittest
+from unittest import mock
 
 # Ensure src is importable
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 sys.path.insert(0, os.path.dirname(__file__))
 
 from test_config import test_config
-from services.statistics_service import get_club_statistics, get_player_statistics
-from db import execute_query
+import services.statistics_service as statistics_service
+from services.statistics_service import (
+    get_club_statistics, get_club_statistics_many, get_player_statistics, get_player_statistics_many,
+    get_player_advanced_metrics, get_player_advanced_metrics_many, check_club_stats, check_player_stats
+)
+from db import execute, execute_query, fetch_all, rebuild_club_stats, rebuild_player_stats
 
 
 class TestStatisticsService(unittest.TestCase):
@@ -35,5 +40,167 @@ class TestStatisticsService(unittest.TestCase):
         self.assertGreaterEqual(stats['goals'], 1)
 
 
+    def test_get_club_statistics_is_one_query(self):
+        with mock.patch.object(statistics_service, 'fetch_one', wraps=statistics_service.fetch_one) as q:
+            stats = get_club_statistics(1)
+        self.assertEqual(q.call_count, 1)
+        self.assertEqual((stats['played'], stats['wins'], stats['draws'], stats['losses']), (2, 1, 1, 0))
+        self.assertEqual((stats['goals_for'], stats['goals_against'], stats['points']), (2, 1, 4))
+
+    def test_club_statistics_many_matches_single_lookups(self):
+        execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) "
+                "VALUES (2, 1, 4, 0, '2025-09-01')")
+        many = get_club_statistics_many()
+        self.assertEqual(len(many), 8)
+        for cid, stats in many.items():
+            self.assertEqual(stats, get_club_statistics(cid))
+
+    def test_club_statistics_many_selected_ids(self):
+        new_club = execute("INSERT INTO clubs (name, city, founded_year) VALUES ('Без Мачове', 'София', 2020)")
+        many = get_club_statistics_many([1, new_club, 999])
+        self.assertEqual(set(many), {1, new_club})
+        self.assertEqual(many[new_club]['played'], 0)
+        self.assertEqual(many[new_club]['points'], 0)
+        self.assertEqual(get_club_statistics_many([]), {})
+
+
+    def test_get_player_statistics_is_one_query(self):
+        with mock.patch.object(statistics_service, 'fetch_one', wraps=statistics_service.fetch_one) as q, \
+                mock.patch.object(statistics_service, 'fetch_all', wraps=statistics_service.fetch_all) as q_all:
+            stats = get_player_statistics('Васил Лечков')
+        self.assertEqual(q.call_count + q_all.call_count, 1)
+        self.assertEqual((stats['goals'], stats['assists'], stats['appearances']), (1, 1, 0))
+        self.assertEqual((stats['yellow_cards'], stats['red_cards']), (0, 0))
+
+    def test_player_statistics_many_matches_single_lookups(self):
+        many = get_player_statistics_many()
+        self.assertEqual(len(many), 38)
+        for pid, stats in many.items():
+            self.assertEqual(stats, get_player_statistics(pid))
+        metrics = get_player_advanced_metrics_many()
+        for pid in many:
+            self.assertEqual(metrics[pid], get_player_advanced_metrics(pid))
+
+    def test_player_statistics_many_for_club(self):
+        many = get_player_statistics_many(club_id=3)
+        self.assertEqual(len(many), 5)
+        self.assertEqual(sum(s['goals'] for s in many.values()), 1)
+
+    def test_player_statistics_many_for_league_counts_league_matches_only(self):
+        lid = execute("INSERT INTO leagues (name, season) VALUES ('Тестова', '2025')")
+        execute("INSERT INTO league_teams (league_id, club_id) VALUES (?, 3)", (lid,))
+        self.assertEqual(sum(s['goals'] for s in get_player_statistics_many(league_id=lid).values()), 0)
+
+        # the Botev goal of sample match 3 counts once that match is in the league
+        execute("UPDATE matches SET league_id = ? WHERE home_team_id = 2 AND away_team_id = 3", (lid,))
+        many = get_player_statistics_many(league_id=lid)
+        self.assertEqual(len(many), 5)
+        self.assertEqual(sum(s['goals'] for s in many.values()), 1)
+
+
+class TestClubStatsTable(unittest.TestCase):
+    """club_stats is kept in step with matches by triggers"""
+
+    def setUp(self):
+        test_config.setup_test_environment()
+
+    def tearDown(self):
+        test_config.cleanup_test_environment()
+
+    def _stored(self):
+        return {(r['club_id'], r['league_id']): tuple(r)[2:] for r in fetch_all("SELECT * FROM club_stats")}
+
+    def _expected(self):
+        return {(r['club_id'], r['league_id']): tuple(r)[2:] for r in fetch_all("SELECT * FROM club_stats_from_matches")}
+
+    def test_seeded_database_is_consistent(self):
+        self.assertTrue(self._stored())
+        self.assertEqual(check_club_stats(), [])
+
+    def test_match_writes_keep_table_consistent(self):
+        lid = execute("INSERT INTO leagues (name, season) VALUES ('Тестова', '2025')")
+        mid = execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date, league_id) "
+                      "VALUES (1, 4, 3, 1, '2025-09-01', ?)", (lid,))
+        self.assertEqual(self._stored()[(1, lid)], (1, 1, 0, 0, 3, 1))
+        self.assertEqual(self._stored()[(4, lid)], (1, 0, 0, 1, 1, 3))
+
+        execute("UPDATE matches SET home_goals = 1 WHERE id = ?", (mid,))
+        self.assertEqual(self._stored()[(4, lid)], (1, 0, 1, 0, 1, 1))
+        execute("UPDATE matches SET league_id = NULL, away_team_id = 5 WHERE id = ?", (mid,))
+        self.assertNotIn((4, lid), self._stored())
+        self.assertEqual(self._stored(), self._expected())
+
+        execute("DELETE FROM matches WHERE id = ?", (mid,))
+        self.assertEqual(self._stored(), self._expected())
+        self.assertEqual(check_club_stats(), [])
+
+    def test_club_and_league_deletes_cascade(self):
+        lid = execute("INSERT INTO leagues (name, season) VALUES ('Тестова', '2025')")
+        execute("INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date, league_id) "
+                "VALUES (2, 3, 2, 2, '2025-09-01', ?)", (lid,))
+        execute("DELETE FROM leagues WHERE id = ?", (lid,))
+        self.assertEqual(self._stored(), self._expected())
+
+        execute("DELETE FROM clubs WHERE id = 1")
+        self.assertFalse([key for key in self._stored() if key[0] == 1])
+        self.assertEqual(self._stored(), self._expected())
+
+    def test_check_reports_drift_and_rebuild_repairs_it(self):
+        execute("UPDATE club_stats SET wins = wins + 5 WHERE club_id = 1")
+        execute("DELETE FROM club_stats WHERE club_id = 2")
+        diffs = check_club_stats()
+        self.assertEqual({d[0] for d in diffs}, {1, 2})
+        stored, expected = next((d[2], d[3]) for d in diffs if d[0] == 2)
+        self.assertIsNone(stored)
+        self.assertIsNotNone(expected)
+
+        self.assertTrue(rebuild_club_stats())
+        self.assertEqual(check_club_stats(), [])
+        self.assertEqual(get_club_statistics(1)['wins'], 1)
+
+
+class TestPlayerStatsTable(unittest.TestCase):
+    """player_stats is kept in step with events by triggers"""
+
+    def setUp(self):
+        test_config.setup_test_environment()
+
+    def tearDown(self):
+        test_config.cleanup_test_environment()
+
+    def test_seeded_database_is_consistent(self):
+        self.assertTrue(fetch_all("SELECT * FROM player_stats"))
+        self.assertEqual(check_player_stats(), [])
+
+    def test_event_writes_keep_table_consistent(self):
+        eid = execute("INSERT INTO events (match_id, player_id, event_type, minute) VALUES (1, 5, 'appearance', 0)")
+        stats = get_player_statistics(5)
+        self.assertEqual((stats['appearances'], stats['minutes']), (1, 90))
+
+        execute("UPDATE events SET event_type = 'red' WHERE id = ?", (eid,))
+        stats = get_player_statistics(5)
+        self.assertEqual((stats['appearances'], stats['minutes'], stats['red_cards']), (0, 0, 1))
+        execute("UPDATE events SET player_id = 6 WHERE id = ?", (eid,))
+        self.assertEqual(get_player_statistics(5)['red_cards'], 0)
+        self.assertEqual(get_player_statistics(6)['red_cards'], 1)
+
+        execute("DELETE FROM events WHERE id = ?", (eid,))
+        self.assertEqual(get_player_statistics(6)['red_cards'], 0)
+        self.assertEqual(check_player_stats(), [])
+
+    def test_player_and_match_deletes_cascade(self):
+        execute("DELETE FROM players WHERE id = 1")
+        execute("DELETE FROM matches WHERE id = 1")
+        self.assertFalse(fetch_all("SELECT * FROM player_stats WHERE player_id = 1"))
+        self.assertEqual(check_player_stats(), [])
+
+    def test_check_reports_drift_and_rebuild_repairs_it(self):
+        execute("UPDATE player_stats SET goals = goals + 3 WHERE player_id = 1")
+        self.assertEqual([d[0] for d in check_player_stats()], [1])
+
+        self.assertTrue(rebuild_player_stats())
+        self.assertEqual(check_player_stats(), [])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the database layer (db.py).
+
+Runs against a throw-away database in a temporary directory:
+
+    python tools/bench_db.py
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import db
+
+
+QUERY = "SELECT id, name FROM clubs WHERE id = ?"
+
+
+def _legacy_fetch_one(query, params=()):
+    """fetch_one as it worked before pooling: schema probe + connect per call."""
+    if os.path.exists(db.DB_PATH):
+        probe = sqlite3.connect(db.DB_PATH)
+        probe.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='clubs'").fetchone()
+        probe.close()
+    conn = sqlite3.connect(db.DB_PATH)
+    try:
+        conn.execute('PRAGMA foreign_keys = ON')
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(query, params).fetchall()
+        return rows[0] if rows else None
+    finally:
+        conn.close()
+
+
+def _qps(fn, n):
+    start = time.perf_counter()
+    for i in range(n):
+        fn(QUERY, (i % 8 + 1,))
+    return n / (time.perf_counter() - start)
+
+
+def bench_fetch_one(n=5000):
+    before = _qps(_legacy_fetch_one, n)
+    after = _qps(db.fetch_one, n)
+    print(f"fetch_one  before: {before:10.0f} q/s   after: {after:10.0f} q/s   x{after / before:.1f}")
+
+
+def bench_name_search(n_players=200000, lookups=200):
+    from services.search_service import first_substring_match
+
+    db.execute_many(
+        "INSERT INTO players (club_id, full_name, birth_date, nationality, position, number, status) "
+        "VALUES (1, ?, '1990-01-01', 'България', 'MF', 10, 'Активен')",
+        ((f"Играч Номер{i:06d} Тестов",) for i in range(n_players))
+    )
+
+    terms = [f"номер{i * 997 % n_players:06d}" for i in range(lookups)]
+
+    start = time.perf_counter()
+    for term in terms:
+        db.fetch_one("SELECT MIN(id) AS id FROM players WHERE instr(name_key, ?) > 0", (term,))
+    scan_ms = (time.perf_counter() - start) * 1000 / lookups
+
+    start = time.perf_counter()
+    for term in terms:
+        first_substring_match('players', term)
+    fts_ms = (time.perf_counter() - start) * 1000 / lookups
+
+    print(f"substring lookup over {n_players} players   scan: {scan_ms:8.3f} ms   trigram: {fts_ms:8.3f} ms")
+
+
+EVENT_INSERT = "INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)"
+
+
+def _event_rows(n):
+    kinds = ('goal', 'assist', 'yellow', 'appearance')
+    return [(i % 8 + 1, i % 38 + 1, kinds[i % 4], i % 90) for i in range(n)]
+
+
+def _rows_per_sec(fn, rows):
+    start = time.perf_counter()
+    fn(rows)
+    return len(rows) / (time.perf_counter() - start)
+
+
+def bench_event_inserts(n=100000, per_row_sample=10000):
+    """Event inserts: a commit per row (sampled), one execute_many(), and a loop inside transaction()."""
+    def per_row(rows):
+        for row in rows:
+            db.execute(EVENT_INSERT, row)
+
+    def in_transaction(rows):
+        with db.transaction() as tx:
+            for row in rows:
+                tx.execute(EVENT_INSERT, row)
+
+    single = _rows_per_sec(per_row, _event_rows(per_row_sample))
+    bulk = _rows_per_sec(lambda rows: db.execute_many(EVENT_INSERT, rows), _event_rows(n))
+    grouped = _rows_per_sec(in_transaction, _event_rows(n))
+    print(f"event inserts ({db.DB_PROFILE})   execute() per row: {single:9.0f} rows/s   "
+          f"execute_many() x{n}: {bulk:9.0f} rows/s   transaction() x{n}: {grouped:9.0f} rows/s")
+
+
+def _legacy_record_goal(mid, player, minute):
+    """record_event's goal path as it was: resolve, insert, two reads and a read-modify-write, each on its own connection."""
+    import services.matches_service as matches
+    import services.players_service as players
+    from services import standings
+
+    mid = matches._resolve_match_id(mid)
+    pid = players.get_player_id(player)
+    db.execute(EVENT_INSERT, (mid, pid, 'goal', minute))
+    p = db.fetch_one("SELECT club_id FROM players WHERE id = ?", (pid,))
+    m = db.fetch_one("SELECT home_team_id, away_team_id, home_goals, away_goals, league_id FROM matches WHERE id = ?", (mid,))
+    if p['club_id'] == m['home_team_id']:
+        score = ((m['home_goals'] or 0) + 1, m['away_goals'] or 0)
+    else:
+        score = (m['home_goals'] or 0, (m['away_goals'] or 0) + 1)
+    standings.cache.version()
+    db.execute("UPDATE matches SET home_goals = ?, away_goals = ? WHERE id = ?", score + (mid,))
+
+
+def bench_record_event(n=3000):
+    """Goal events for one match: the old four-step write against record_event's single transaction."""
+    import services.matches_service as matches
+
+    mid = db.execute("INSERT INTO matches (home_team_id, away_team_id, match_date) VALUES (1, 2, '2025-09-01')")
+    pid = db.fetch_one("SELECT id FROM players WHERE club_id = 1 ORDER BY id")['id']
+    start = time.perf_counter()
+    for i in range(n):
+        _legacy_record_goal(mid, pid, i % 90)
+    before = n / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for i in range(n):
+        matches.record_event(mid, pid, 'goal', i % 90)
+    after = n / (time.perf_counter() - start)
+    print(f"goal events  before: {before:8.0f} ev/s   after: {after:8.0f} ev/s   x{after / before:.1f}")
+
+
+def bench_match_feed(n_matches=50, per_match=40):
+    """A feed of `per_match` events per match: record_event per event against one record_events_bulk per match."""
+    import services.matches_service as matches
+
+    names = [r['full_name'] for r in db.fetch_all("SELECT full_name FROM players WHERE club_id IN (1, 2) ORDER BY id")]
+    kinds = ('goal', 'assist', 'yellow', 'appearance')
+    feed = [(names[i % len(names)], kinds[i % 4], i % 90) for i in range(per_match)]
+    timings = []
+    for bulk in (False, True):
+        mids = [db.execute("INSERT INTO matches (home_team_id, away_team_id, match_date) VALUES (1, 2, '2025-09-01')")
+                for _ in range(n_matches)]
+        start = time.perf_counter()
+        for mid in mids:
+            if bulk:
+                matches.record_events_bulk(mid, feed)
+            else:
+                for player, kind, minute in feed:
+                    matches.record_event(mid, player, kind, minute)
+        timings.append(n_matches * per_match / (time.perf_counter() - start))
+    print(f"match feed, {per_match} events/match   record_event: {timings[0]:8.0f} ev/s   "
+          f"record_events_bulk: {timings[1]:8.0f} ev/s   x{timings[1] / timings[0]:.1f}")
+
+
+def main():
+    temp_dir = tempfile.mkdtemp()
+    db.DB_PATH = os.path.join(temp_dir, 'bench_football.db')
+    try:
+        db.initialize_database()
+        bench_fetch_one()
+        bench_name_search()
+        bench_record_event()
+        bench_match_feed()
+        for profile in ('performance', 'safe'):
+            db.DB_PROFILE = profile
+            bench_event_inserts()
+    finally:
+        db.close_pool()
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
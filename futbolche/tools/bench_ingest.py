@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the live event-feed ingester (services/ingest_service.py).
+
+Replays a generated JSON-lines feed against a throw-away database:
+
+    python tools/bench_ingest.py
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import db
+import services.matches_service as matches
+from services.ingest_service import EventIngester, follow_file
+
+
+def _feed(n_events, n_matches, prefix='bench', duplicate_every=20):
+    """Feed lines for `n_matches` new matches; every `duplicate_every`-th line is redelivered."""
+    mids = [db.execute("INSERT INTO matches (home_team_id, away_team_id, match_date) VALUES (1, 2, '2025-09-01')")
+            for _ in range(n_matches)]
+    names = [r['full_name'] for r in db.fetch_all("SELECT full_name FROM players WHERE club_id IN (1, 2) ORDER BY id")]
+    kinds = ('goal', 'assist', 'yellow', 'appearance')
+    lines = []
+    for i in range(n_events):
+        event = {'key': f"{prefix}:{i}", 'match_id': mids[i % n_matches], 'player': names[i % len(names)],
+                 'type': kinds[i % 4], 'minute': i % 90}
+        lines.append(json.dumps(event, ensure_ascii=False))
+        if i % duplicate_every == 0:
+            lines.append(lines[-1])
+    return lines
+
+
+def bench_per_event(lines):
+    """Each feed line through record_event (no batching, no idempotency)."""
+    start = time.perf_counter()
+    for line in lines:
+        e = json.loads(line)
+        matches.record_event(e['match_id'], e['player'], e['type'], e['minute'])
+    return len(lines) / (time.perf_counter() - start)
+
+
+def bench_ingester(lines, batch_size, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    ingester = EventIngester(batch_size=batch_size, max_delay=0.05, queue_size=5000).start()
+    stop = threading.Event()
+    start = time.perf_counter()
+    reader = threading.Thread(target=follow_file, args=(path, ingester, stop, False, 0.01))
+    reader.start()
+    while True:
+        stats = ingester.stats()
+        if stats['written'] + stats['duplicates'] + stats['rejected'] + stats['failed'] >= len(lines):
+            break
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    reader.join()
+    ingester.stop()
+    stats = ingester.stats()
+    print(f"  ingester, batch {batch_size:4d}: {len(lines) / elapsed:9.0f} lines/s   "
+          f"{stats['batches']:4d} batches (avg {stats['avg_batch']})   dropped duplicates {stats['duplicates']}   "
+          f"lag avg {stats['avg_lag'] * 1000:7.1f} ms  max {stats['max_lag'] * 1000:7.1f} ms")
+
+
+def main(n_events=20000, n_matches=50):
+    temp_dir = tempfile.mkdtemp()
+    db.DB_PATH = os.path.join(temp_dir, 'bench_football.db')
+    try:
+        db.initialize_database()
+        per_event = bench_per_event(_feed(2000, n_matches))
+        print(f"feed of {n_events} events over {n_matches} matches (+5% redelivered)")
+        print(f"  record_event per line:   {per_event:9.0f} lines/s")
+        for batch_size in (50, 500):
+            lines = _feed(n_events, n_matches, prefix=f"batch{batch_size}")
+            bench_ingester(lines, batch_size, os.path.join(temp_dir, f"feed{batch_size}.jsonl"))
+    finally:
+        db.close_pool()
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Parse throughput of chatbot.nlu (cache disabled):
+
+- the compiled intent model against reading and compiling intents.json on
+  every call, as parse_input used to;
+- most-specific matching over the first word's bucket against a scan of all
+  patterns that stops at the first match.
+
+    python tools/bench_nlu.py
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from chatbot import nlu
+
+
+SAMPLE_INPUTS = [
+    "помощ",
+    "покажи всички клубове",
+    "добави клуб Нови Клуб",
+    "покажи играчи на клуб Левски",
+    "покажи статистика на играч Иван Петров",
+    "трансферирай играч Иван в клуб ЦСКА",
+    "запиши мач Левски срещу ЦСКА дата 2025-09-01 резултат 2-1",
+    "покажи класиране на лига Първа Лига",
+    "нещо напълно непознато",
+]
+
+
+def _legacy_parse_input(user_input):
+    """parse_input as it worked before the compiled model: read + compile per call."""
+    text = user_input.strip()
+    with open(nlu.INTENTS_PATH, 'r', encoding='utf-8') as f:
+        intents = json.load(f).get('intents', [])
+    for intent in intents:
+        for pattern in intent.get('patterns', []):
+            regex, groups = nlu._pattern_to_regex(pattern)
+            m = regex.match(text.lower())
+            if m:
+                params = {k: v.strip() for k, v in m.groupdict().items() if v}
+                return intent.get('tag'), params if params else None
+    return 'unknown', None
+
+
+def _per_sec(fn, inputs):
+    start = time.perf_counter()
+    for text in inputs:
+        fn(text)
+    return len(inputs) / (time.perf_counter() - start)
+
+
+def bench_compiled_model(rounds=30):
+    inputs = SAMPLE_INPUTS * rounds
+    before = _per_sec(_legacy_parse_input, inputs)
+    nlu.get_intent_model()
+    parse_uncached = nlu._parse_normalized.__wrapped__
+    after = _per_sec(lambda text: parse_uncached(nlu.normalize_input(text)), inputs)
+    print(f"parse_input     per-call compile: {before:10.0f}/s   compiled model: {after:10.0f}/s   x{after / before:.1f}")
+
+
+def bench_specific_match(rounds=200):
+    model = nlu.get_intent_model()
+    inputs = [text.lower() for text in SAMPLE_INPUTS] * rounds
+
+    def first_match(text):
+        for tag, regex, groups in model.patterns:
+            if regex.match(text):
+                return tag
+        return 'unknown'
+
+    scan = _per_sec(first_match, inputs)
+    specific = _per_sec(nlu._parse_normalized.__wrapped__, inputs)
+    print(f"pattern match   first-match scan: {scan:10.0f}/s   bucket, most specific: {specific:10.0f}/s")
+
+
+if __name__ == '__main__':
+    bench_compiled_model()
+    bench_specific_match()
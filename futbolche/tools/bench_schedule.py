@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark for season fixture generation (generate_round_robin).
+
+Runs against a throw-away database in a temporary directory:
+
+    python tools/bench_schedule.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import db
+from db import execute, fetch_all, fetch_one
+import services.leagues_service as leagues
+
+
+def _legacy_round_robin(lid, club_ids, double_round=True, interval_days=7):
+    """generate_round_robin as it was: pairs (i, j) in order, one execute() and one date per fixture."""
+    current = date(2025, 8, 1)
+    legs = [(i, j) for i in range(len(club_ids)) for j in range(i + 1, len(club_ids))]
+    if double_round:
+        legs += [(j, i) for i, j in legs]
+    for i, j in legs:
+        execute("INSERT INTO matches (home_team_id, away_team_id, match_date, league_id) VALUES (?, ?, ?, ?)",
+                (club_ids[i], club_ids[j], current.isoformat(), lid))
+        current = current + timedelta(days=interval_days)
+
+
+def populate(n_teams):
+    """One league of `n_teams` new clubs; returns (league id, club ids)."""
+    with db.transaction() as tx:
+        lid = tx.execute("INSERT INTO leagues (name, season) VALUES (?, '2025')", (f"Лига {n_teams}",))
+        clubs = [tx.execute("INSERT INTO clubs (name, city, founded_year) VALUES (?, 'Град', 1950)",
+                            (f"Клуб {n_teams}-{i:03d}",)) for i in range(n_teams)]
+        tx.execute_many("INSERT INTO league_teams (league_id, club_id) VALUES (?, ?)", ((lid, c) for c in clubs))
+    return lid, clubs
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_schedule(n_teams):
+    lid, clubs = populate(n_teams)
+    legacy = _timed(lambda: _legacy_round_robin(lid, clubs))
+    legacy_days = fetch_one("SELECT COUNT(DISTINCT match_date) AS n FROM matches WHERE league_id = ?", (lid,))['n']
+    execute("DELETE FROM matches WHERE league_id = ?", (lid,))
+
+    current = _timed(lambda: leagues.generate_round_robin(lid, double_round=True, start_date='2025-08-01'))
+    rows = fetch_all("SELECT home_team_id, away_team_id, match_date FROM matches WHERE league_id = ?", (lid,))
+    days = {}
+    for r in rows:
+        days.setdefault(r['match_date'], []).extend((r['home_team_id'], r['away_team_id']))
+    assert all(len(t) == len(set(t)) for t in days.values())
+    print(f"double round-robin, {n_teams:3d} teams / {len(rows):5d} fixtures   "
+          f"pairwise, execute() each: {legacy:8.1f} ms over {legacy_days:5d} matchdays   "
+          f"circle method, one executemany: {current:7.1f} ms over {len(days):3d} matchdays")
+
+
+def main():
+    temp_dir = tempfile.mkdtemp()
+    db.DB_PATH = os.path.join(temp_dir, 'bench_football.db')
+    try:
+        db.initialize_database()
+        for n_teams in (20, 40, 100):
+            bench_schedule(n_teams)
+    finally:
+        db.close_pool()
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for league standings on a generated database of many leagues.
+
+Runs against a throw-away database in a temporary directory:
+
+    python tools/bench_standings.py
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import db
+from db import fetch_all
+import services.leagues_service as leagues
+import services.matches_service as matches
+from services import standings
+
+
+def _legacy_standings(lid):
+    """get_league_standings as it was: the team list, then one matches query per team."""
+    teams = fetch_all("SELECT lt.club_id, c.name FROM league_teams lt JOIN clubs c ON lt.club_id = c.id WHERE lt.league_id = ?", (lid,))
+    table = []
+    for t in teams:
+        cid = t['club_id']
+        rows = fetch_all("SELECT * FROM matches WHERE league_id = ? AND (home_team_id = ? OR away_team_id = ?)", (lid, cid, cid))
+        p = w = d = gf = ga = 0
+        for r in rows:
+            hg, ag = r['home_goals'], r['away_goals']
+            mine, theirs = (hg, ag) if r['home_team_id'] == cid else (ag, hg)
+            p += 1
+            gf += mine
+            ga += theirs
+            w += mine > theirs
+            d += mine == theirs
+        table.append((t['name'], p, w, d, gf, ga))
+    return table
+
+
+def _legacy_leagues_standings(lid):
+    """leagues_service.get_standings as it was: all league matches joined with club names, tallied in dicts."""
+    rows = fetch_all(
+        "SELECT m.*, hc.name as home_name, ac.name as away_name FROM matches m JOIN clubs hc ON m.home_team_id = hc.id "
+        "JOIN clubs ac ON m.away_team_id = ac.id WHERE m.league_id = ?",
+        (lid,)
+    )
+    table = {}
+    for r in rows:
+        for team, mine, theirs in ((r['home_name'], r['home_goals'], r['away_goals']),
+                                   (r['away_name'], r['away_goals'], r['home_goals'])):
+            s = table.setdefault(team, {'P': 0, 'W': 0, 'D': 0, 'L': 0, 'GF': 0, 'GA': 0, 'Pts': 0})
+            s['P'] += 1
+            s['GF'] += mine or 0
+            s['GA'] += theirs or 0
+            if (mine or 0) > (theirs or 0):
+                s['W'] += 1
+                s['Pts'] += 3
+            elif (mine or 0) < (theirs or 0):
+                s['L'] += 1
+            else:
+                s['D'] += 1
+                s['Pts'] += 1
+    return sorted(table.items(), key=lambda x: (-x[1]['Pts'], -(x[1]['GF'] - x[1]['GA']), -x[1]['GF'], x[0]))
+
+
+def _aggregate_standings(lid):
+    """One GROUP BY over the league's matches, home and away rows UNION ALL-ed."""
+    return fetch_all(
+        """SELECT lt.club_id, c.name, COUNT(s.gf) AS played, SUM(s.gf > s.ga) AS wins,
+                  SUM(s.gf = s.ga) AS draws, SUM(s.gf) AS goals_for, SUM(s.ga) AS goals_against
+           FROM league_teams lt JOIN clubs c ON c.id = lt.club_id
+           LEFT JOIN (SELECT home_team_id AS club_id, home_goals AS gf, away_goals AS ga FROM matches WHERE league_id = :lid
+                      UNION ALL
+                      SELECT away_team_id, away_goals, home_goals FROM matches WHERE league_id = :lid) s
+             ON s.club_id = lt.club_id
+           WHERE lt.league_id = :lid GROUP BY lt.club_id""",
+        {'lid': lid}
+    )
+
+
+def populate(n_leagues=100, n_teams=20):
+    """`n_leagues` leagues of `n_teams` new clubs, each with a full double round-robin of results."""
+    rng = random.Random(11)
+    league_ids = []
+    with db.transaction() as tx:
+        for n in range(n_leagues):
+            lid = tx.execute("INSERT INTO leagues (name, season) VALUES (?, '2025')", (f"Лига {n:03d}",))
+            clubs = [tx.execute("INSERT INTO clubs (name, city, founded_year) VALUES (?, 'Град', 1950)",
+                                (f"Клуб {n:03d}-{i:02d}",)) for i in range(n_teams)]
+            tx.execute_many("INSERT INTO league_teams (league_id, club_id) VALUES (?, ?)", ((lid, c) for c in clubs))
+            tx.execute_many(
+                "INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date, league_id) "
+                "VALUES (?, ?, ?, ?, '2025-08-01', ?)",
+                ((h, a, rng.randint(0, 4), rng.randint(0, 4), lid) for h in clubs for a in clubs if h != a)
+            )
+            league_ids.append(lid)
+    return league_ids
+
+
+def _ms(fn, league_ids, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for lid in league_ids:
+            fn(lid)
+    return (time.perf_counter() - start) * 1000 / (rounds * len(league_ids))
+
+
+def bench_standings(n_leagues, rounds=3):
+    league_ids = populate(n_leagues)
+    total = db.fetch_one("SELECT COUNT(*) AS n FROM matches")['n']
+    legacy = _ms(_legacy_standings, league_ids, rounds)
+    legacy_tally = _ms(_legacy_leagues_standings, league_ids, rounds)
+    aggregate = _ms(_aggregate_standings, league_ids, rounds)
+    cold = _ms(lambda lid: (standings.cache.clear(), standings.league_table(lid)), league_ids, rounds)
+    current = _ms(matches.get_league_standings, league_ids, rounds)
+    current_leagues = _ms(leagues.get_standings, league_ids, rounds)
+    print(f"standings, {n_leagues} leagues / {total} matches, per league   "
+          f"N+1 queries: {legacy:7.3f} ms   dict tally of matches: {legacy_tally:7.3f} ms   "
+          f"one aggregation: {aggregate:7.3f} ms")
+    print(f"  standings engine   cold (club_stats read): {cold:7.3f} ms   "
+          f"warm, matches_service: {current:7.3f} ms   warm, leagues_service: {current_leagues:7.3f} ms")
+    return league_ids
+
+
+def bench_matchday(lid, results=300):
+    """A live matchday: each new result in the league is followed by a standings request."""
+    clubs = [r['club_id'] for r in fetch_all("SELECT club_id FROM league_teams WHERE league_id = ?", (lid,))]
+    rng = random.Random(5)
+    timings = {}
+    for label, cold in (("recompute", True), ("incremental", False)):
+        standings.cache.clear()
+        standings.league_table(lid)
+        elapsed = 0.0
+        for _ in range(results):
+            home, away = rng.sample(clubs, 2)
+            matches.record_match(home, away, '2025-09-01', rng.randint(0, 4), rng.randint(0, 4), lid)
+            if cold:
+                standings.cache.clear()
+            start = time.perf_counter()
+            standings.league_table(lid)
+            elapsed += time.perf_counter() - start
+        timings[label] = elapsed * 1e6 / results
+    print(f"matchday, {results} results each followed by a table read   "
+          f"recompute: {timings['recompute']:7.1f} us/read   incremental: {timings['incremental']:7.1f} us/read   "
+          f"({standings.cache.info()['deltas']} deltas applied)")
+
+
+def main():
+    for n_leagues in (1, 100):
+        temp_dir = tempfile.mkdtemp()
+        db.DB_PATH = os.path.join(temp_dir, 'bench_football.db')
+        try:
+            db.initialize_database()
+            league_ids = bench_standings(n_leagues)
+            if n_leagues == 1:
+                bench_matchday(league_ids[0])
+        finally:
+            db.close_pool()
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
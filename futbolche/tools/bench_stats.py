@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for statistics_service on a generated multi-season database.
+
+Runs against a throw-away database in a temporary directory:
+
+    python tools/bench_stats.py
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import db
+from db import fetch_all, fetch_one
+import services.statistics_service as statistics
+
+
+def _legacy_club_statistics(cid):
+    """get_club_statistics as it was: nine separate queries."""
+    played = fetch_one("SELECT COUNT(*) as cnt FROM matches WHERE home_team_id = ? OR away_team_id = ?", (cid, cid))['cnt'] or 0
+    wins = (fetch_one("SELECT COUNT(*) as cnt FROM matches WHERE home_team_id = ? AND home_goals > away_goals", (cid,))['cnt'] or 0) \
+        + (fetch_one("SELECT COUNT(*) as cnt FROM matches WHERE away_team_id = ? AND away_goals > home_goals", (cid,))['cnt'] or 0)
+    draws = fetch_one("SELECT COUNT(*) as cnt FROM matches WHERE (home_team_id = ? OR away_team_id = ?) AND home_goals = away_goals", (cid, cid))['cnt'] or 0
+    goals_for = (fetch_one("SELECT COALESCE(SUM(home_goals),0) as s FROM matches WHERE home_team_id = ?", (cid,))['s'] or 0) \
+        + (fetch_one("SELECT COALESCE(SUM(away_goals),0) as s FROM matches WHERE away_team_id = ?", (cid,))['s'] or 0)
+    goals_against = (fetch_one("SELECT COALESCE(SUM(away_goals),0) as s FROM matches WHERE home_team_id = ?", (cid,))['s'] or 0) \
+        + (fetch_one("SELECT COALESCE(SUM(home_goals),0) as s FROM matches WHERE away_team_id = ?", (cid,))['s'] or 0)
+    return played, wins, draws, goals_for, goals_against
+
+
+def _scan_club_statistics(cid):
+    """get_club_statistics before club_stats: one pass over the club's matches."""
+    return fetch_one(
+        """SELECT COUNT(*) AS played,
+                  SUM(CASE WHEN home_team_id = :cid THEN home_goals > away_goals
+                           ELSE away_goals > home_goals END) AS wins,
+                  SUM(home_goals = away_goals) AS draws,
+                  SUM(CASE WHEN home_team_id = :cid THEN home_goals ELSE away_goals END) AS goals_for,
+                  SUM(CASE WHEN home_team_id = :cid THEN away_goals ELSE home_goals END) AS goals_against
+           FROM matches WHERE home_team_id = :cid OR away_team_id = :cid""",
+        {'cid': cid}
+    )
+
+
+def _scan_player_statistics(pid):
+    """get_player_statistics before player_stats: one GROUP BY over the player's events."""
+    return fetch_all("SELECT event_type, COUNT(*) AS cnt FROM events WHERE player_id = ? GROUP BY event_type", (pid,))
+
+
+def _legacy_player_statistics(pid):
+    """get_player_statistics as it was: one COUNT(*) per event type."""
+    return {t: fetch_one("SELECT COUNT(*) as cnt FROM events WHERE player_id = ? AND event_type = ?", (pid, t))['cnt']
+            for t in statistics.EVENT_STAT_KEYS}
+
+
+def populate(n_clubs=40, seasons=20):
+    """Add clubs and `seasons` double round-robins of random results between them."""
+    rng = random.Random(7)
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO clubs (name, city, founded_year) VALUES (?, 'Град', 1950)",
+        ((f"Клуб {i:03d}",) for i in range(n_clubs))
+    )
+    ids = [r[0] for r in conn.execute("SELECT id FROM clubs")]
+    conn.executemany(
+        "INSERT INTO matches (home_team_id, away_team_id, home_goals, away_goals, match_date) VALUES (?, ?, ?, ?, ?)",
+        ((h, a, rng.randint(0, 4), rng.randint(0, 4), f"{2000 + s}-08-01")
+         for s in range(seasons) for h in ids for a in ids if h != a)
+    )
+    conn.executemany(
+        "INSERT INTO players (club_id, full_name, birth_date, nationality, position, number, status) "
+        "VALUES (?, ?, '1995-01-01', 'България', 'MF', ?, 'Активен')",
+        ((cid, f"Играч {cid}-{n}", n) for cid in ids for n in range(1, 21))
+    )
+    players = [r[0] for r in conn.execute("SELECT id FROM players")]
+    matches = [r[0] for r in conn.execute("SELECT id FROM matches")]
+    types = list(statistics.EVENT_STAT_KEYS)
+    conn.executemany(
+        "INSERT INTO events (match_id, player_id, event_type, minute) VALUES (?, ?, ?, ?)",
+        ((rng.choice(matches), rng.choice(players), rng.choice(types), rng.randint(1, 90)) for _ in range(200000))
+    )
+    conn.commit()
+    db.release_connection(conn)
+    return ids
+
+
+def bench_club_statistics(ids):
+    matches = fetch_one("SELECT COUNT(*) AS n FROM matches")['n']
+
+    start = time.perf_counter()
+    for cid in ids:
+        _legacy_club_statistics(cid)
+    legacy = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for cid in ids:
+        _scan_club_statistics(cid)
+    scan = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for cid in ids:
+        statistics.get_club_statistics(cid)
+    single = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    statistics.get_club_statistics_many(ids)
+    many = (time.perf_counter() - start) * 1000
+
+    print(f"club stats, {len(ids)} clubs / {matches} matches   "
+          f"9 queries each: {legacy:8.1f} ms   matches scan each: {scan:8.1f} ms   "
+          f"club_stats each: {single:8.1f} ms   batch: {many:8.1f} ms")
+
+
+def bench_player_statistics():
+    players = [r['id'] for r in db.fetch_all("SELECT id FROM players")]
+    events = fetch_one("SELECT COUNT(*) AS n FROM events")['n']
+
+    start = time.perf_counter()
+    for pid in players:
+        _legacy_player_statistics(pid)
+    legacy = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for pid in players:
+        _scan_player_statistics(pid)
+    scan = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for pid in players:
+        statistics.get_player_statistics(pid)
+    single = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    statistics.get_player_statistics_many()
+    many = (time.perf_counter() - start) * 1000
+
+    print(f"player stats, {len(players)} players / {events} events   "
+          f"5 queries each: {legacy:8.1f} ms   events scan each: {scan:8.1f} ms   "
+          f"player_stats each: {single:8.1f} ms   batch: {many:8.1f} ms")
+
+
+def main():
+    temp_dir = tempfile.mkdtemp()
+    db.DB_PATH = os.path.join(temp_dir, 'bench_football.db')
+    try:
+        db.initialize_database()
+        ids = populate()
+        bench_club_statistics(ids)
+        bench_player_statistics()
+    finally:
+        db.close_pool()
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Follow a live feed of match events (JSON lines) and record them as they arrive.
+
+    python tools/ingest_feed.py file PATH [--from-end]   # tail a JSON-lines file
+    python tools/ingest_feed.py tcp HOST:PORT            # accept feeds on a local TCP port
+    python tools/ingest_feed.py unix PATH                # accept feeds on a Unix socket
+
+One event per line, e.g.
+    {"key": "feed-1:8812", "match_id": 12, "player": "Иван Иванов", "type": "goal", "minute": 23}
+(see src/services/ingest_service.py). Runs until interrupted and prints
+throughput and lag every --stats-every seconds.
+
+Uses the database configured for the app (FUTBOLCHE_DB_PATH or sql/football.db).
+"""
+
+import argparse
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import db
+from services.ingest_service import EventIngester, follow_file, serve_socket
+
+
+def _print_stats(stats):
+    print(f"written {stats['written']} ({stats['events_per_sec']}/s)  dup {stats['duplicates']}  "
+          f"rejected {stats['rejected']}  malformed {stats['malformed']}  failed {stats['failed']}  "
+          f"batches {stats['batches']} (avg {stats['avg_batch']})  queue {stats['queue_depth']}  "
+          f"lag avg {stats['avg_lag']}s max {stats['max_lag']}s", flush=True)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Ingest a live feed of match events.")
+    parser.add_argument('source', choices=('file', 'tcp', 'unix'))
+    parser.add_argument('address', help="file path, HOST:PORT or socket path")
+    parser.add_argument('--from-end', action='store_true', help="skip lines already in the file")
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--max-delay', type=float, default=0.2, help="seconds to wait for a batch to fill")
+    parser.add_argument('--queue-size', type=int, default=10000)
+    parser.add_argument('--stats-every', type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    db.initialize_database()
+    ingester = EventIngester(args.batch_size, args.max_delay, args.queue_size).start()
+    stop = threading.Event()
+    server = None
+    if args.source == 'file':
+        reader = threading.Thread(target=follow_file, args=(args.address, ingester, stop, args.from_end), daemon=True)
+    else:
+        if args.source == 'tcp':
+            host, _, port = args.address.rpartition(':')
+            server = serve_socket((host or '127.0.0.1', int(port)), ingester)
+        else:
+            server = serve_socket(args.address, ingester)
+        reader = threading.Thread(target=server.serve_forever, daemon=True)
+    reader.start()
+    print(f"ingesting from {args.source} {args.address} (Ctrl+C to stop)", flush=True)
+
+    try:
+        while not stop.wait(args.stats_every):
+            _print_stats(ingester.stats())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        reader.join(1.0)
+        ingester.stop()
+        _print_stats(ingester.stats())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Record a list of events for one match in a single transaction.
+
+    python tools/record_events.py MATCH_ID [FILE]
+
+Reads FILE (or standard input) with one event per line, as in the chat
+command "запиши събития за мач [match_id]":
+
+    гол Иван Иванов 23
+    асист Петър Петров 23
+    жълт картон Васил Андреев 40
+    поява Мария Георгиева
+
+Uses the database configured for the app (FUTBOLCHE_DB_PATH or sql/football.db).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import services.matches_service as matches
+
+
+def main(argv):
+    if len(argv) not in (1, 2):
+        print(__doc__.strip())
+        return 2
+    if len(argv) == 2:
+        with open(argv[1], 'r', encoding='utf-8') as f:
+            text = f.read()
+    else:
+        text = sys.stdin.read()
+
+    events, bad = matches.parse_event_lines(text)
+    for entry in bad:
+        print(f"unrecognized event: {entry}")
+    if bad:
+        return 1
+
+    result = matches.record_events_bulk(argv[0], events)
+    print(result)
+    return 0 if result.startswith("Записани") else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
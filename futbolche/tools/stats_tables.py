@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Maintenance for the trigger-maintained statistics tables (club_stats, player_stats).
+
+    python tools/stats_tables.py check     # list rows that differ from matches/events
+    python tools/stats_tables.py rebuild   # recompute both tables
+
+Uses the database configured for the app (FUTBOLCHE_DB_PATH or sql/football.db).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import db
+from services.statistics_service import check_club_stats, check_player_stats
+
+
+def check():
+    club_diffs = check_club_stats()
+    for club_id, league_id, stored, expected in club_diffs:
+        print(f"club_stats club {club_id} league {league_id}: stored {stored} expected {expected}")
+    player_diffs = check_player_stats()
+    for player_id, stored, expected in player_diffs:
+        print(f"player_stats player {player_id}: stored {stored} expected {expected}")
+    print(f"{len(club_diffs)} mismatched club_stats rows, {len(player_diffs)} mismatched player_stats rows")
+    return 1 if club_diffs or player_diffs else 0
+
+
+def rebuild():
+    if not (db.rebuild_club_stats() and db.rebuild_player_stats()):
+        return 1
+    print("club_stats and player_stats rebuilt")
+    return check()
+
+
+def main(argv):
+    commands = {'check': check, 'rebuild': rebuild}
+    if len(argv) != 1 or argv[0] not in commands:
+        print(__doc__.strip())
+        return 2
+    return commands[argv[0]]()
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))